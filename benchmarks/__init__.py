@@ -0,0 +1 @@
+"""Benchmarks for the pack, walk and validate code paths, run against synthetic plugin directories."""
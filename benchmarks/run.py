@@ -0,0 +1,266 @@
+"""Run the benchmark suite, save the results, and compare them against the results of a previous version.
+
+Usage:
+    python -m benchmarks.run                                   # Quick run, up to 10k files
+    python -m benchmarks.run --full                            # Up to 100k files
+    python -m benchmarks.run --compare benchmarks/results/0.0.1.json
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import pathspec
+import typer
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from streamdeck_cli.commands.pack.autoversion import (
+    allocate_versioned_output_dirpath,
+    get_versioned_output_dirpath,
+)
+from streamdeck_cli.commands.pack.ignore import IgnoreMatcher
+from streamdeck_cli.commands.pack.zip import (
+    archive_plugin_files,
+    get_packignore_specification,
+    walk_filtered_plugin_files,
+)
+from streamdeck_cli.models.manifest import Manifest
+
+from benchmarks.synthetic import (
+    PLUGIN_UUID,
+    PLUGIN_VERSION,
+    generate_ignore_patterns,
+    generate_plugin,
+    generate_releases,
+    generate_relpaths,
+)
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+
+RESULTS_DIRPATH = Path(__file__).parent / "results"
+
+QUICK_FILE_COUNTS = [100, 1_000, 10_000]
+FULL_FILE_COUNTS = [*QUICK_FILE_COUNTS, 100_000]
+IGNORE_PATTERN_COUNTS = [10, 1_000]
+MATCH_PATTERN_COUNTS = [10, 1_000, 5_000]
+MATCH_PATH_COUNT = 10_000
+ACTION_COUNTS = [10, 500]
+RELEASE_COUNTS = [10, 1_000]
+
+
+benchmark_cli = typer.Typer()
+
+
+def get_package_version() -> str:
+    """Get the installed version of the CLI package, which the results are saved under."""
+    try:
+        return version("streamdeck-plugin-sdk-cli")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing, throughput and memory usage of a single benchmark, for one set of parameters."""
+    name: str
+    params: dict[str, Any]
+    seconds: float
+    items: int
+    unit: str
+    megabytes: Optional[float] = None  # noqa: UP045
+    peak_memory_mb: float = 0.0
+    throughput: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        """Identify the benchmark & its parameters, to match it with the results of another version."""
+        return f"{self.name}[{json.dumps(self.params, sort_keys=True)}]"
+
+    def __post_init__(self) -> None:
+        """Compute the throughput from the timing."""
+        self.throughput = {f"{self.unit}_per_s": self.items / self.seconds}
+        if self.megabytes is not None:
+            self.throughput["mb_per_s"] = self.megabytes / self.seconds
+
+
+def measure(func: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    """Get the best wall-clock time of a few runs of the function, and its peak traced memory usage in MB.
+
+    Memory is traced in a separate run, since tracing slows everything down and would skew the timings.
+    """
+    best_seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best_seconds, peak_bytes / 1024 / 1024
+
+
+def bench_walk_and_pack(workdir: Path, file_counts: list[int], repeat: int) -> Iterator[BenchmarkResult]:
+    """Benchmark walking and archiving plugins with a varying number of files and .packignore patterns."""
+    for file_count in file_counts:
+        for ignore_pattern_count in IGNORE_PATTERN_COUNTS:
+            plugin_dirpath = generate_plugin(
+                workdir / f"plugin-{file_count}-{ignore_pattern_count}",
+                file_count=file_count,
+                ignore_pattern_count=ignore_pattern_count,
+            )
+            packignore_spec = get_packignore_specification(plugin_dirpath)
+            filepaths = list(walk_filtered_plugin_files(plugin_dirpath, packignore_spec))
+            megabytes = sum((plugin_dirpath / filepath).stat().st_size for filepath in filepaths) / 1024 / 1024
+            params = {"files": file_count, "ignore_patterns": ignore_pattern_count}
+
+            seconds, peak_memory_mb = measure(lambda: list(walk_filtered_plugin_files(plugin_dirpath, packignore_spec)), repeat)  # noqa: B023
+            yield BenchmarkResult("walk", params, seconds, len(filepaths), "files", megabytes, peak_memory_mb)
+
+            # Archiving a plugin of 100k files a few times over would take ages, and the pattern count barely matters to it.
+            if ignore_pattern_count != IGNORE_PATTERN_COUNTS[0]:
+                continue
+
+            for jobs in (1, 0):
+                output_filepath = workdir / f"plugin-{file_count}.streamDeckPlugin"
+                seconds, peak_memory_mb = measure(
+                    lambda: archive_plugin_files(
+                        plugin_dirpath, output_filepath, PLUGIN_UUID, packignore_spec, jobs=jobs,  # noqa: B023
+                    ),
+                    repeat,
+                )
+                yield BenchmarkResult("pack", {**params, "jobs": jobs}, seconds, len(filepaths), "files", megabytes, peak_memory_mb)
+
+
+def bench_match(repeat: int) -> Iterator[BenchmarkResult]:
+    """Benchmark matching paths against .packignore patterns, with pathspec and with the compiled matcher."""
+    relpaths = generate_relpaths(MATCH_PATH_COUNT)
+
+    for pattern_count in MATCH_PATTERN_COUNTS:
+        spec = pathspec.PathSpec.from_lines(GitWildMatchPattern, generate_ignore_patterns(pattern_count))
+        params = {"patterns": pattern_count, "paths": len(relpaths)}
+
+        seconds, peak_memory_mb = measure(lambda: [spec.check_file(relpath) for relpath in relpaths], repeat)  # noqa: B023
+        yield BenchmarkResult("match_pathspec", params, seconds, len(relpaths), "paths", None, peak_memory_mb)
+
+        # Compiling is part of what gets measured, and a fresh matcher doesn't benefit from memoised decisions.
+        seconds, peak_memory_mb = measure(lambda: match_compiled(spec, relpaths), repeat)  # noqa: B023
+        yield BenchmarkResult("match_compiled", params, seconds, len(relpaths), "paths", None, peak_memory_mb)
+
+
+def match_compiled(spec: pathspec.PathSpec, relpaths: list[str]) -> list[bool | None]:
+    """Match paths against a specification compiled into an indexed matcher, like when packing."""
+    matcher = IgnoreMatcher(spec)
+    return [matcher.check(relpath) for relpath in relpaths]
+
+
+def bench_validate(workdir: Path, repeat: int) -> Iterator[BenchmarkResult]:
+    """Benchmark validating manifests with a varying number of actions, each with their own assets."""
+    for action_count in ACTION_COUNTS:
+        plugin_dirpath = generate_plugin(workdir / f"manifest-{action_count}", file_count=0, action_count=action_count)
+        manifest_filepath = plugin_dirpath / "manifest.json"
+
+        seconds, peak_memory_mb = measure(lambda: Manifest.from_json_file(manifest_filepath), repeat)  # noqa: B023
+        yield BenchmarkResult("validate", {"actions": action_count}, seconds, action_count, "actions", None, peak_memory_mb)
+
+
+def bench_autoversion(workdir: Path, repeat: int) -> Iterator[BenchmarkResult]:
+    """Benchmark finding the next release directory, with a varying number of existing releases."""
+    for release_count in RELEASE_COUNTS:
+        output_dirpath = generate_releases(workdir / f"releases-{release_count}", PLUGIN_VERSION, release_count)
+
+        seconds, peak_memory_mb = measure(lambda: get_versioned_output_dirpath(output_dirpath, PLUGIN_VERSION), repeat)  # noqa: B023
+        yield BenchmarkResult("autoversion", {"releases": release_count}, seconds, release_count, "releases", None, peak_memory_mb)
+
+        # Allocating goes through the release index, which the first allocation builds from the directory listing.
+        allocate_versioned_output_dirpath(output_dirpath, PLUGIN_VERSION)
+        seconds, peak_memory_mb = measure(lambda: allocate_versioned_output_dirpath(output_dirpath, PLUGIN_VERSION), repeat)  # noqa: B023
+        yield BenchmarkResult("allocate", {"releases": release_count}, seconds, release_count, "releases", None, peak_memory_mb)
+
+
+def compare_results(results: list[BenchmarkResult], previous_results_filepath: Path, tolerance: float) -> list[str]:
+    """Compare the results to previously saved ones, returning a message for each benchmark that got slower."""
+    with previous_results_filepath.open("r") as f:
+        previous = {
+            BenchmarkResult(**{k: v for k, v in result.items() if k != "throughput"}).key: result
+            for result in json.load(f)["results"]
+        }
+
+    regressions: list[str] = []
+    for result in results:
+        previous_result = previous.get(result.key)
+        if previous_result is None:
+            continue
+
+        change = result.seconds / previous_result["seconds"] - 1
+        typer.echo(f"{result.key:<60} {previous_result['seconds']:>10.4f}s -> {result.seconds:>10.4f}s ({change:+.0%})")
+        if change > tolerance:
+            regressions.append(f"{result.key} is {change:.0%} slower than in {previous_results_filepath.name}")
+
+    return regressions
+
+
+@benchmark_cli.command()
+def run(
+    full: bool = typer.Option(False, help="Include the 100k-file plugin, which takes a while to generate and pack"),  # noqa: FBT001, FBT003
+    repeat: int = typer.Option(3, help="Number of timed runs of each benchmark, of which the best is kept"),
+    output: Optional[Path] = typer.Option(None, help="Where to save the results (defaults to benchmarks/results/<version>.json)"),  # noqa: UP045, B008
+    compare: Optional[Path] = typer.Option(None, help="Results of a previous version to compare against"),  # noqa: UP045, B008
+    tolerance: float = typer.Option(0.2, help="How much slower a benchmark may get before it counts as a regression"),
+) -> None:
+    """Run the benchmarks on synthetic plugins, and save the results."""
+    file_counts = FULL_FILE_COUNTS if full else QUICK_FILE_COUNTS
+    results: list[BenchmarkResult] = []
+
+    with tempfile.TemporaryDirectory(prefix="streamdeck-cli-bench-") as tmp_dirname:
+        workdir = Path(tmp_dirname)
+        for result in itertools.chain(
+            bench_walk_and_pack(workdir, file_counts, repeat),
+            bench_match(repeat),
+            bench_validate(workdir, repeat),
+            bench_autoversion(workdir, repeat),
+        ):
+            throughput = ", ".join(f"{value:,.1f} {unit.replace('_per_s', '/s')}" for unit, value in result.throughput.items())
+            typer.echo(f"{result.key:<60} {result.seconds:>10.4f}s  {throughput}  peak {result.peak_memory_mb:.1f} MB")
+            results.append(result)
+
+    package_version = get_package_version()
+    output_filepath = output or RESULTS_DIRPATH / f"{package_version}.json"
+    output_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with output_filepath.open("w") as f:
+        json.dump({
+            "version": package_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            # datetime.UTC is only available as of Python 3.11.
+            "timestamp": datetime.now(tz=timezone.utc).isoformat(),  # noqa: UP017
+            "results": [asdict(result) for result in results],
+        }, f, indent=2)
+    typer.echo(f"Results saved to {output_filepath}")
+
+    if compare is not None:
+        regressions = compare_results(results, compare, tolerance)
+        for regression in regressions:
+            typer.echo(f"REGRESSION: {regression}")
+        if regressions:
+            raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    benchmark_cli()
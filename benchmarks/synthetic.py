@@ -0,0 +1,167 @@
+"""Generate synthetic Stream Deck plugin directories of arbitrary size to benchmark against."""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+
+PLUGIN_UUID = "com.benchmark.plugin"
+PLUGIN_VERSION = "1.0.0"
+
+# Smallest valid PNG (1x1 transparent pixel), used for every icon referenced by the manifest.
+_PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+
+# Files are spread over nested directories so that the walk has a realistic shape.
+_FILES_PER_DIRECTORY = 50
+_DIRECTORIES_PER_LEVEL = 10
+
+
+def generate_plugin(
+    plugin_dirpath: Path,
+    file_count: int,
+    ignore_pattern_count: int = 10,
+    action_count: int = 10,
+    seed: int = 0,
+) -> Path:
+    """Create a plugin directory with a valid manifest, and roughly `file_count` extra files to pack.
+
+    About a third of the files are random bytes (like images or compiled libraries), the rest is Python-like text.
+    The .packignore file gets `ignore_pattern_count` patterns, and a few of them match an extra directory of files
+    that should never make it into the package.
+    """
+    rng = random.Random(seed)
+    plugin_dirpath.mkdir(parents=True, exist_ok=True)
+
+    _write_manifest(plugin_dirpath, action_count)
+    _write_packignore(plugin_dirpath, ignore_pattern_count)
+
+    for i in range(file_count):
+        filepath = plugin_dirpath / "src" / _nested_dirpath(i) / f"module_{i}{'.bin' if i % 3 == 0 else '.py'}"
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        size = rng.randint(256, 8 * 1024)
+        if filepath.suffix == ".bin":
+            filepath.write_bytes(rng.randbytes(size))
+        else:
+            filepath.write_text(_python_like_text(rng, size))
+
+    # Files that the .packignore patterns exclude, which a walker should skip without descending into them.
+    ignored_dirpath = plugin_dirpath / ".venv" / "lib"
+    ignored_dirpath.mkdir(parents=True, exist_ok=True)
+    for i in range(max(file_count // 10, 1)):
+        (ignored_dirpath / f"ignored_{i}.py").write_text("ignored = True\n")
+
+    return plugin_dirpath
+
+
+def generate_releases(output_dirpath: Path, plugin_version: str, release_count: int) -> Path:
+    """Create `release_count` existing release directories for the given version, as previous packs would have."""
+    output_dirpath.mkdir(parents=True, exist_ok=True)
+
+    for subversion in range(release_count):
+        dirname = plugin_version if subversion == 0 else f"{plugin_version}-{subversion}"
+        (output_dirpath / dirname).mkdir(exist_ok=True)
+
+    return output_dirpath
+
+
+def generate_ignore_patterns(pattern_count: int, seed: int = 0) -> list[str]:
+    """Generate .packignore patterns of every kind: names, suffixes, anchored paths, wildcards and negations."""
+    rng = random.Random(seed)
+    kinds = [
+        "build_output_{i}/",
+        "*.generated_{i}",
+        "/dist_{i}",
+        "cache_{i}.db",
+        "docs_{i}/**/*.md",
+        "tmp_{i}_*.log",
+        "!keep_{i}.generated_{i}",
+    ]
+    return [rng.choice(kinds).format(i=i) for i in range(pattern_count)]
+
+
+def generate_relpaths(path_count: int, seed: int = 0) -> list[str]:
+    """Generate paths relative to a plugin directory, like a walk would match, with a trailing slash for directories."""
+    rng = random.Random(seed)
+    names = ["main.py", "module.generated_3", "cache_5.db", "README.md", "tmp_2_run.log", "icon.png"]
+    relpaths: list[str] = []
+    for i in range(path_count):
+        dirpath = _nested_dirpath(i).as_posix()
+        relpaths.append(f"{dirpath}/" if i % _FILES_PER_DIRECTORY == 0 else f"{dirpath}/{rng.choice(names)}")
+    return relpaths
+
+
+def _nested_dirpath(file_index: int) -> Path:
+    """Get the directory of a file, filling directories of a fixed size that are nested a couple of levels deep."""
+    directory_index = file_index // _FILES_PER_DIRECTORY
+    return Path(
+        f"pkg_{directory_index // (_DIRECTORIES_PER_LEVEL ** 2)}",
+        f"sub_{directory_index // _DIRECTORIES_PER_LEVEL % _DIRECTORIES_PER_LEVEL}",
+        f"leaf_{directory_index % _DIRECTORIES_PER_LEVEL}",
+    )
+
+
+def _python_like_text(rng: random.Random, size: int) -> str:
+    words = ["def", "return", "self", "value", "import", "from", "class", "None", "if", "else", "for", "in"]
+    lines: list[str] = []
+    length = 0
+    while length < size:
+        line = "    " * rng.randint(0, 3) + " ".join(rng.choices(words, k=rng.randint(2, 8)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def _write_manifest(plugin_dirpath: Path, action_count: int) -> None:
+    imgs_dirpath = plugin_dirpath / "imgs"
+    imgs_dirpath.mkdir(exist_ok=True)
+    (imgs_dirpath / "plugin.png").write_bytes(_PNG_BYTES)
+    (imgs_dirpath / "category.png").write_bytes(_PNG_BYTES)
+    (plugin_dirpath / "main.py").write_text("print('Hello, Stream Deck!')\n")
+    (plugin_dirpath / "pi").mkdir(exist_ok=True)
+
+    actions = []
+    for i in range(action_count):
+        action_dirpath = imgs_dirpath / "actions" / f"action{i}"
+        action_dirpath.mkdir(parents=True, exist_ok=True)
+        (action_dirpath / "icon.png").write_bytes(_PNG_BYTES)
+        (plugin_dirpath / "pi" / f"action{i}.html").write_text(f"<html><body>Action {i}</body></html>\n")
+
+        actions.append({
+            "UUID": f"{PLUGIN_UUID}.action{i}",
+            "Name": f"Action {i}",
+            "Icon": f"imgs/actions/action{i}/icon",
+            "PropertyInspectorPath": f"pi/action{i}.html",
+            "States": [{"Image": f"imgs/actions/action{i}/icon"}],
+        })
+
+    manifest = {
+        "UUID": PLUGIN_UUID,
+        "Name": "Benchmark Plugin",
+        "Version": PLUGIN_VERSION,
+        "Author": "Benchmark",
+        "Description": "Synthetic plugin generated for benchmarking.",
+        "Category": "Benchmark",
+        "CategoryIcon": "imgs/category",
+        "Icon": "imgs/plugin",
+        "CodePath": "main.py",
+        "Actions": actions,
+        "SDKVersion": 2,
+        "Software": {"MinimumVersion": "6.4"},
+        "OS": [{"Platform": "mac", "MinimumVersion": "10.15"}, {"Platform": "windows", "MinimumVersion": "10"}],
+    }
+    (plugin_dirpath / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def _write_packignore(plugin_dirpath: Path, ignore_pattern_count: int) -> None:
+    patterns = [".packignore", ".venv/"]
+    # Patterns that don't match anything still have to be checked against every path, which is what's being measured.
+    patterns.extend(
+        f"*.generated_{i}" if i % 2 else f"build_output_{i}/"
+        for i in range(max(ignore_pattern_count - len(patterns), 0))
+    )
+    (plugin_dirpath / ".packignore").write_text("\n".join(patterns) + "\n")
@@ -1,17 +1,57 @@
-import typer
+"""Entry point of the CLI, whose commands only get imported once invoked."""
+import time
 
-from streamdeck_cli.commands.create import create
-from streamdeck_cli.commands.pack import pack
-from streamdeck_cli.commands.validate import validate
 
+# Taken before anything else gets imported, to measure the CLI's own startup time.
+IMPORT_START = time.perf_counter()
 
-cli = typer.Typer()
 
-# Typer doesn't currently have a better way of registering individual command
-# functions than through its command decorator.
-cli.command()(create)
-cli.command()(pack)
-cli.command()(validate)
+# These come after IMPORT_START on purpose, so that their import time counts towards the CLI's startup time.
+import typer  # noqa: E402
+
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP  # noqa: E402
+from streamdeck_cli.utils.lazy_commands import LazyCommand, LazyCommandGroup  # noqa: E402
+
+
+class CliGroup(LazyCommandGroup):
+    """The CLI's commands, listed with the same short help as the commands themselves, without importing them."""
+
+    # Commands are only imported once invoked, so that e.g. `validate` doesn't pay for importing copier.
+    lazy_commands = {  # noqa: RUF012
+        command_name: LazyCommand(f"streamdeck_cli.commands.{command_name}", f"{command_name}_cli", short_help)
+        for command_name, short_help in COMMAND_SHORT_HELP.items()
+    }
+
+
+cli = typer.Typer(cls=CliGroup)
+
+
+@cli.callback()
+def main(
+    ctx: typer.Context,
+    startup_profile: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--startup-profile",
+        help="Report how long the CLI and the invoked command took to import, once the command is done",
+    ),
+) -> None:
+    """Stream Deck plugin SDK command line tools."""
+    if startup_profile:
+        cli_seconds = time.perf_counter() - IMPORT_START
+        ctx.call_on_close(lambda: echo_startup_profile(ctx, cli_seconds))
+
+
+def echo_startup_profile(ctx: typer.Context, cli_seconds: float) -> None:
+    """Print the startup profile to stderr, to keep it apart from the command's own output."""
+    typer.echo(f"Startup profile: CLI ready in {cli_seconds * 1000:.1f} ms", err=True)
+
+    group: CliGroup = ctx.command  # type: ignore[assignment]
+    for load_stats in group.load_stats:
+        typer.echo(
+            f"  '{load_stats.command_name}' command imported in {load_stats.seconds * 1000:.1f} ms "
+            f"({load_stats.imported_module_count} modules)",
+            err=True,
+        )
 
 
 
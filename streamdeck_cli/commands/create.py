@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
 import copier
 import typer
 from typing_extensions import TypeAlias  # noqa: UP035
 
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+from streamdeck_cli.utils.template_cache import (
+    DEFAULT_TEMPLATE_SRC,
+    TemplateCache,
+    is_local_template,
+)
+
 
 create_cli = typer.Typer()
 
@@ -12,18 +24,79 @@ DirOrVcsPathStr: TypeAlias = str
 
 
 
-@create_cli.command()
+@create_cli.command(short_help=COMMAND_SHORT_HELP["create"])
 def create(
-    src_path: DirOrVcsPathStr = "https://github.com/strohganoff/python-streamdeck-plugin-template.git",
+    src_path: DirOrVcsPathStr = DEFAULT_TEMPLATE_SRC,
+    vcs_ref: Optional[str] = typer.Option(  # noqa: UP045
+        None,
+        "--vcs-ref",
+        help="Git revision (branch, tag or commit) of the template to use, instead of its latest version tag (or default branch if it has none)",
+    ),
+    offline: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--offline",
+        help="Never touch the network: scaffold from the cached copy of the template, or from a local directory or git repository",
+    ),
+    use_cache: bool = typer.Option(  # noqa: FBT001
+        True,  # noqa: FBT003
+        "--cache/--no-cache",
+        help="Scaffold from the revision of the template pinned in the local template cache, fetching it only if it isn't cached yet (see `streamdeck-cli templates refresh`)",
+    ),
 ) -> None:
     """Create a new Stream Deck plugin project from the template."""
-    copier.run_copy(
-        src_path=src_path,
+    template_src_path, template_vcs_ref = resolve_template(src_path, vcs_ref, offline=offline, use_cache=use_cache)
+
+    worker = copier.run_copy(
+        src_path=template_src_path,
+        vcs_ref=template_vcs_ref,
         unsafe=True,
     )
 
+    if template_src_path != src_path:
+        record_template_src(Path(worker.dst_path) / worker.answers_relpath, src_path)
+
+
+def resolve_template(
+    src_path: DirOrVcsPathStr,
+    vcs_ref: str | None,
+    *,
+    offline: bool = False,
+    use_cache: bool = True,
+) -> tuple[str, str | None]:
+    """Get the template source and revision that copier should scaffold from.
+
+    Local templates are used as-is. Remote ones are taken from the template cache, at the pinned commit of the revision.
+    """
+    if is_local_template(src_path):
+        return src_path, vcs_ref
+
+    if not use_cache:
+        if offline:
+            typer.echo("ERROR: A remote template can only be used offline from the template cache.")
+            raise typer.Exit(1)
+        return src_path, vcs_ref
+
+    template_cache = TemplateCache.default()
+    pin = template_cache.resolve(src_path, vcs_ref, offline=offline)
+
+    return str(template_cache.mirror_dirpath(src_path)), pin.commit
+
+
+def record_template_src(answers_filepath: Path, src_path: DirOrVcsPathStr) -> None:
+    """Record the template's own source in copier's answers file, rather than the template cache it was copied from.
 
+    Copier records the path of the cache's mirror, which only exists on this machine, so that `copier update` would
+    fail anywhere else, or once the cache is cleared.
+    """
+    try:
+        answers = answers_filepath.read_text()
+    # Nothing to record if the template has no answers file.
+    except FileNotFoundError:
+        return
 
+    # A JSON string is a valid YAML one, quoted as needed.
+    answers = re.sub(r"^_src_path:.*$", lambda _: f"_src_path: {json.dumps(src_path)}", answers, flags=re.MULTILINE)
+    answers_filepath.write_text(answers)
 
 
 
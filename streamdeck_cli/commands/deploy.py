@@ -0,0 +1,106 @@
+"""Install a plugin into the Stream Deck plugins directory, only writing the files that changed since the last deploy."""
+from __future__ import annotations
+
+import contextlib
+import zipfile
+from pathlib import Path  # noqa: TC003 (Typer reads the annotations of the command's parameters at runtime)
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.commands.pack.deploy import (
+    DeploySource,
+    DirectorySource,
+    default_plugins_dirpath,
+    deploy_plugin,
+    format_deploy_result,
+    open_archive_source,
+)
+from streamdeck_cli.commands.pack.verify import PLUGIN_DIRNAME_SUFFIX
+from streamdeck_cli.commands.validate.batch import validate_plugin
+from streamdeck_cli.models.cache import ManifestCache
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+deploy_cli = typer.Typer()
+
+
+@deploy_cli.command(short_help=COMMAND_SHORT_HELP["deploy"])
+def deploy(
+    source_path: Path = typer.Argument(  # noqa: B008
+        ...,
+        exists=True,
+        help="Path to the plugin directory, or to an already-packed .streamDeckPlugin file",
+    ),
+    plugins_dirpath: Optional[Path] = typer.Option(  # noqa: UP045, B008
+        None,
+        "--target",
+        "-t",
+        help="Plugins directory to deploy the plugin's <uuid>.sdPlugin directory into (defaults to the Stream Deck app's, on macOS & Windows)",
+        show_default=False,
+    ),
+    debug_port: Optional[int] = typer.Option(  # noqa: UP045
+        None,
+        "--debug",
+        "-d",
+        help="Enable debug mode in the deployed plugin to listen for debug messages on the specified port (plugin directories only)",
+    ),
+    checksum: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--checksum",
+        "-c",
+        help="Compare the contents of files with the same size, rather than trusting their modification times",
+    ),
+    dry_run: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--dry-run",
+        "-n",
+        help="Only list the files that would be added, updated and deleted",
+    ),
+) -> None:
+    """Sync a plugin into a plugins directory, copying only the files that changed and deleting the removed ones."""
+    plugins_dirpath = plugins_dirpath or default_plugins_dirpath()
+    if plugins_dirpath is None:
+        typer.echo("ERROR: The Stream Deck app has no plugins directory on this platform, pass one with --target.")
+        raise typer.Exit(1)
+
+    with contextlib.ExitStack() as stack:
+        if source_path.is_dir():
+            plugin_uuid = validated_plugin_uuid(source_path)
+            source: DeploySource = DirectorySource(source_path, debug_port=debug_port)
+        else:
+            if debug_port is not None:
+                typer.echo("ERROR: Debug mode can only be enabled when deploying a plugin directory, pack the plugin with --debug instead.")
+                raise typer.Exit(1)
+
+            try:
+                archive_source, plugin_uuid = open_archive_source(source_path)
+            except (zipfile.BadZipFile, ValueError) as e:
+                typer.echo(f"ERROR: Not a valid package: {e}")
+                raise typer.Exit(1) from e
+
+            source = archive_source
+            stack.callback(archive_source.zip_file.close)
+
+        target_dirpath = plugins_dirpath / f"{plugin_uuid}{PLUGIN_DIRNAME_SUFFIX}"
+        result = deploy_plugin(source, target_dirpath, checksum=checksum, dry_run=dry_run)
+
+    typer.echo("\n".join(format_deploy_result(result, dry_run=dry_run)))
+
+
+def validated_plugin_uuid(plugin_dirpath: Path) -> str:
+    """Validate the plugin's manifest, and get its UUID."""
+    result = validate_plugin(plugin_dirpath, cache=ManifestCache.default())
+
+    if not result.succeeded:
+        typer.echo(f"ERROR: Manifest validation failed for plugin at '{plugin_dirpath}':")
+        for error in result.errors:
+            typer.echo(f"  - {error}")
+        raise typer.Exit(1)
+
+    return result.plugin_uuid  # type: ignore[return-value]
+
+
+
+if __name__ == "__main__":
+    deploy_cli()
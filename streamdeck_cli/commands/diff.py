@@ -0,0 +1,68 @@
+"""Compare two already-packed plugins, or two release directories."""
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path  # noqa: TC003 (Typer reads the annotations of the command's parameters at runtime)
+
+import typer
+
+from streamdeck_cli.commands.pack.release_diff import (
+    diff_releases,
+    format_archive_diff,
+    iter_content_diffs,
+)
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+diff_cli = typer.Typer()
+
+
+@diff_cli.command(short_help=COMMAND_SHORT_HELP["diff"])
+def diff(
+    old_path: Path = typer.Argument(  # noqa: B008
+        ...,
+        exists=True,
+        help="Path to the older .streamDeckPlugin file, or release directory",
+    ),
+    new_path: Path = typer.Argument(  # noqa: B008
+        ...,
+        exists=True,
+        help="Path to the newer .streamDeckPlugin file, or release directory",
+    ),
+    content: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--content",
+        "-c",
+        help="Also decompress the changed files to print a unified diff of their contents",
+    ),
+    exit_code: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--exit-code",
+        help="Exit with 1 if there are differences, like diff(1)",
+    ),
+) -> None:
+    """List the files added, removed and changed between two packages, from their archives' central directories."""
+    try:
+        archive_diffs = diff_releases(old_path, new_path)
+    except zipfile.BadZipFile as e:
+        typer.echo(f"ERROR: Not a valid package: {e}")
+        raise typer.Exit(1) from e
+
+    if not archive_diffs:
+        typer.echo("ERROR: No .streamDeckPlugin files found in the given directories.")
+        raise typer.Exit(1)
+
+    for archive_diff in archive_diffs:
+        typer.echo("\n".join(format_archive_diff(archive_diff)))
+
+        if content:
+            for _, diff_lines in iter_content_diffs(archive_diff):
+                typer.echo("\n".join(diff_lines))
+
+    if exit_code and any(archive_diff.has_changes for archive_diff in archive_diffs):
+        raise typer.Exit(1)
+
+
+
+if __name__ == "__main__":
+    diff_cli()
@@ -1,14 +1,24 @@
 """Pack/build a Stream Deck plugin into a .streamDeckPlugin file."""
+import contextlib
+import json
 import logging
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-import pathspec
 import typer
 
-from streamdeck_cli.commands.pack.autoversion import get_versioned_output_dirpath
-from streamdeck_cli.commands.pack.zip import archive_plugin_files, get_packignore_specification
-from streamdeck_cli.models.manifest import Manifest
+from streamdeck_cli.commands.pack.batch import BatchPackResult, pack_plugins
+from streamdeck_cli.commands.pack.build import (
+    PackOptions,
+    PackResult,
+    pack_plugin,
+    pack_plugin_to_stream,
+)
+from streamdeck_cli.commands.pack.size_report import format_archive_size_report
+from streamdeck_cli.commands.pack.watch import watch_and_repack
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+from streamdeck_cli.utils.plugin_paths import expand_plugin_dirpaths
 
 
 logger = logging.getLogger("streamdeck-cli")
@@ -18,59 +28,259 @@ logger.setLevel(logging.DEBUG)
 pack_cli = typer.Typer()
 
 
-@pack_cli.command()
-def pack(
-    plugin_dirpath: Path = typer.Argument(  # noqa: B008
-        ...,
-        default_factory=Path.cwd,
-        help="Path to the plugin directory",
+# Output "directory" that means writing the package to stdout.
+STDOUT_PATH = Path("-")
+
+
+@pack_cli.command(short_help=COMMAND_SHORT_HELP["pack"])
+def pack(  # noqa: PLR0913, PLR0917 (Typer makes an option of each parameter)
+    plugin_dirpaths: Optional[list[Path]] = typer.Argument(  # noqa: UP045, B008
+        None,
+        help="Path to the plugin directory (defaults to the current directory). Pass several paths or a glob pattern to pack many plugins at once",
+        show_default=False,
     ),
     output_dirpath: Path = typer.Option(  # noqa: B008
         ...,
         "--output",
         "-o",
         default_factory=lambda: Path.cwd() / "releases",
-        help="Output directory",
+        help="Output directory, or '-' to write the package to stdout instead of a release directory",
     ),
-    version: Optional[str] = None,  # noqa: UP007
+    version: Optional[str] = None,  # noqa: UP045
     debug_port: Optional[int] = typer.Option(
         None,
         "--debug",
         "-d",
         help="Enable debug mode in the packed plugin to listen for debug messages on the specified port",
     ),
+    use_cache: bool = typer.Option(  # noqa: FBT001
+        True,  # noqa: FBT003
+        "--cache/--no-cache",
+        help="Reuse already-compressed files from the compression cache kept in the output directory, and the manifest's last validation result if nothing it references changed",
+    ),
+    jobs: Optional[int] = typer.Option(  # noqa: UP045
+        None,
+        "--jobs",
+        "-j",
+        help="Number of files to compress in parallel, or of plugins to pack in parallel when packing many (0 to use every CPU core)",
+        show_default=False,
+    ),
+    compress_level: Optional[int] = typer.Option(  # noqa: UP045
+        None,
+        "--compress-level",
+        min=0,
+        max=9,
+        help="Deflate level for compressed files, overriding the plugin's pyproject.toml config (defaults to zlib's default level, 0 stores files uncompressed)",
+    ),
+    watch: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--watch",
+        "-w",
+        help="Keep running after packing, and repack the plugin every time its files change",
+    ),
+    poll: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--poll",
+        help="In watch mode, detect changes by polling the plugin directory instead of using inotify",
+    ),
+    reproducible: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--reproducible",
+        help="Make the package byte-identical for identical plugin files, with fixed timestamps (from SOURCE_DATE_EPOCH if set) and normalised permissions, and print its SHA-256 digest",
+    ),
+    dedupe: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--dedupe",
+        help="Hardlink the package to an identical earlier release's through a content-addressed store in the output directory (best with --reproducible)",
+    ),
+    precompile: Optional[str] = typer.Option(  # noqa: UP045
+        None,
+        "--precompile",
+        metavar="PYTHON_VERSION",
+        help="Precompile the plugin's Python sources to bytecode for this Python version (e.g. 3.12), which must be the one running the CLI, so the plugin starts faster",
+        show_default=False,
+    ),
+    optimize_assets: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--optimize-assets",
+        help="Losslessly shrink the icons and property inspector files (PNG, GIF, SVG, HTML, CSS, JS), caching the results by content",
+    ),
+    size_report: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--report",
+        help="Print the size of the package's largest files and directories, and how it changed since the previous release",
+    ),
+    show_timings: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--timings",
+        help="Print how long each phase of the pack took, the throughput, and the slowest files",
+    ),
+    stats_json_filepath: Optional[Path] = typer.Option(  # noqa: UP045, B008
+        None,
+        "--stats-json",
+        help="Write the timings of every phase and per-file statistics of the pack to this JSON file",
+    ),
 ) -> None:
     """Pack/build a Stream Deck plugin into a .streamDeckPlugin file."""
-    # Validate the manifest by initiating its model.
-    manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json")
+    plugin_dirpaths = expand_plugin_dirpaths(plugin_dirpaths or [Path.cwd()])
+    # Messages don't get mixed into the package when it's written to stdout.
+    err = output_dirpath == STDOUT_PATH
+
+    if not plugin_dirpaths:
+        typer.echo("ERROR: No plugin directories matched the given paths.", err=err)
+        raise typer.Exit(1)
 
-    # Determine the versioned output directory name
-    version_dirname = version or manifest.version
+    if watch and len(plugin_dirpaths) > 1:
+        typer.echo("ERROR: Watch mode can only be used with a single plugin directory.", err=err)
+        raise typer.Exit(1)
 
-    # Get the versioned output directory path
-    versioned_output_dirpath = get_versioned_output_dirpath(output_dirpath, version_dirname)
+    if output_dirpath == STDOUT_PATH and (watch or len(plugin_dirpaths) > 1):
+        typer.echo("ERROR: Only a single plugin, without watch mode, can be packed to stdout.", err=True)
+        raise typer.Exit(1)
 
-    # Define the full output file path for the plugin.
-    # The output file at this path will be a .streamDeckPlugin file, which will open the plugin in the Stream Deck app.
-    # The output file at this path is a zip file containing the files of the plugin, which the Stream Deck software unzips to a specific app directory.
-    output_filepath = versioned_output_dirpath / f"{manifest.uuid}.streamDeckPlugin"
-    logger.info("Output plugin file will be created at: %s", output_filepath)
+    if output_dirpath == STDOUT_PATH and size_report:
+        typer.echo("ERROR: A size report can only be made of a package written to a release directory.", err=True)
+        raise typer.Exit(1)
 
-    # Create the package directory
-    versioned_output_dirpath.mkdir(parents=True, exist_ok=True)
+    timings = show_timings or stats_json_filepath is not None
 
-    # Get the .packignore specification to filter out files that should not be included in the plugin package
-    pathignore_spec: pathspec.PathSpec = get_packignore_specification(plugin_dirpath)
+    # Packing several plugins at once: each plugin is packed in its own worker process.
+    if len(plugin_dirpaths) > 1:
+        options = PackOptions(
+            version=version, debug_port=debug_port, use_cache=use_cache, compress_level=compress_level, reproducible=reproducible,
+            dedupe=dedupe, timings=timings, precompile=precompile, optimize_assets=optimize_assets,
+        )
+        pack_many(
+            plugin_dirpaths, output_dirpath, options, max_workers=jobs or None,
+            show_timings=show_timings, stats_json_filepath=stats_json_filepath, size_report=size_report,
+        )
+        return
 
-    # Create the zip file and add the plugin files
-    archive_plugin_files(
-        plugin_dirpath,
-        output_filepath,
-        plugin_uuid=manifest.uuid,
-        packignore_spec=pathignore_spec,
+    options = PackOptions(
+        version=version,
         debug_port=debug_port,
+        use_cache=use_cache,
+        jobs=1 if jobs is None else jobs,
+        compress_level=compress_level,
+        reproducible=reproducible,
+        dedupe=dedupe,
+        timings=timings,
+        precompile=precompile,
+        optimize_assets=optimize_assets,
+    )
+
+    # Stream the package to stdout (e.g. to pipe it into an upload or a hash), without creating a release directory.
+    if output_dirpath == STDOUT_PATH:
+        result = pack_to_stdout(plugin_dirpaths[0], options)
+        echo_timings([(plugin_dirpaths[0], result)], show_timings, stats_json_filepath, err=True)
+        return
+
+    result = pack_plugin(plugin_dirpaths[0], output_dirpath, options)
+
+    if result.cache_stats is not None:
+        typer.echo(f"Compression cache: {result.cache_stats}.")
+
+    if reproducible:
+        typer.echo(f"SHA-256: {result.digest}")
+
+    if result.deduplicated:
+        typer.echo("Package is identical to an earlier release, and now shares its disk space.")
+
+    if size_report and result.output_filepath is not None:
+        typer.echo(format_archive_size_report(result.output_filepath))
+
+    echo_timings([(plugin_dirpaths[0], result)], show_timings, stats_json_filepath)
+
+    # Watch mode keeps rebuilding the same package in place, rather than creating a new release directory every time.
+    if watch:
+        watch_and_repack(plugin_dirpaths[0], output_dirpath, result.output_filepath, options, force_polling=poll)
+
+
+def pack_to_stdout(plugin_dirpath: Path, options: PackOptions) -> PackResult:
+    """Write the package to stdout, refusing to do so if stdout is a terminal.
+
+    Anything else printed while packing (e.g. errors) goes to stderr, so that stdout only holds the package.
+    """
+    if sys.stdout.isatty():
+        typer.echo("ERROR: Refusing to write the package to a terminal, redirect stdout to a file or pipe instead.", err=True)
+        raise typer.Exit(1)
+
+    sys.stdout.flush()
+    package_stream = sys.stdout.buffer
+    with contextlib.redirect_stdout(sys.stderr):
+        result = pack_plugin_to_stream(plugin_dirpath, package_stream, options)
+    package_stream.flush()
+
+    # The package itself is on stdout, so the digest goes to stderr.
+    if options.reproducible:
+        typer.echo(f"SHA-256: {result.digest}", err=True)
+
+    return result
+
+
+def pack_many(
+    plugin_dirpaths: list[Path],
+    output_dirpath: Path,
+    options: PackOptions,
+    max_workers: Optional[int],  # noqa: UP045
+    show_timings: bool = False,  # noqa: FBT001, FBT002
+    stats_json_filepath: Optional[Path] = None,  # noqa: UP045
+    size_report: bool = False,  # noqa: FBT001, FBT002
+) -> None:
+    """Pack several plugins concurrently, then print a summary with the status and timing of each of them."""
+    results = pack_plugins(plugin_dirpaths, output_dirpath, options, max_workers=max_workers)
+
+    failed_results = [result for result in results if not result.succeeded]
+    typer.echo(f"Packed {len(results) - len(failed_results)} of {len(results)} plugins:")
+
+    for result in results:
+        status = "OK" if result.succeeded else "FAILED"
+        detail = result.output_filepath if result.succeeded else (result.error or "").splitlines()[0]
+        if result.succeeded and options.reproducible:
+            detail = f"{detail}  sha256:{result.digest}"
+        typer.echo(f"  {status:<7} {result.seconds:>7.2f}s  {result.plugin_dirpath}  {detail}")
+
+    if size_report:
+        for result in results:
+            if result.output_filepath is not None:
+                typer.echo(f"\n{result.plugin_dirpath}:")
+                typer.echo(format_archive_size_report(result.output_filepath))
+
+    echo_timings(
+        [(result.plugin_dirpath, result) for result in results if result.succeeded], show_timings, stats_json_filepath,
     )
 
+    for result in failed_results:
+        typer.echo(f"\nERROR: Failed to pack plugin at '{result.plugin_dirpath}':\n{result.error}")
+
+    if failed_results:
+        raise typer.Exit(1)
+
+
+def echo_timings(
+    results: list[tuple[Path, Union[PackResult, BatchPackResult]]],  # noqa: UP007
+    show_timings: bool,  # noqa: FBT001
+    stats_json_filepath: Optional[Path],  # noqa: UP045
+    err: bool = False,  # noqa: FBT001, FBT002
+) -> None:
+    """Print the timings of each packed plugin and/or write them to a JSON file, as asked by the options."""
+    timed_results = [(plugin_dirpath, result.timings) for plugin_dirpath, result in results if result.timings is not None]
+
+    if show_timings:
+        for plugin_dirpath, timings in timed_results:
+            if len(results) > 1:
+                typer.echo(f"\n{plugin_dirpath}:", err=err)
+            typer.echo(timings.format_report(), err=err)
+
+    if stats_json_filepath is not None:
+        stats = {
+            "plugins": [
+                {"plugin_dirpath": str(plugin_dirpath), **timings.to_dict()}
+                for plugin_dirpath, timings in timed_results
+            ],
+        }
+        stats_json_filepath.write_text(json.dumps(stats, indent=2))
+
 
 if __name__ == "__main__":
     pack_cli()
@@ -1,5 +1,33 @@
+"""Pick the release directory of each pack, numbering the releases of the same version."""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
 import re
-from pathlib import Path
+import sys
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# Name of the file (within the output directory) holding the last subversion released for each version.
+RELEASE_INDEX_FILENAME = ".releases-index.json"
+RELEASE_INDEX_LOCK_FILENAME = ".releases-index.lock"
+
+# Bump this whenever the layout of the index file changes, so that old indexes get rebuilt instead of misread.
+RELEASE_INDEX_FORMAT_VERSION = 1
+
+# A release directory is named after the version, optionally followed by a subversion, e.g. "1.0.0" or "1.0.0-2".
+RELEASE_DIRNAME_PATTERN = re.compile(r"^(?P<version>.+?)(?:-(?P<subversion>\d+))?$")
 
 
 def get_subversion(full_version: Path) -> int:
@@ -19,26 +47,166 @@ def get_versioned_output_dirpath(output_dirpath: Path, plugin_version: str) -> P
     """Get the versioned output directory path for the plugin to be created.
 
     This function will check for previous releases with the same version and increment the subversion if necessary.
+    Only release directories named exactly after the version, optionally followed by a subversion, count as previous
+    releases (so "1.0.0.1" or "1.0.01" aren't releases of "1.0.0").
+    This only looks at the directory without claiming anything, see `allocate_versioned_output_dirpath` for that.
+    """
+    last_subversion = scan_release_subversions(output_dirpath).get(plugin_version)
+
+    return output_dirpath / get_release_dirname(plugin_version, last_subversion)
+
+
+def allocate_versioned_output_dirpath(output_dirpath: Path, plugin_version: str) -> Path:
+    """Create the next versioned output directory for the plugin, and return its path.
+
+    The last subversion of each version is kept in an index file in the output directory, so that finding the next one
+    doesn't depend on how many releases there already are. The index is rebuilt from the directory listing if it is
+    missing, unreadable, or out of date (e.g. because of releases made by hand). Allocation happens under a file lock,
+    and the release directory is created before the lock is released, so that concurrent packs (e.g. parallel CI jobs
+    sharing the output directory) never end up with the same release directory.
     """
-    # Check for previous releases with the same version and increment the version if necessary
-    previous_releases_with_same_version: list[Path] = sorted(output_dirpath.glob(f"{plugin_version}*"), key=get_subversion)
+    output_dirpath.mkdir(parents=True, exist_ok=True)
+
+    with _locked(output_dirpath / RELEASE_INDEX_LOCK_FILENAME):
+        index = _load_release_index(output_dirpath)
+        if index is None:
+            index = scan_release_subversions(output_dirpath)
+
+        while True:
+            last_subversion = index.get(plugin_version)
+            versioned_output_dirpath = output_dirpath / get_release_dirname(plugin_version, last_subversion)
+
+            try:
+                versioned_output_dirpath.mkdir()
+            except FileExistsError:
+                # The index is behind the directory listing, so it can't be trusted for any version.
+                logger.info("Release index of %s is out of date, rebuilding it.", output_dirpath)
+                index = scan_release_subversions(output_dirpath)
+                if index.get(plugin_version) == last_subversion:
+                    # Not a release directory per the naming pattern (e.g. a file), so skip past it.
+                    index[plugin_version] = 0 if last_subversion is None else last_subversion + 1
+                continue
+
+            index[plugin_version] = 0 if last_subversion is None else last_subversion + 1
+            _save_release_index(output_dirpath, index)
+            return versioned_output_dirpath
+
+
+def get_release_dirname(plugin_version: str, last_subversion: int | None) -> str:
+    """Get the name of the release directory that comes after the given last subversion (None if there's no release yet)."""
+    if last_subversion is None:
+        return plugin_version
+
+    return f"{plugin_version}-{last_subversion + 1}"
+
+
+def scan_release_subversions(output_dirpath: Path) -> dict[str, int]:
+    """List the output directory to find the last subversion of every version (0 for a release without subversion)."""
+    last_subversions: dict[str, int] = {}
 
-    if previous_releases_with_same_version:
-        # If there is only one release with the same version, just append "-1" to the version
-        if len(previous_releases_with_same_version) == 1:
-            plugin_version = f"{plugin_version}-1"
+    try:
+        with os.scandir(output_dirpath) as entries:
+            dirnames = [entry.name for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return last_subversions
+
+    for dirname in dirnames:
+        release_match = RELEASE_DIRNAME_PATTERN.match(dirname)
+        if release_match is None:
+            continue
+
+        version = release_match["version"]
+        subversion = int(release_match["subversion"] or 0)
+        last_subversions[version] = max(last_subversions.get(version, 0), subversion)
+
+    return last_subversions
+
+
+def list_release_dirpaths(output_dirpath: Path) -> list[Path]:
+    """List the release directories of the output directory, from the oldest version & subversion to the newest."""
+    try:
+        with os.scandir(output_dirpath) as entries:
+            dirnames = [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+    except FileNotFoundError:
+        return []
+
+    releases: list[tuple[tuple[tuple[int, int | str], ...], int, str]] = []
+    for dirname in dirnames:
+        release_match = RELEASE_DIRNAME_PATTERN.match(dirname)
+        if release_match is None:
+            continue
+        # Numeric parts of the version compare as numbers, so that "1.0.10" comes after "1.0.9".
+        version_key = tuple((0, int(part)) if part.isdigit() else (1, part) for part in release_match["version"].split("."))
+        releases.append((version_key, int(release_match["subversion"] or 0), dirname))
+
+    return [output_dirpath / dirname for *_, dirname in sorted(releases)]  # type: ignore[misc]
+
+
+def get_previous_release_dirpath(versioned_output_dirpath: Path) -> Path | None:
+    """Get the release directory that comes right before the given one in its output directory, if any."""
+    release_dirpaths = list_release_dirpaths(versioned_output_dirpath.parent)
+    if versioned_output_dirpath not in release_dirpaths:
+        return None
+
+    index = release_dirpaths.index(versioned_output_dirpath)
+    return release_dirpaths[index - 1] if index > 0 else None
+
+
+def _load_release_index(output_dirpath: Path) -> dict[str, int] | None:
+    index_filepath = output_dirpath / RELEASE_INDEX_FILENAME
+
+    try:
+        with index_filepath.open("r") as f:
+            index = json.load(f)
+
+    except FileNotFoundError:
+        return None
+
+    except (OSError, json.JSONDecodeError):
+        logger.warning("Release index at %s is unreadable, rebuilding it.", index_filepath)
+        return None
+
+    if index.get("version") != RELEASE_INDEX_FORMAT_VERSION:
+        return None
+
+    return index["last_subversions"]
+
+
+def _save_release_index(output_dirpath: Path, last_subversions: dict[str, int]) -> None:
+    index_filepath = output_dirpath / RELEASE_INDEX_FILENAME
+    # Write to a temporary file first, so that an interrupted pack can't leave a half-written index behind.
+    tmp_filepath = index_filepath.with_suffix(".tmp")
+    with tmp_filepath.open("w") as f:
+        json.dump({"version": RELEASE_INDEX_FORMAT_VERSION, "last_subversions": last_subversions}, f)
+    tmp_filepath.replace(index_filepath)
+
+
+@contextlib.contextmanager
+def _locked(lock_filepath: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the given file, waiting for other processes to release it first."""
+    with lock_filepath.open("a+b") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt  # noqa: PLC0415 (only available on Windows)
+
+            # msvcrt.locking only retries for 10 seconds, so keep at it until the lock is acquired.
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
 
-        # If there are multiple releases with the same version, then sub-versions have already been appended, so we need to increment the last sub-version
         else:
-            # Get the last release directory name
-            previous_release_dirpath = previous_releases_with_same_version[-1]
-            # Use regex to extract sub-versions from the previous release directory name
-            previous_release_dirname_subversion = get_subversion(previous_release_dirpath)
-
-            # Get the previous release directory name before the sub-version
-            previous_release_dirname_no_subversion = previous_release_dirpath.name.split("-")[0]
-            # Increment the sub-version and create the new versioned directory name for the plugin
-            plugin_version = f"{previous_release_dirname_no_subversion}-{int(previous_release_dirname_subversion)+1}"
-
-    # Return the output directory path for the new version of the plugin to be created
-    return output_dirpath / plugin_version
\ No newline at end of file
+            import fcntl  # noqa: PLC0415 (only available on Unix)
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,89 @@
+"""Pack several plugins at once, such as all the plugins of a monorepo."""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import typer
+
+from streamdeck_cli.commands.pack.build import PackOptions, load_manifest, pack_plugin
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from streamdeck_cli.commands.pack.timings import PackTimings
+
+
+
+@dataclass(frozen=True)
+class BatchPackResult:
+    """Outcome of packing one plugin of a batch, which is sent back from the worker process."""
+    plugin_dirpath: Path
+    seconds: float
+    plugin_uuid: str | None = None
+    output_filepath: Path | None = None
+    digest: str | None = None
+    timings: PackTimings | None = None
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the plugin got packed."""
+        return self.error is None
+
+
+def pack_plugins(
+    plugin_dirpaths: list[Path],
+    output_dirpath: Path,
+    options: PackOptions,
+    max_workers: int | None = None,
+) -> list[BatchPackResult]:
+    """Pack every plugin concurrently across a pool of worker processes.
+
+    Each plugin gets its releases in its own subdirectory of the output directory, named after its UUID, so that
+    plugins sharing a version number don't bump each other's subversions. A plugin failing to validate or pack
+    doesn't stop the others. Results are returned in the same order as the plugin directories.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(plugin_dirpaths) or 1)) as executor:
+        futures = {
+            executor.submit(_pack_plugin_in_worker, plugin_dirpath, output_dirpath, options): plugin_dirpath
+            for plugin_dirpath in plugin_dirpaths
+        }
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+
+    return [results[plugin_dirpath] for plugin_dirpath in plugin_dirpaths]
+
+
+def _pack_plugin_in_worker(plugin_dirpath: Path, output_dirpath: Path, options: PackOptions) -> BatchPackResult:
+    start = time.perf_counter()
+
+    try:
+        # The manifest has to be validated first to know which subdirectory the plugin's releases go in.
+        manifest = load_manifest(plugin_dirpath, options)
+        result = pack_plugin(plugin_dirpath, output_dirpath / manifest.uuid, options, manifest=manifest)
+
+    except typer.Exit as e:
+        error = f"Exited with code {e.exit_code}"
+
+    # Any other failure, such as a validation error, should be reported instead of stopping the batch.
+    except Exception as e:  # noqa: BLE001
+        error = str(e) or type(e).__name__
+
+    else:
+        return BatchPackResult(
+            plugin_dirpath=plugin_dirpath,
+            seconds=time.perf_counter() - start,
+            plugin_uuid=result.manifest.uuid,
+            output_filepath=result.output_filepath,
+            digest=result.digest,
+            timings=result.timings,
+        )
+
+    return BatchPackResult(plugin_dirpath=plugin_dirpath, seconds=time.perf_counter() - start, error=error)
+
@@ -0,0 +1,353 @@
+"""Build the .streamDeckPlugin file of a single plugin, independently of how the pack command was invoked."""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO
+
+from streamdeck_cli.commands.pack.autoversion import allocate_versioned_output_dirpath
+from streamdeck_cli.commands.pack.bytecode import (
+    BytecodeCache,
+    BytecodeCompiler,
+    check_target_version,
+)
+from streamdeck_cli.commands.pack.cache import CacheStats, CompressionCache
+from streamdeck_cli.commands.pack.compression import CompressionPolicy
+from streamdeck_cli.commands.pack.optimize import AssetCache, AssetOptimizer
+from streamdeck_cli.commands.pack.store import ArtifactStore
+from streamdeck_cli.commands.pack.timings import PackTimings, timed
+from streamdeck_cli.commands.pack.zip import archive_plugin_files, get_packignore_matcher
+from streamdeck_cli.models.cache import ManifestCache
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from streamdeck_cli.commands.pack.ignore import IgnoreMatcher
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+@dataclass(frozen=True)
+class PackOptions:
+    """Options of the pack command that apply to every plugin being packed."""
+    version: str | None = None
+    debug_port: int | None = None
+    use_cache: bool = True
+    jobs: int = 1
+    compress_level: int | None = None
+    reproducible: bool = False
+    dedupe: bool = False
+    # Whether to measure the time spent in each phase of the pack, see `PackTimings`.
+    timings: bool = False
+    # Python version (e.g. "3.12") to precompile the plugin's sources to bytecode for, if any.
+    precompile: str | None = None
+    # Whether to losslessly shrink icons and property inspector files, see `AssetOptimizer`.
+    optimize_assets: bool = False
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    """Outcome of writing the archive of a plugin."""
+    # SHA-256 digest of the archive, in hex.
+    digest: str
+    cache_stats: CacheStats | None = None
+
+
+@dataclass(frozen=True)
+class PackResult:
+    """Outcome of packing a single plugin."""
+    manifest: Manifest
+    # None if the package was written to a stream rather than to a file.
+    output_filepath: Path | None
+    cache_stats: CacheStats | None = None
+    digest: str | None = None
+    # Whether the package turned out identical to an earlier one, and now shares its disk space.
+    deduplicated: bool = False
+    # Only collected if the pack options ask for them.
+    timings: PackTimings | None = None
+
+
+@dataclass(frozen=True)
+class ArchivePlan:
+    """Everything the archive of an already-validated plugin gets written with, see `prepare_plugin_archive`."""
+    plugin_dirpath: Path
+    manifest: Manifest
+    options: PackOptions
+    packignore_matcher: IgnoreMatcher
+    compression_policy: CompressionPolicy
+    cache: CompressionCache | None = None
+    bytecode_compiler: BytecodeCompiler | None = None
+    asset_optimizer: AssetOptimizer | None = None
+
+    def write(self, stream: BinaryIO, timings: PackTimings | None = None) -> ArchiveResult:
+        """Write the archive to a binary stream, hashing it on the way."""
+        digesting_stream = DigestingWriter(stream)
+
+        # Create the zip file and add the plugin files
+        archive_plugin_files(
+            self.plugin_dirpath,
+            digesting_stream,
+            plugin_uuid=self.manifest.uuid,
+            packignore_spec=self.packignore_matcher,
+            debug_port=self.options.debug_port,
+            cache=self.cache,
+            jobs=self.options.jobs,
+            compression_policy=self.compression_policy,
+            reproducible=self.options.reproducible,
+            timings=timings,
+            bytecode_compiler=self.bytecode_compiler,
+            asset_optimizer=self.asset_optimizer,
+        )
+
+        return ArchiveResult(digest=digesting_stream.hexdigest(), cache_stats=self.cache.stats if self.cache is not None else None)
+
+    def write_file(self, output_filepath: Path, timings: PackTimings | None = None) -> ArchiveResult:
+        """Write the archive at the given output file path.
+
+        The archive is first written to a temporary file next to the output file, then moved in place, so that the
+        output file is never seen half-written (e.g. when it is rebuilt over and over by watch mode).
+        """
+        tmp_output_filepath = output_filepath.with_name(f".{output_filepath.name}.tmp")
+        try:
+            with tmp_output_filepath.open("wb") as f:
+                archive_result = self.write(f, timings=timings)
+            tmp_output_filepath.replace(output_filepath)
+
+        finally:
+            tmp_output_filepath.unlink(missing_ok=True)
+
+        return archive_result
+
+
+class DigestingWriter(io.RawIOBase):
+    """Write-only stream that hashes everything written through it to the underlying stream.
+
+    It can't seek, so that everything written is hashed exactly once, in order, and `zipfile` treats it like a pipe.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        """Wrap the stream the package gets written to."""
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def writable(self) -> bool:
+        """Tell that the stream can be written to."""
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        """Hash the data, and write it to the underlying stream."""
+        self._hash.update(data)
+        self._stream.write(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Flush the underlying stream."""
+        self._stream.flush()
+
+    def hexdigest(self) -> str:
+        """Get the SHA-256 digest of everything written so far."""
+        return self._hash.hexdigest()
+
+
+def load_manifest(plugin_dirpath: Path, options: PackOptions) -> Manifest:
+    """Validate the plugin's manifest, reusing the outcome of a previous validation from the manifest cache if possible."""
+    cache = ManifestCache.default() if options.use_cache else None
+    return Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+
+
+def pack_plugin(
+    plugin_dirpath: Path,
+    output_dirpath: Path,
+    options: PackOptions,
+    manifest: Manifest | None = None,
+) -> PackResult:
+    """Validate a plugin and pack it into a new versioned release directory under the output directory.
+
+    The manifest can be passed in if it has already been validated.
+    """
+    start = time.perf_counter()
+    timings = PackTimings() if options.timings else None
+
+    # Validate the manifest by initiating its model.
+    if manifest is None:
+        with timed(timings, "manifest"):
+            manifest = load_manifest(plugin_dirpath, options)
+
+    # Work out what goes into the archive first, so that invalid options or .packignore files don't claim a release
+    # directory for a pack that fails.
+    archive_plan = prepare_plugin_archive(plugin_dirpath, manifest, options, cache_output_dirpath=output_dirpath, timings=timings)
+
+    # Determine the versioned output directory name
+    version_dirname = options.version or manifest.version
+
+    # Create the package directory, at the versioned output directory path
+    with timed(timings, "allocate"):
+        versioned_output_dirpath = allocate_versioned_output_dirpath(output_dirpath, version_dirname)
+
+    # Define the full output file path for the plugin.
+    # The output file at this path will be a .streamDeckPlugin file, which will open the plugin in the Stream Deck app.
+    # The output file at this path is a zip file containing the files of the plugin, which the Stream Deck software unzips to a specific app directory.
+    output_filepath = versioned_output_dirpath / f"{manifest.uuid}.streamDeckPlugin"
+    logger.info("Output plugin file will be created at: %s", output_filepath)
+
+    archive_result = archive_plan.write_file(output_filepath, timings=timings)
+
+    # Share the disk space of identical packages across release directories.
+    with timed(timings, "dedupe"):
+        deduplicated = (
+            ArtifactStore.for_output_dir(output_dirpath).add(output_filepath, archive_result.digest)
+            if options.dedupe else False
+        )
+
+    if timings is not None:
+        timings.total_seconds = time.perf_counter() - start
+
+    return PackResult(
+        manifest=manifest,
+        output_filepath=output_filepath,
+        cache_stats=archive_result.cache_stats,
+        digest=archive_result.digest,
+        deduplicated=deduplicated,
+        timings=timings,
+    )
+
+
+def pack_plugin_to_stream(
+    plugin_dirpath: Path,
+    stream: BinaryIO,
+    options: PackOptions,
+    manifest: Manifest | None = None,
+    output_dirpath: Path | None = None,
+) -> PackResult:
+    """Validate a plugin and write its package to a binary stream, such as stdout or an in-memory buffer.
+
+    The stream doesn't need to be seekable. Nothing is written to disk, unless an output directory is given to keep the
+    compression cache in.
+    """
+    start = time.perf_counter()
+    timings = PackTimings() if options.timings else None
+
+    if manifest is None:
+        with timed(timings, "manifest"):
+            manifest = load_manifest(plugin_dirpath, options)
+
+    archive_result = write_plugin_archive(
+        plugin_dirpath, stream, manifest, options, cache_output_dirpath=output_dirpath, timings=timings,
+    )
+
+    if timings is not None:
+        timings.total_seconds = time.perf_counter() - start
+
+    return PackResult(
+        manifest=manifest,
+        output_filepath=None,
+        cache_stats=archive_result.cache_stats,
+        digest=archive_result.digest,
+        timings=timings,
+    )
+
+
+def pack_plugin_to_bytes(
+    plugin_dirpath: Path,
+    options: PackOptions | None = None,
+    manifest: Manifest | None = None,
+    output_dirpath: Path | None = None,
+) -> bytes:
+    """Validate a plugin and get the contents of its package, without writing it to disk."""
+    buffer = io.BytesIO()
+    pack_plugin_to_stream(plugin_dirpath, buffer, options or PackOptions(), manifest=manifest, output_dirpath=output_dirpath)
+
+    return buffer.getvalue()
+
+
+def build_plugin_archive(
+    plugin_dirpath: Path,
+    output_filepath: Path,
+    output_dirpath: Path,
+    manifest: Manifest,
+    options: PackOptions,
+    timings: PackTimings | None = None,
+) -> ArchiveResult:
+    """Build the archive of an already-validated plugin at the given output file path.
+
+    The compression cache is kept in the output directory. See `ArchivePlan.write_file` for how the file gets written.
+    """
+    archive_plan = prepare_plugin_archive(plugin_dirpath, manifest, options, cache_output_dirpath=output_dirpath, timings=timings)
+    return archive_plan.write_file(output_filepath, timings=timings)
+
+
+def write_plugin_archive(
+    plugin_dirpath: Path,
+    stream: BinaryIO,
+    manifest: Manifest,
+    options: PackOptions,
+    cache_output_dirpath: Path | None = None,
+    timings: PackTimings | None = None,
+) -> ArchiveResult:
+    """Write the archive of an already-validated plugin to a binary stream, hashing it on the way.
+
+    The compression cache is kept in the given output directory, and isn't used if there's none.
+    """
+    archive_plan = prepare_plugin_archive(plugin_dirpath, manifest, options, cache_output_dirpath=cache_output_dirpath, timings=timings)
+    return archive_plan.write(stream, timings=timings)
+
+
+def prepare_plugin_archive(
+    plugin_dirpath: Path,
+    manifest: Manifest,
+    options: PackOptions,
+    cache_output_dirpath: Path | None = None,
+    timings: PackTimings | None = None,
+) -> ArchivePlan:
+    """Load everything the archive of an already-validated plugin gets written with, checking the options on the way.
+
+    The compression cache is kept in the given output directory, and isn't used if there's none.
+    """
+    # Get the .packignore specification to filter out files that should not be included in the plugin package
+    with timed(timings, "packignore"):
+        packignore_matcher = get_packignore_matcher(plugin_dirpath)
+
+    # Decide how each file gets compressed, from the CLI options and the plugin's pyproject.toml config.
+    compression_policy = CompressionPolicy.from_config(plugin_dirpath, compresslevel=options.compress_level)
+
+    asset_optimizer = (
+        AssetOptimizer.for_manifest(manifest, plugin_dirpath, cache=AssetCache.default() if options.use_cache else None)
+        if options.optimize_assets else None
+    )
+    # Cached entries of optimised files are only valid for the same optimisations.
+    cache_fingerprint = (
+        f"{compression_policy.fingerprint}/{asset_optimizer.fingerprint}"
+        if asset_optimizer is not None else compression_policy.fingerprint
+    )
+
+    # Load the compression cache, so that files unchanged since the last pack don't get compressed all over again.
+    with timed(timings, "cache"):
+        cache = (
+            CompressionCache.for_plugin(cache_output_dirpath, manifest.uuid, cache_fingerprint)
+            if options.use_cache and cache_output_dirpath is not None else None
+        )
+
+    # Precompile the plugin's Python sources, keeping their bytecode next to the compression cache.
+    bytecode_compiler = None
+    if options.precompile is not None:
+        check_target_version(options.precompile)
+        bytecode_cache = BytecodeCache.for_compression_cache(cache) if cache is not None else None
+        bytecode_compiler = BytecodeCompiler(cache=bytecode_cache, jobs=options.jobs)
+
+    return ArchivePlan(
+        plugin_dirpath=plugin_dirpath,
+        manifest=manifest,
+        options=options,
+        packignore_matcher=packignore_matcher,
+        compression_policy=compression_policy,
+        cache=cache,
+        bytecode_compiler=bytecode_compiler,
+        asset_optimizer=asset_optimizer,
+    )
@@ -0,0 +1,211 @@
+"""Precompile the Python sources of a plugin to bytecode, so that the plugin doesn't compile them on every cold start."""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import posixpath
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import typer
+
+
+if TYPE_CHECKING:
+    from typing_extensions import Self  # noqa: UP035
+
+    from streamdeck_cli.commands.pack.cache import CompressionCache
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+PYCACHE_DIRNAME = "__pycache__"
+
+# Name of the directory (within a plugin's compression cache directory) holding its already-compiled bytecode.
+BYTECODE_CACHE_DIRNAME = "bytecode"
+
+# Flags of a .pyc file whose validity is checked against the hash of its source, rather than its mtime (see PEP 552).
+CHECKED_HASH_FLAGS = 0b11
+
+
+def is_python_source(relpath: str) -> bool:
+    """Check whether a plugin file is a Python source file, to compile to bytecode."""
+    return relpath.endswith(".py")
+
+
+def is_in_pycache(relpath: str) -> bool:
+    """Check whether a plugin file is in a `__pycache__` directory, whose bytecode would get stale."""
+    return PYCACHE_DIRNAME in relpath.split("/")
+
+
+def get_pyc_relpath(relpath: str) -> str:
+    """Get the path of the bytecode of a source file, in the `__pycache__` directory next to it, like the import system."""
+    dirname, filename = posixpath.split(relpath)
+    return posixpath.join(dirname, PYCACHE_DIRNAME, f"{filename[:-len('.py')]}.{sys.implementation.cache_tag}.pyc")
+
+
+def check_target_version(target_version: str) -> None:
+    """Check that bytecode for the given Python version (e.g. "3.12") can be compiled.
+
+    Bytecode is specific to a Python version, and can only be compiled by that version's interpreter, so the target
+    version has to be the one running the CLI.
+    """
+    running_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+    if sys.implementation.cache_tag is None:
+        typer.echo(f"ERROR: {sys.implementation.name} can't compile Python bytecode.")
+        raise typer.Exit(1)
+
+    if target_version != running_version:
+        typer.echo(
+            f"ERROR: Bytecode can only be compiled for the Python version running streamdeck-cli ({running_version}), "
+            f"run it with Python {target_version} to precompile the plugin for that version.",
+        )
+        raise typer.Exit(1)
+
+
+def compile_bytecode(source: bytes, relpath: str) -> bytes | None:
+    """Compile a source file to the contents of its .pyc file, or return None if it doesn't compile.
+
+    The .pyc file uses checked-hash invalidation, so that the interpreter trusts it as long as the source it was compiled
+    from is unchanged, no matter the mtimes the files get when extracted from the package.
+    """
+    try:
+        # Marshalled strings record whether they're interned, so intern the filename for the bytecode not to depend on
+        # whether the caller's string happened to be (e.g. pathlib interns path parts, but unpickled strings aren't).
+        code = compile(source, sys.intern(relpath), "exec", dont_inherit=True, optimize=0)
+    except (SyntaxError, ValueError) as e:
+        logger.warning("Not precompiling '%s', which doesn't compile: %s", relpath, e)
+        return None
+
+    return b"".join([
+        importlib.util.MAGIC_NUMBER,
+        CHECKED_HASH_FLAGS.to_bytes(4, "little"),
+        importlib.util.source_hash(source),
+        marshal.dumps(code),
+    ])
+
+
+class BytecodeCache:
+    """On-disk cache of already-compiled bytecode, so that unchanged modules don't get compiled again on the next pack.
+
+    Bytecode is keyed by the source's content hash and path (which ends up in the code objects), and by the interpreter
+    that compiled it. Entries that weren't used by a pack are dropped when saving.
+    """
+
+    def __init__(self, cache_dirpath: Path):
+        """Create a cache kept in the given directory, use `for_compression_cache` to get the cache of a plugin."""
+        self.cache_dirpath = cache_dirpath
+        self._used_keys: set[str] = set()
+
+    @classmethod
+    def for_compression_cache(cls, compression_cache: CompressionCache) -> Self:
+        """Get the bytecode cache of a plugin, which lives in its compression cache directory."""
+        return cls(compression_cache.cache_dirpath / BYTECODE_CACHE_DIRNAME)
+
+    @staticmethod
+    def key(content_hash: str, relpath: str) -> str:
+        """Get the cache key of a source's bytecode."""
+        return hashlib.sha256(
+            f"{content_hash}\0{relpath}\0{importlib.util.MAGIC_NUMBER.hex()}".encode(),
+        ).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Get cached bytecode, or None if it isn't in the cache."""
+        self._used_keys.add(key)
+        try:
+            return (self.cache_dirpath / f"{key}.pyc").read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Add bytecode to the cache."""
+        self.cache_dirpath.mkdir(parents=True, exist_ok=True)
+        (self.cache_dirpath / f"{key}.pyc").write_bytes(data)
+        self._used_keys.add(key)
+
+    def save(self) -> None:
+        """Drop the bytecode that wasn't used by this pack, e.g. of modules that changed or got removed."""
+        try:
+            with os.scandir(self.cache_dirpath) as entries:
+                stale_filepaths = [Path(entry.path) for entry in entries if entry.name[:-len(".pyc")] not in self._used_keys]
+        except FileNotFoundError:
+            return
+
+        for stale_filepath in stale_filepaths:
+            stale_filepath.unlink()
+
+
+class BytecodeCompiler:
+    """Compiles the Python sources of a plugin, taking already-compiled ones from the cache, and the rest in parallel.
+
+    Compiling holds the GIL, so modules are compiled across worker processes rather than threads. A `jobs` value of 0
+    or less means one job per CPU core.
+    """
+
+    def __init__(self, cache: BytecodeCache | None = None, jobs: int = 1):
+        """Create a compiler, which takes already-compiled modules from the cache if given."""
+        self.cache = cache
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    def compile_plugin_files(
+        self,
+        plugin_dirpath: Path,
+        relpaths: list[str],
+        compression_cache: CompressionCache | None = None,
+    ) -> dict[str, bytes]:
+        """Compile the given source files of the plugin, returning the .pyc contents of each (that compiled) by its path.
+
+        The compression cache, if given, saves reading & hashing sources that haven't been touched since the last pack.
+        """
+        compiled: dict[str, bytes] = {}
+        # Sources that aren't in the bytecode cache, along with their cache key.
+        uncompiled: list[tuple[str, bytes, str | None]] = []
+
+        for relpath in relpaths:
+            filepath = plugin_dirpath / relpath
+            source: bytes | None = None
+            key: str | None = None
+
+            if self.cache is not None:
+                cached = compression_cache.lookup_by_stat(relpath, filepath.stat()) if compression_cache is not None else None
+                if cached is not None:
+                    content_hash = cached[0]
+                else:
+                    source = filepath.read_bytes()
+                    content_hash = hashlib.sha256(source).hexdigest()
+
+                key = BytecodeCache.key(content_hash, relpath)
+                if (data := self.cache.get(key)) is not None:
+                    compiled[relpath] = data
+                    continue
+
+            uncompiled.append((relpath, filepath.read_bytes() if source is None else source, key))
+
+        # zip's `strict` is only available as of Python 3.10, and _compile_many returns one result per source anyway.
+        for (relpath, _, key), data in zip(uncompiled, self._compile_many(uncompiled)):  # noqa: B905
+            if data is None:
+                continue
+            compiled[relpath] = data
+            if self.cache is not None and key is not None:
+                self.cache.put(key, data)
+
+        return compiled
+
+    def _compile_many(self, uncompiled: list[tuple[str, bytes, str | None]]) -> list[bytes | None]:
+        sources = [source for _, source, _ in uncompiled]
+        relpaths = [relpath for relpath, _, _ in uncompiled]
+
+        # Starting worker processes only pays off with more than one module to compile.
+        if self.jobs == 1 or len(uncompiled) < 2:  # noqa: PLR2004
+            return list(map(compile_bytecode, sources, relpaths))
+
+        max_workers = min(self.jobs, len(uncompiled))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(compile_bytecode, sources, relpaths, chunksize=max(len(uncompiled) // (max_workers * 4), 1)))
@@ -0,0 +1,196 @@
+"""Persistent per-file compression cache used to speed up repeated packs of the same plugin."""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from streamdeck_cli.commands.pack.compression import CompressedEntry
+
+
+if TYPE_CHECKING:
+    import os
+    from pathlib import Path
+
+    from typing_extensions import Self  # noqa: UP035
+
+    from streamdeck_cli.commands.pack.compression import CompressionSettings
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# Name of the directory (within the pack output directory) holding the compression caches of each plugin.
+CACHE_DIRNAME = ".pack-cache"
+
+# Bump this whenever the layout of the index file changes, so that old caches get discarded instead of misread.
+CACHE_FORMAT_VERSION = 2
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a single pack run."""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def total(self) -> int:
+        """Number of files looked up in the cache."""
+        return self.hits + self.misses
+
+    def __str__(self) -> str:
+        """Summarise the counters, e.g. for the pack command's output."""
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+class CompressionCache:
+    """On-disk cache of already-compressed plugin files.
+
+    Files are tracked by their path relative to the plugin directory, along with their size, mtime and content hash.
+    The compressed data itself is stored as a blob keyed by the content hash and the compression parameters,
+    so that an unchanged file (or an identical file under another path) can be copied raw into a new archive.
+    """
+
+    def __init__(
+        self,
+        cache_dirpath: Path,
+        files: dict[str, dict[str, Any]],
+        blobs: dict[str, dict[str, int]],
+        fingerprint: str = "",
+    ):
+        """Create a cache from its entries, use `load` to read it from its directory."""
+        self.cache_dirpath = cache_dirpath
+        self.fingerprint = fingerprint
+        self.stats = CacheStats()
+
+        self._files = files
+        self._blobs = blobs
+        # Keep track of which files & blobs were used during this run, so stale entries can be dropped when saving.
+        self._seen_files: set[str] = set()
+        self._used_blobs: set[str] = set()
+
+    @classmethod
+    def load(cls, cache_dirpath: Path, fingerprint: str = "") -> Self:
+        """Load the cache from the given directory, starting from an empty cache if it is missing or unreadable.
+
+        The fingerprint identifies the settings that decide how files get compressed. If it differs from the one the
+        cache was saved with, the per-file records are discarded, since the same file may now be compressed differently.
+        """
+        index_filepath = cache_dirpath / "index.json"
+
+        try:
+            with index_filepath.open("r") as f:
+                index = json.load(f)
+
+        except FileNotFoundError:
+            index = {}
+
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Compression cache index at %s is unreadable, starting with an empty cache.", index_filepath)
+            index = {}
+
+        if index.get("version") != CACHE_FORMAT_VERSION:
+            index = {}
+
+        files = index.get("files", {}) if index.get("fingerprint") == fingerprint else {}
+
+        return cls(cache_dirpath, files=files, blobs=index.get("blobs", {}), fingerprint=fingerprint)
+
+    @classmethod
+    def for_plugin(cls, output_dirpath: Path, plugin_uuid: str, fingerprint: str = "") -> Self:
+        """Load the cache of a plugin, which lives next to the releases in the pack output directory."""
+        return cls.load(output_dirpath / CACHE_DIRNAME / plugin_uuid, fingerprint)
+
+    @staticmethod
+    def blob_id(content_hash: str, settings: CompressionSettings) -> str:
+        """Get the identifier of a blob, which depends on the content and on how it was compressed."""
+        level = -1 if settings.compresslevel is None else settings.compresslevel
+        return f"{content_hash}-{settings.compress_type}-{level}"
+
+    def lookup_by_stat(self, relpath: str, st: os.stat_result) -> tuple[str, str] | None:
+        """Get the content hash & blob recorded for a file, if its size and mtime haven't changed since it was cached."""
+        record = self._files.get(relpath)
+        if record is None or record["size"] != st.st_size or record["mtime_ns"] != st.st_mtime_ns:
+            return None
+
+        return record["sha256"], record["blob"]
+
+    def get(self, blob_id: str) -> CompressedEntry | None:
+        """Get the compressed entry of a blob, or None if it isn't cached.
+
+        This only reads from the cache, so it is safe to call from worker threads.
+        """
+        blob_info = self._blobs.get(blob_id)
+        if blob_info is None:
+            return None
+
+        try:
+            data = self._blob_filepath(blob_id).read_bytes()
+        except OSError:
+            return None
+
+        if len(data) != blob_info["compress_size"]:
+            return None
+
+        return CompressedEntry(
+            data=data,
+            crc=blob_info["crc"],
+            file_size=blob_info["file_size"],
+            compress_type=blob_info["compress_type"],
+        )
+
+    def record(
+        self,
+        relpath: str,
+        st: os.stat_result,
+        content_hash: str,
+        blob_id: str,
+        entry: CompressedEntry,
+        *,
+        hit: bool,
+    ) -> None:
+        """Record the outcome of packing a file, storing its compressed data if it wasn't cached yet."""
+        if hit:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+
+        if blob_id not in self._blobs:
+            blob_filepath = self._blob_filepath(blob_id)
+            blob_filepath.parent.mkdir(parents=True, exist_ok=True)
+            blob_filepath.write_bytes(entry.data)
+            self._blobs[blob_id] = {
+                "crc": entry.crc,
+                "file_size": entry.file_size,
+                "compress_size": len(entry.data),
+                "compress_type": entry.compress_type,
+            }
+
+        self._files[relpath] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": content_hash, "blob": blob_id}
+        self._seen_files.add(relpath)
+        self._used_blobs.add(blob_id)
+
+    def save(self) -> None:
+        """Write the cache index to disk, dropping files and blobs that weren't part of this run."""
+        files = {relpath: record for relpath, record in self._files.items() if relpath in self._seen_files}
+        blobs = {blob_id: info for blob_id, info in self._blobs.items() if blob_id in self._used_blobs}
+
+        for stale_blob_id in self._blobs.keys() - blobs.keys():
+            with contextlib.suppress(FileNotFoundError):
+                self._blob_filepath(stale_blob_id).unlink()
+
+        self.cache_dirpath.mkdir(parents=True, exist_ok=True)
+        index_filepath = self.cache_dirpath / "index.json"
+        # Write to a temporary file first, so that an interrupted run can't leave a half-written index behind.
+        tmp_filepath = index_filepath.with_suffix(".tmp")
+        with tmp_filepath.open("w") as f:
+            json.dump({"version": CACHE_FORMAT_VERSION, "fingerprint": self.fingerprint, "files": files, "blobs": blobs}, f)
+        tmp_filepath.replace(index_filepath)
+
+        self._files, self._blobs = files, blobs
+
+    def _blob_filepath(self, blob_id: str) -> Path:
+        return self.cache_dirpath / "blobs" / blob_id[:2] / blob_id
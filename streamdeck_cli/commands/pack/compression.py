@@ -0,0 +1,233 @@
+"""Decide how each plugin file should be compressed when packing it."""
+from __future__ import annotations
+
+import json
+import sys
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+import pathspec
+import typer
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+
+
+# Ruff targets the latest Python, but tomllib is only in the standard library as of Python 3.11.
+if sys.version_info >= (3, 11):  # noqa: UP036
+    import tomllib
+else:
+    import tomli as tomllib
+
+
+# File types that are already compressed, and wouldn't get any smaller by being deflated again.
+ALREADY_COMPRESSED_SUFFIXES: frozenset[str] = frozenset({
+    # Images
+    ".png", ".gif", ".jpg", ".jpeg", ".webp", ".avif", ".heic",
+    # Archives & packages
+    ".zip", ".whl", ".egg", ".jar", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".br", ".streamdeckplugin",
+    # Audio & video
+    ".mp3", ".mp4", ".m4a", ".ogg", ".opus", ".webm", ".mov",
+    # Fonts
+    ".woff", ".woff2",
+})
+
+# File types that are known to compress well, which don't need to be sampled first.
+COMPRESSIBLE_SUFFIXES: frozenset[str] = frozenset({
+    ".py", ".pyi", ".json", ".txt", ".md", ".html", ".htm", ".js", ".mjs", ".css", ".svg",
+    ".toml", ".cfg", ".ini", ".yaml", ".yml", ".xml", ".csv",
+})
+
+# How much of a file of unknown type is test-compressed, and how small the result must be, to bother deflating it.
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_RATIO_THRESHOLD = 0.95
+
+# Value that can be used in a per-glob rule to store matching files without compressing them.
+STORE_RULE_VALUE = "store"
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """How a single archive entry is compressed."""
+    compress_type: int
+    compresslevel: int | None = None
+
+
+STORED = CompressionSettings(zipfile.ZIP_STORED)
+
+
+@dataclass(frozen=True)
+class CompressedEntry:
+    """The already-compressed data of a single archive entry, along with what's needed to write its headers."""
+    data: bytes
+    crc: int
+    file_size: int
+    compress_type: int
+
+
+@dataclass
+class CompressionPolicy:
+    """Chooses the compression settings of each plugin file.
+
+    In order of precedence:
+    1. The last per-glob rule matching the file's path (relative to the plugin directory), if any.
+    2. Files of an already-compressed type are stored as-is.
+    3. Files of a type known to compress well are deflated at the policy's level.
+    4. Other files have a small sample test-compressed, and are stored if deflating doesn't shrink it enough.
+
+    A level of 0 means no compression at all, whether it's the policy's level or a rule's, so files get stored rather
+    than deflated at level 0 (which would only add deflate's overhead).
+    """
+    compresslevel: int | None = None
+    rules: list[tuple[str, CompressionSettings]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        """Compile the rules' patterns once, rather than for each file."""
+        self._rule_specs = [
+            (pathspec.PathSpec.from_lines(GitWildMatchPattern, [pattern]), settings)  # type: ignore[arg-type]
+            for pattern, settings in self.rules
+        ]
+
+    @property
+    def deflated(self) -> CompressionSettings:
+        """Settings of the files to compress."""
+        return _level_settings(self.compresslevel)
+
+    @property
+    def fingerprint(self) -> str:
+        """A string that changes whenever the policy would choose differently for the same files."""
+        return json.dumps([
+            self.compresslevel,
+            [[pattern, settings.compress_type, settings.compresslevel] for pattern, settings in self.rules],
+            SAMPLE_SIZE,
+            SAMPLE_RATIO_THRESHOLD,
+            sorted(ALREADY_COMPRESSED_SUFFIXES),
+        ])
+
+    def choose_by_path(self, relpath: str) -> CompressionSettings | None:
+        """Choose the compression settings from the file's path alone, or return None if its content must be sampled."""
+        for spec, settings in reversed(self._rule_specs):
+            if spec.match_file(relpath):
+                return settings
+
+        suffix = PurePosixPath(relpath).suffix.lower()
+        if suffix in ALREADY_COMPRESSED_SUFFIXES:
+            return STORED
+        if suffix in COMPRESSIBLE_SUFFIXES:
+            return self.deflated
+
+        return None
+
+    def choose(self, relpath: str, data: bytes) -> CompressionSettings:
+        """Choose the compression settings of a file."""
+        settings = self.choose_by_path(relpath)
+        if settings is not None:
+            return settings
+
+        return self.deflated if is_worth_compressing(data) else STORED
+
+    @classmethod
+    def from_config(cls, plugin_dirpath: Path, compresslevel: int | None = None) -> CompressionPolicy:
+        """Create the policy from the `[tool.streamdeck-cli.pack]` table of the plugin's pyproject.toml file, if any.
+
+        The table may define a `compress-level` for every deflated file, which the given compresslevel overrides,
+        and a `compression` table mapping glob patterns to either a level or "store". For example:
+
+        ```toml
+        [tool.streamdeck-cli.pack]
+        compress-level = 6
+
+        [tool.streamdeck-cli.pack.compression]
+        "*.json" = 9
+        "assets/sounds/**" = "store"
+        ```
+        """
+        pack_config = _load_pack_config(plugin_dirpath / "pyproject.toml")
+
+        if compresslevel is None and "compress-level" in pack_config:
+            compresslevel = _parse_level(pack_config["compress-level"])
+            if compresslevel is None:
+                typer.echo("ERROR: The 'compress-level' of the pack config must be a level from 0 to 9.")
+                raise typer.Exit(1)
+
+        rules = [
+            (pattern, _parse_rule_value(pattern, value))
+            for pattern, value in pack_config.get("compression", {}).items()
+        ]
+
+        return cls(compresslevel=compresslevel, rules=rules)
+
+
+def is_worth_compressing(data: bytes) -> bool:
+    """Check whether deflating a sample of the data shrinks it enough to be worth it."""
+    sample = data[:SAMPLE_SIZE]
+    if not sample:
+        return True
+
+    # The fastest level is good enough to tell incompressible data apart.
+    compressed_sample_size = len(zlib.compress(sample, 1))
+    return compressed_sample_size < len(sample) * SAMPLE_RATIO_THRESHOLD
+
+
+def compress_data(data: bytes, compress_type: int, compresslevel: int | None = None) -> CompressedEntry:
+    """Compress the data of a single archive entry, the same way `zipfile` would.
+
+    Data that deflating doesn't make any smaller (e.g. tiny files, given deflate's overhead) gets stored instead.
+    """
+    if compress_type == zipfile.ZIP_DEFLATED:
+        level = zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel
+        # Negative window bits produce a raw deflate stream, without the zlib header & checksum, as zip expects.
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        compressed_data = compressor.compress(data) + compressor.flush()
+        if len(compressed_data) >= len(data):
+            compress_type, compressed_data = zipfile.ZIP_STORED, data
+
+    elif compress_type == zipfile.ZIP_STORED:
+        compressed_data = data
+
+    else:
+        msg = f"Unsupported compression type: {compress_type}"
+        raise ValueError(msg)
+
+    return CompressedEntry(data=compressed_data, crc=zlib.crc32(data), file_size=len(data), compress_type=compress_type)
+
+
+def _load_pack_config(pyproject_filepath: Path) -> dict[str, Any]:
+    try:
+        with pyproject_filepath.open("rb") as f:
+            pyproject = tomllib.load(f)
+
+    except FileNotFoundError:
+        return {}
+
+    except tomllib.TOMLDecodeError as e:
+        typer.echo(f"ERROR: Could not parse '{pyproject_filepath}': {e}")
+        raise typer.Exit(1) from e
+
+    return pyproject.get("tool", {}).get("streamdeck-cli", {}).get("pack", {})
+
+
+def _parse_level(value: object) -> int | None:
+    """Get a deflate level from a config value, or None if it isn't one."""
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 9:  # noqa: PLR2004
+        return value
+
+    return None
+
+
+def _level_settings(compresslevel: int | None) -> CompressionSettings:
+    # A level of 0 means no compression at all, which is best expressed by storing the file.
+    return STORED if compresslevel == 0 else CompressionSettings(zipfile.ZIP_DEFLATED, compresslevel)
+
+
+def _parse_rule_value(pattern: str, value: object) -> CompressionSettings:
+    if value == STORE_RULE_VALUE:
+        return STORED
+
+    level = _parse_level(value)
+    if level is not None:
+        return _level_settings(level)
+
+    typer.echo(f"ERROR: Compression rule for '{pattern}' must be a level from 0 to 9, or \"{STORE_RULE_VALUE}\".")
+    raise typer.Exit(1)
@@ -0,0 +1,257 @@
+"""Sync a plugin into a Stream Deck plugins directory, only writing the files that changed since the last deploy."""
+from __future__ import annotations
+
+import filecmp
+import os
+import shutil
+import sys
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+from streamdeck_cli.commands.pack.verify import (
+    PLUGIN_DIRNAME_SUFFIX,
+    ArchiveVerification,
+    check_layout,
+)
+from streamdeck_cli.commands.pack.zip import get_packignore_matcher, walk_filtered_plugin_files
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+
+# Size of the chunks files are read in to compute their CRC, so that large files never get loaded whole into memory.
+CHUNK_SIZE = 1024 * 1024
+
+DEBUG_FILENAME = ".debug"
+
+
+class DeploySource(Protocol):
+    """The files of a plugin to deploy, whether from its directory or from a package."""
+
+    relpaths: list[str]
+
+    def is_unchanged(self, relpath: str, target_filepath: Path, *, checksum: bool) -> bool:
+        """Check whether the deployed file is the same as the source's, comparing their content if `checksum` is set."""
+        ...
+
+    def copy_to(self, relpath: str, target_filepath: Path) -> None:
+        """Write the source's file to the deployed one's path."""
+        ...
+
+
+class DirectorySource:
+    """The files of a plugin directory that aren't ignored by its .packignore files, as they'd get packed.
+
+    Like rsync, files are deemed unchanged if their size & mtime are the same as the deployed copy's (copies keep the
+    mtime of their source), and their contents only get compared otherwise, or if asked to.
+    """
+
+    def __init__(self, plugin_dirpath: Path, debug_port: int | None = None):
+        """List the plugin's files, along with the debug mode's flag file if a debug port is given."""
+        self.plugin_dirpath = plugin_dirpath
+        # Files that aren't in the plugin directory, like the flag file of debug mode in packages.
+        self.generated_files = {DEBUG_FILENAME: str(debug_port).encode()} if debug_port else {}
+
+        walked_relpaths = [
+            filepath.as_posix()
+            for filepath in walk_filtered_plugin_files(plugin_dirpath, get_packignore_matcher(plugin_dirpath))
+        ]
+        self.relpaths = [*(relpath for relpath in walked_relpaths if relpath not in self.generated_files), *self.generated_files]
+
+    def is_unchanged(self, relpath: str, target_filepath: Path, *, checksum: bool) -> bool:
+        """Compare the deployed file with the plugin's by size & mtime, or by content if `checksum` is set."""
+        if relpath in self.generated_files:
+            return target_filepath.read_bytes() == self.generated_files[relpath]
+
+        return filecmp.cmp(self.plugin_dirpath / relpath, target_filepath, shallow=not checksum)
+
+    def copy_to(self, relpath: str, target_filepath: Path) -> None:
+        """Copy the plugin's file along with its mtime, or write the generated one."""
+        if relpath in self.generated_files:
+            target_filepath.write_bytes(self.generated_files[relpath])
+        else:
+            shutil.copy2(self.plugin_dirpath / relpath, target_filepath)
+
+
+class ArchiveSource:
+    """The files of an already-packed plugin, read from the package without extracting it.
+
+    Packages' timestamps can't be relied on (reproducible ones all have the same), so deployed files are compared with
+    the entries' CRC, which only takes reading the deployed files rather than decompressing and writing every entry.
+    """
+
+    def __init__(self, zip_file: zipfile.ZipFile, plugin_dirname: str):
+        """Index the package's entries under the plugin directory by their path relative to it."""
+        self.zip_file = zip_file
+        self.entries = {
+            info.filename[len(plugin_dirname) + 1:]: info
+            for info in zip_file.infolist()
+            if info.filename.startswith(f"{plugin_dirname}/") and not info.is_dir()
+        }
+        self.relpaths = list(self.entries)
+
+    def is_unchanged(self, relpath: str, target_filepath: Path, *, checksum: bool) -> bool:  # noqa: ARG002
+        """Compare the deployed file's size & CRC with the entry's, which is as cheap as a checksum gets here."""
+        info = self.entries[relpath]
+        return target_filepath.stat().st_size == info.file_size and file_crc(target_filepath) == info.CRC
+
+    def copy_to(self, relpath: str, target_filepath: Path) -> None:
+        """Extract the entry to the deployed file's path."""
+        info = self.entries[relpath]
+        with self.zip_file.open(info) as entry, target_filepath.open("wb") as f:
+            shutil.copyfileobj(entry, f, CHUNK_SIZE)
+
+        # Keep the permissions the entry was packed with (e.g. executables), if it was packed on Unix.
+        if mode := (info.external_attr >> 16) & 0o777:
+            target_filepath.chmod(mode)
+
+
+@dataclass
+class DeployResult:
+    """Outcome of deploying a plugin, with the paths (relative to the plugin directory) of the files that changed."""
+    target_dirpath: Path
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged_count: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether any file got added, updated or deleted."""
+        return bool(self.added or self.updated or self.deleted)
+
+
+def open_archive_source(archive_filepath: Path) -> tuple[ArchiveSource, str]:
+    """Open a package to deploy, returning it along with the UUID of the plugin it holds.
+
+    Raises a ValueError if the package's layout isn't the one of a packed plugin, e.g. if it has entries that would
+    get written outside of the plugin directory.
+    """
+    zip_file = zipfile.ZipFile(archive_filepath)
+    verification = ArchiveVerification(archive_filepath, entries=zip_file.infolist())
+
+    plugin_dirname = check_layout(verification)
+    if plugin_dirname is None or verification.errors:
+        zip_file.close()
+        raise ValueError(" ".join(verification.errors))
+
+    return ArchiveSource(zip_file, plugin_dirname), plugin_dirname.removesuffix(PLUGIN_DIRNAME_SUFFIX)
+
+
+def deploy_plugin(source: DeploySource, target_dirpath: Path, *, checksum: bool = False, dry_run: bool = False) -> DeployResult:
+    """Make the target directory hold exactly the source's files, only writing the ones that changed.
+
+    The new state of the directory is staged next to it: unchanged files get hardlinked from the current one (so
+    they're not written again), changed files get copied from the source. The staged directory then replaces the target
+    one with two renames, so that the plugin directory is never seen half-written. Nothing gets written if nothing
+    changed, or on a dry run.
+    """
+    result = DeployResult(target_dirpath)
+    target_relpaths = set(_list_relpaths(target_dirpath)) if target_dirpath.is_dir() else set()
+
+    unchanged_relpaths: set[str] = set()
+    for relpath in source.relpaths:
+        if relpath not in target_relpaths:
+            result.added.append(relpath)
+        elif source.is_unchanged(relpath, target_dirpath / relpath, checksum=checksum):
+            unchanged_relpaths.add(relpath)
+        else:
+            result.updated.append(relpath)
+
+    result.deleted = sorted(target_relpaths.difference(source.relpaths))
+    result.unchanged_count = len(unchanged_relpaths)
+
+    if dry_run or not result.has_changes:
+        return result
+
+    staging_dirpath = target_dirpath.with_name(f".{target_dirpath.name}.deploy")
+    # Left behind by a deploy that got interrupted.
+    if staging_dirpath.exists():
+        shutil.rmtree(staging_dirpath)
+
+    for relpath in source.relpaths:
+        staged_filepath = staging_dirpath / relpath
+        staged_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        if relpath in unchanged_relpaths:
+            _link_or_copy(target_dirpath / relpath, staged_filepath)
+        else:
+            source.copy_to(relpath, staged_filepath)
+
+    # An empty plugin still gets its directory.
+    staging_dirpath.mkdir(parents=True, exist_ok=True)
+    _swap_into_place(staging_dirpath, target_dirpath)
+
+    return result
+
+
+def default_plugins_dirpath() -> Path | None:
+    """Get the directory the Stream Deck app installs plugins in on this platform, or None if it doesn't run on it."""
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Application Support" / "com.elgato.StreamDeck" / "Plugins"
+
+    if sys.platform == "win32" and (appdata := os.environ.get("APPDATA")):
+        return Path(appdata) / "Elgato" / "StreamDeck" / "Plugins"
+
+    return None
+
+
+def file_crc(filepath: Path) -> int:
+    """Compute a file's CRC-32, as stored in zip archives."""
+    crc = 0
+    with filepath.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+
+    return crc
+
+
+def format_deploy_result(result: DeployResult, *, dry_run: bool = False) -> list[str]:
+    """Format the files a deploy added (+), updated (~) and deleted (-), followed by a summary."""
+    lines = [
+        *(f"  + {relpath}" for relpath in result.added),
+        *(f"  ~ {relpath}" for relpath in result.updated),
+        *(f"  - {relpath}" for relpath in result.deleted),
+    ]
+    counts = (
+        f"{len(result.added)} added, {len(result.updated)} updated, {len(result.deleted)} deleted, "
+        f"{result.unchanged_count} unchanged"
+    )
+    lines.append(f"{'Would deploy' if dry_run else 'Deployed'} to '{result.target_dirpath}': {counts}.")
+    return lines
+
+
+def _list_relpaths(dirpath: Path) -> Iterable[str]:
+    """List the files under a directory, by their POSIX path relative to it."""
+    for root, _, filenames in os.walk(dirpath):
+        relative_root = Path(root).relative_to(dirpath)
+        for filename in filenames:
+            yield (relative_root / filename).as_posix()
+
+
+def _link_or_copy(source_filepath: Path, target_filepath: Path) -> None:
+    """Hardlink a file, or copy it on filesystems that don't support hardlinks."""
+    try:
+        os.link(source_filepath, target_filepath)
+    except OSError:
+        shutil.copy2(source_filepath, target_filepath)
+
+
+def _swap_into_place(staging_dirpath: Path, target_dirpath: Path) -> None:
+    """Replace the target directory with the staged one, moving the current one aside until the staged one is in place."""
+    if not target_dirpath.exists():
+        staging_dirpath.rename(target_dirpath)
+        return
+
+    previous_dirpath = target_dirpath.with_name(f".{target_dirpath.name}.previous")
+    if previous_dirpath.exists():
+        shutil.rmtree(previous_dirpath)
+
+    target_dirpath.rename(previous_dirpath)
+    staging_dirpath.rename(target_dirpath)
+    shutil.rmtree(previous_dirpath)
@@ -0,0 +1,209 @@
+"""Match paths against a .packignore specification, compiled once rather than going through every pattern per path."""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    import pathspec
+
+
+
+# A regex-escaped literal, without any wildcard, e.g. `f\.tar\.gz` for the "f.tar.gz" pattern.
+_LITERAL = r"(?:\\.|[^\\.^$*+?{}\[\]()|/])+"
+_ANCHORED_LITERAL = r"(?:\\.|[^\\.^$*+?{}\[\]()|])+"
+# How gitwildmatch regexes start for patterns matching at any depth, and how they end: either on a path component
+# matching the pattern (whether a file or a directory), or on a directory only, for patterns with a trailing slash.
+_ANY_DEPTH_SOURCE = "^(?:.+/)?"
+_ANY_END_SOURCE = "(?:(?P<ps_d>/)|$)"
+_ANY_DEPTH = re.escape(_ANY_DEPTH_SOURCE)
+_ANY_END = re.escape(_ANY_END_SOURCE)
+_DIR_END = re.escape("(?P<ps_d>/)")
+
+# Patterns matching a suffix at any depth, e.g. "*.pyc".
+_SUFFIX_PATTERN = re.compile(rf"{_ANY_DEPTH}{re.escape('[^/]*')}(?P<literal>\\\.{_LITERAL})(?P<end>{_ANY_END}|{_DIR_END})")
+# Patterns matching a name at any depth, e.g. "__pycache__/" or "Thumbs.db".
+_NAME_PATTERN = re.compile(rf"{_ANY_DEPTH}(?P<literal>{_LITERAL})(?P<end>{_ANY_END}|{_DIR_END})")
+# Patterns matching a path relative to the .packignore file's directory, e.g. "/build" or "docs/internal/".
+_ANCHORED_PATTERN = re.compile(rf"\^(?P<literal>{_ANCHORED_LITERAL})(?P<end>{_ANY_END}|{_DIR_END})")
+
+# The literal text a regex starts with, e.g. `docs/` for the "docs/**/*.md" pattern. A character followed by a
+# quantifier isn't part of it, since it may not be there.
+_LITERAL_PREFIX = re.compile(r"(?:(?:\\.|[^\\.^$*+?{}\[\]()|])(?![*+?{]))*")
+_NAMED_GROUP = re.compile(r"\(\?P<[^>]+>")
+_ESCAPE = re.compile(r"\\(.)")
+
+
+class _CombinedRegex:
+    """Several patterns' regexes folded into one, which tells the last of those patterns matching a path.
+
+    Alternatives are tried in order and the first one matching wins, so they're ordered from the last pattern to the
+    first, each in a group whose number maps back to its pattern.
+    """
+
+    def __init__(self, sources: list[tuple[int, str]], flags: int):
+        parts: list[str] = []
+        self.pattern_indexes: dict[int, int] = {}
+        group = 1
+        for index, source in sorted(sources, reverse=True):
+            parts.append(f"({source})")
+            self.pattern_indexes[group] = index
+            # Groups within the pattern's own regex come after the group wrapping it.
+            group += 1 + re.compile(source, flags).groups
+        self.regex = re.compile("|".join(parts), flags)
+
+    def match(self, path: str, start: int = 0) -> int:
+        """Get the index of the last pattern matching the path from the given position, or -1 if none does."""
+        match = self.regex.match(path, start)
+        # The wrapping group is the last one to close, so it's the last matched group.
+        return self.pattern_indexes[match.lastindex] if match is not None else -1  # type: ignore[index]
+
+
+class IgnoreMatcher:
+    """Compiled form of a .packignore specification, giving the same results as checking each pattern in turn.
+
+    pathspec checks a path against every pattern, one regex at a time, which adds up with thousands of patterns and
+    files. Instead, every pattern gets indexed once: plain names (e.g. "__pycache__/"), suffixes ("*.pyc") and anchored
+    paths ("/build") are looked up in dicts, and patterns with wildcards are bucketed by the literal text they start
+    with, each bucket folded into a single regex that's only tried where a path (or one of its components, for patterns
+    matching at any depth) starts with that text. Each lookup gives the position of the last pattern matching, and as
+    with pathspec, the last pattern matching overall decides whether the path is ignored or re-included (with `!`).
+
+    Paths are relative to the .packignore file's directory, in POSIX form, with a trailing slash for directories.
+    Decisions about directories are memoised, so that e.g. watch mode doesn't match the same directories on every rebuild.
+    """
+
+    def __init__(self, spec: pathspec.PathSpec):
+        """Compile the specification's patterns into an index."""
+        self.spec = spec
+        self._dir_decisions: dict[str, bool | None] = {}
+        # Whether each indexed pattern ignores paths (True) or re-includes them (False).
+        self._includes: list[bool] = []
+
+        self._names: dict[str, int] = {}
+        self._dir_names: dict[str, int] = {}
+        self._suffixes: dict[str, int] = {}
+        self._dir_suffixes: dict[str, int] = {}
+        self._prefixes: dict[str, int] = {}
+        self._dir_prefixes: dict[str, int] = {}
+        # Regexes by whether they match at any depth, then by the literal text they start with.
+        regex_sources: dict[bool, dict[str, list[tuple[int, str]]]] = {True: {}, False: {}}
+        # Regexes gitwildmatch doesn't anchor, e.g. for the "*" pattern.
+        unanchored_sources: list[tuple[int, str]] = []
+
+        flags = 0
+        for pattern in spec.patterns:
+            if pattern.include is None or pattern.regex is None:
+                continue
+            index = len(self._includes)
+            self._includes.append(pattern.include)
+            flags |= pattern.regex.flags
+            source = pattern.regex.pattern
+
+            if self._index_literal(index, source):
+                continue
+
+            # Every gitwildmatch regex has the same named group, which can only appear once in a combined regex.
+            source = _NAMED_GROUP.sub("(?:", source)
+            if source.startswith(_ANY_DEPTH_SOURCE):
+                any_depth, source = True, source[len(_ANY_DEPTH_SOURCE):]
+            elif source.startswith("^"):
+                any_depth, source = False, source[1:]
+            else:
+                unanchored_sources.append((index, source))
+                continue
+
+            prefix = _ESCAPE.sub(r"\1", _LITERAL_PREFIX.match(source).group())  # type: ignore[union-attr]
+            regex_sources[any_depth].setdefault(prefix, []).append((index, source))
+
+        # Combined regexes by whether they match at any depth, then by the length of their literal start, then by that start.
+        self._regexes: dict[bool, list[tuple[int, dict[str, _CombinedRegex]]]] = {}
+        for any_depth, sources_by_prefix in regex_sources.items():
+            by_length: dict[int, dict[str, _CombinedRegex]] = {}
+            for prefix, sources in sources_by_prefix.items():
+                by_length.setdefault(len(prefix), {})[prefix] = _CombinedRegex(sources, flags)
+            self._regexes[any_depth] = sorted(by_length.items())
+
+        self._unanchored_regex = _CombinedRegex(unanchored_sources, flags) if unanchored_sources else None
+
+    def check(self, relpath: str) -> bool | None:
+        """Check whether the path is ignored (True), re-included (False), or not matched by any pattern (None)."""
+        if relpath.endswith("/"):
+            if relpath not in self._dir_decisions:
+                self._dir_decisions[relpath] = self._check(relpath)
+            return self._dir_decisions[relpath]
+
+        return self._check(relpath)
+
+    def _index_literal(self, index: int, source: str) -> bool:
+        """Index a pattern without wildcards, returning whether it was one."""
+        for literal_pattern, literals, dir_literals in (
+            (_SUFFIX_PATTERN, self._suffixes, self._dir_suffixes),
+            (_NAME_PATTERN, self._names, self._dir_names),
+            (_ANCHORED_PATTERN, self._prefixes, self._dir_prefixes),
+        ):
+            match = literal_pattern.fullmatch(source)
+            if match is not None:
+                literal = _ESCAPE.sub(r"\1", match.group("literal"))
+                # Patterns come in order, so a later pattern with the same literal takes precedence.
+                (literals if match.group("end") == _ANY_END_SOURCE else dir_literals)[literal] = index
+                return True
+
+        return False
+
+    def _check(self, relpath: str) -> bool | None:
+        last_index = -1
+
+        components = relpath.split("/")
+        last_component = len(components) - 1
+        for i, component in enumerate(components):
+            # Only components followed by a slash are directories.
+            is_dir = i < last_component
+            last_index = max(last_index, self._names.get(component, -1), self._dir_names.get(component, -1) if is_dir else -1)
+
+            if self._suffixes or self._dir_suffixes:
+                dot = component.find(".")
+                while dot != -1:
+                    suffix = component[dot:]
+                    last_index = max(
+                        last_index, self._suffixes.get(suffix, -1), self._dir_suffixes.get(suffix, -1) if is_dir else -1,
+                    )
+                    dot = component.find(".", dot + 1)
+
+        if self._prefixes or self._dir_prefixes:
+            last_index = max(last_index, self._prefixes.get(relpath, -1))
+            slash = relpath.find("/")
+            while slash != -1:
+                prefix = relpath[:slash]
+                last_index = max(last_index, self._prefixes.get(prefix, -1), self._dir_prefixes.get(prefix, -1))
+                slash = relpath.find("/", slash + 1)
+
+        last_index = max(last_index, self._match_regexes(relpath, 0, any_depth=False))
+        if self._regexes[True]:
+            for start in _component_starts(relpath):
+                last_index = max(last_index, self._match_regexes(relpath, start, any_depth=True))
+
+        if self._unanchored_regex is not None:
+            last_index = max(last_index, self._unanchored_regex.match(relpath))
+
+        return self._includes[last_index] if last_index != -1 else None
+
+    def _match_regexes(self, relpath: str, start: int, *, any_depth: bool) -> int:
+        last_index = -1
+        for length, regexes in self._regexes[any_depth]:
+            regex = regexes.get(relpath[start:start + length])
+            if regex is not None:
+                last_index = max(last_index, regex.match(relpath, start))
+        return last_index
+
+
+def _component_starts(path: str) -> Generator[int, None, None]:
+    """Yield the index of each component of a path, where patterns matching at any depth may start matching."""
+    yield 0
+    slash = path.find("/")
+    while slash != -1:
+        yield slash + 1
+        slash = path.find("/", slash + 1)
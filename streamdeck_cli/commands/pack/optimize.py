@@ -0,0 +1,676 @@
+"""Losslessly shrink the icons and property inspector files of a plugin while packing it."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import posixpath
+import re
+import struct
+import zlib
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+from streamdeck_cli.models.cache import user_cache_dirpath
+from streamdeck_cli.models.manifest import IMAGE_ASSET_SUFFIXES
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from typing_extensions import Self  # noqa: UP035
+
+    from streamdeck_cli.models.manifest import Manifest
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# Bump this whenever an optimiser changes its output, so that assets optimised by the previous version get redone.
+OPTIMIZER_VERSION = 3
+
+# How many optimised assets to remember before evicting the least recently used ones.
+DEFAULT_MAX_CACHE_ENTRIES = 4096
+
+PROPERTY_INSPECTOR_SUFFIXES = (".html", ".htm", ".css", ".js", ".svg", ".png", ".gif")
+
+# Suffix an image may have before its extension, for its high-DPI variant, e.g. "imgs/icon@2x.png" for "imgs/icon".
+HIGH_DPI_SUFFIX = "@2x"
+
+# Local files an HTML page links to, through `src` or `href` attributes.
+HTML_LINK_PATTERN = re.compile(r"""\b(?:src|href)\s*=\s*["']([^"'#?]+)""", re.IGNORECASE)
+
+# Comments and tags of an HTML page, where a quoted attribute value may hold a `>`.
+HTML_TAG_PATTERN = re.compile(r"""(<!--.*?-->|<(?:[^>"']|"[^"]*"|'[^']*')*>)""", re.DOTALL)
+
+
+class AssetOptimizer:
+    """Optimises the icons referenced by a plugin's manifest, and the files of its property inspectors.
+
+    Optimisations never change how an asset looks nor behaves: PNG image data gets deflated again at the highest level
+    and text & timestamp chunks are dropped, GIF comments are dropped, and SVG, HTML, CSS & JS files get comments and
+    superfluous whitespace removed. An optimised asset is only used if it's smaller than the original. Results are kept
+    in a cache keyed by the asset's content hash, shared by every plugin & build.
+    """
+
+    def __init__(self, relpaths: frozenset[str], cache: AssetCache | None = None):
+        """Create an optimiser for the given plugin files, use `for_manifest` to find the ones a manifest references."""
+        self.relpaths = relpaths
+        self.cache = cache
+
+    @classmethod
+    def for_manifest(cls, manifest: Manifest, plugin_dirpath: Path, cache: AssetCache | None = None) -> Self:
+        """Find the assets to optimise from the (already validated) manifest of the plugin."""
+        image_stems = {
+            PurePosixPath(icon).as_posix()
+            for icon in (manifest.icon, manifest.category_icon, *(action.icon for action in manifest.actions))
+            if icon is not None
+        }
+        relpaths = set(_find_images(plugin_dirpath, image_stems))
+
+        property_inspector_paths = [
+            PurePosixPath(path).as_posix()
+            for path in (
+                (manifest.model_extra or {}).get("PropertyInspectorPath"),
+                *(action.property_inspector_path for action in manifest.actions),
+            )
+            if path is not None
+        ]
+        for property_inspector_path in property_inspector_paths:
+            relpaths.update(_find_property_inspector_files(plugin_dirpath, property_inspector_path))
+
+        # Code is never touched, even if a property inspector happens to link to it.
+        code_paths = {
+            PurePosixPath(path).as_posix()
+            for path in (manifest.code_path, manifest.code_path_mac, manifest.code_path_win)
+            if path is not None
+        }
+
+        return cls(frozenset(relpaths - code_paths), cache=cache)
+
+    @property
+    def fingerprint(self) -> str:
+        """A string that changes whenever the optimiser would change different files, or change them differently."""
+        relpaths_hash = hashlib.sha256("\n".join(sorted(self.relpaths)).encode()).hexdigest()
+        return f"optimize-{OPTIMIZER_VERSION}-{relpaths_hash}"
+
+    def applies_to(self, relpath: str) -> bool:
+        """Check whether a plugin file is one of the assets to optimise."""
+        return relpath in self.relpaths
+
+    def optimize(self, relpath: str, data: bytes, content_hash: str) -> bytes:
+        """Get the optimised content of an asset, from the cache if it was already optimised before.
+
+        This is safe to call from worker threads.
+        """
+        optimizer = OPTIMIZERS.get(PurePosixPath(relpath).suffix.lower())
+        if optimizer is None:
+            return data
+
+        key = AssetCache.key(content_hash, PurePosixPath(relpath).suffix.lower())
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+
+        try:
+            optimized = optimizer(data)
+        except (ValueError, zlib.error, struct.error, UnicodeDecodeError) as e:
+            logger.warning("Not optimising '%s', which couldn't be parsed: %s", relpath, e)
+            optimized = data
+
+        # Only keep the optimised asset if it's actually smaller.
+        if len(optimized) >= len(data):
+            optimized = data
+
+        if self.cache is not None:
+            self.cache.put(key, optimized)
+
+        return optimized
+
+
+class AssetCache:
+    """On-disk cache of optimised assets, keyed by the hash of the original content, in the user's cache directory.
+
+    Entries' mtimes serve to evict the least recently used ones once there are more than `max_entries`.
+    """
+
+    def __init__(self, cache_dirpath: Path, max_entries: int = DEFAULT_MAX_CACHE_ENTRIES):
+        """Create a cache kept in the given directory, use `default` to get the user's cache."""
+        self.cache_dirpath = cache_dirpath
+        self.max_entries = max_entries
+
+    @classmethod
+    def default(cls) -> Self:
+        """Get the cache in the user's cache directory, shared by every plugin."""
+        return cls(user_cache_dirpath() / "assets")
+
+    @staticmethod
+    def key(content_hash: str, suffix: str) -> str:
+        """Get the cache key of an asset, by its content hash and file type."""
+        return hashlib.sha256(f"{OPTIMIZER_VERSION}\0{suffix}\0{content_hash}".encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Get an optimised asset, or None if it isn't in the cache."""
+        filepath = self.cache_dirpath / key
+        try:
+            data = filepath.read_bytes()
+            # Mark the entry as recently used.
+            os.utime(filepath)
+        except OSError:
+            return None
+
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Add an optimised asset to the cache, which is only a warning if it fails."""
+        filepath = self.cache_dirpath / key
+        try:
+            self.cache_dirpath.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that a concurrent pack can't read a half-written entry.
+            tmp_filepath = filepath.with_name(f"{key}.{os.getpid()}.{id(data)}.tmp")
+            tmp_filepath.write_bytes(data)
+            tmp_filepath.replace(filepath)
+
+        # Failing to cache an asset shouldn't fail the pack.
+        except OSError as e:
+            logger.warning("Unable to write optimised asset cache entry at %s: %s", filepath, e)
+
+    def evict(self) -> None:
+        """Delete the least recently used entries beyond the maximum number of entries."""
+        try:
+            entries = list(os.scandir(self.cache_dirpath))
+        except OSError:
+            return
+
+        if len(entries) <= self.max_entries:
+            return
+
+        def last_used(entry: os.DirEntry[str]) -> int:
+            try:
+                return entry.stat().st_mtime_ns
+            except OSError:
+                return 0
+
+        for entry in sorted(entries, key=last_used)[:len(entries) - self.max_entries]:
+            try:
+                Path(entry.path).unlink()
+            except OSError:
+                continue
+
+
+def optimize_png(data: bytes) -> bytes:
+    """Deflate the image data of a PNG at the highest level, and drop its text & timestamp chunks.
+
+    The pixels (and the filters applied to them) are left as they are, so the image is exactly the same. Animated
+    PNGs are left untouched.
+    """
+    signature = b"\x89PNG\r\n\x1a\n"
+    if not data.startswith(signature):
+        msg = "not a PNG file"
+        raise ValueError(msg)
+
+    chunks: list[tuple[bytes, bytes]] = []
+    image_data = bytearray()
+    offset = len(signature)
+    while offset < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        chunk_data = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+        if chunk_type == b"acTL":
+            return data
+        if chunk_type == b"IDAT":
+            # Consecutive IDAT chunks form a single zlib stream, which gets written back as one chunk.
+            if not image_data:
+                chunks.append((b"IDAT", b""))
+            image_data += chunk_data
+        elif chunk_type not in (b"tEXt", b"zTXt", b"iTXt", b"tIME"):
+            chunks.append((chunk_type, chunk_data))
+
+        if chunk_type == b"IEND":
+            break
+
+    recompressed_image_data = zlib.compress(zlib.decompress(bytes(image_data)), 9)
+
+    output = bytearray(signature)
+    for chunk_type, chunk_data in chunks:
+        if chunk_type == b"IDAT":
+            chunk_data = recompressed_image_data  # noqa: PLW2901
+        output += struct.pack(">I", len(chunk_data)) + chunk_type + chunk_data
+        output += struct.pack(">I", zlib.crc32(chunk_type + chunk_data))
+
+    return bytes(output)
+
+
+def optimize_gif(data: bytes) -> bytes:
+    """Drop the comments of a GIF, leaving its frames, palettes and animation settings as they are."""
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        msg = "not a GIF file"
+        raise ValueError(msg)
+
+    def byte_at(offset: int) -> int:
+        if offset >= len(data):
+            msg = "truncated GIF file"
+            raise ValueError(msg)
+        return data[offset]
+
+    def skip_sub_blocks(offset: int) -> int:
+        while byte_at(offset) != 0:
+            offset += data[offset] + 1
+        return offset + 1
+
+    def color_table_size(flags: int) -> int:
+        return 3 * 2 ** ((flags & 0x07) + 1) if flags & 0x80 else 0
+
+    # Header, logical screen descriptor, then the global color table, if any.
+    offset = 13 + color_table_size(byte_at(10))
+    output = bytearray(data[:offset])
+
+    while True:
+        block_start = offset
+        introducer = byte_at(offset)
+
+        if introducer == 0x3B:  # Trailer  # noqa: PLR2004
+            output += data[offset:offset + 1]
+            return bytes(output)
+
+        if introducer == 0x21:  # Extension  # noqa: PLR2004
+            label = byte_at(offset + 1)
+            offset = skip_sub_blocks(offset + 2)
+            if label == 0xFE:  # Comment  # noqa: PLR2004
+                continue
+
+        elif introducer == 0x2C:  # Image descriptor  # noqa: PLR2004
+            offset += 10 + color_table_size(byte_at(offset + 9))
+            # The LZW minimum code size, then the image data sub-blocks.
+            offset = skip_sub_blocks(offset + 1)
+
+        else:
+            msg = f"unexpected GIF block {introducer:#x}"
+            raise ValueError(msg)
+
+        output += data[block_start:offset]
+
+
+def minify_svg(data: bytes) -> bytes:
+    """Drop the comments & metadata of an SVG, and the whitespace between its tags if it has no text."""
+    svg = data.decode("utf-8")
+    svg = re.sub(r"<!--.*?-->", "", svg, flags=re.DOTALL)
+    svg = re.sub(r"<metadata\b.*?</metadata>", "", svg, flags=re.DOTALL)
+    # Whitespace between tags can be significant within text elements.
+    if "<text" not in svg:
+        svg = re.sub(r">\s+<", "><", svg)
+    return svg.strip().encode("utf-8")
+
+
+def minify_html(data: bytes) -> bytes:
+    """Drop the comments of an HTML page, collapse whitespace between its tags, and minify its scripts & styles.
+
+    Whitespace between tags is collapsed to a single space rather than removed, since it separates inline elements.
+    Tags (and their attributes) and the contents of `pre` and `textarea` elements are left as they are.
+    """
+    html = data.decode("utf-8")
+    parts = re.split(r"(<(pre|textarea|script|style)\b[^>]*>.*?</\2\s*>)", html, flags=re.DOTALL | re.IGNORECASE)
+
+    output: list[str] = []
+    # re.split yields the text between elements, then each element along with its tag name.
+    for i in range(0, len(parts), 3):
+        # Tags & comments alternate with the text between them, starting with the text.
+        for j, token in enumerate(HTML_TAG_PATTERN.split(parts[i])):
+            if j % 2 == 0:
+                output.append(_minify_html_text(token))
+            # Conditional comments are kept, since they hold markup for some browsers.
+            elif not token.startswith("<!--") or token.startswith("<!--[if"):
+                output.append(token)
+
+        if i + 1 < len(parts):
+            element, tag_name = parts[i + 1], parts[i + 2].lower()
+            if tag_name in ("script", "style"):
+                open_tag_end = element.index(">") + 1
+                close_tag_start = element.lower().rindex(f"</{tag_name}")
+                minify = minify_js_source if tag_name == "script" else minify_css_source
+                # Only inline scripts of a JavaScript type are minified, not e.g. JSON data or templates.
+                if tag_name == "style" or _is_javascript_tag(element[:open_tag_end]):
+                    element = element[:open_tag_end] + minify(element[open_tag_end:close_tag_start]) + element[close_tag_start:]
+            output.append(element)
+
+    return "".join(output).strip().encode("utf-8")
+
+
+def minify_css(data: bytes) -> bytes:
+    """Minify a UTF-8 encoded stylesheet."""
+    return minify_css_source(data.decode("utf-8")).encode("utf-8")
+
+
+def minify_js(data: bytes) -> bytes:
+    """Minify a UTF-8 encoded script."""
+    return minify_js_source(data.decode("utf-8")).encode("utf-8")
+
+
+def minify_css_source(css: str) -> str:
+    """Drop the comments of a stylesheet, collapse its whitespace, and drop the whitespace around braces & separators.
+
+    Whitespace around colons is kept, since it's significant in selectors (e.g. "a :hover" isn't "a:hover").
+    """
+    output: list[str] = []
+    for token, is_code in _tokenize_css(css):
+        if not is_code:
+            output.append(token)
+            continue
+        code = re.sub(r"\s+", " ", token)
+        code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+        output.append(code.replace(";}", "}"))
+
+    return "".join(output).strip()
+
+
+def minify_js_source(js: str) -> str:
+    """Drop the comments of a script, along with the indentation & trailing whitespace of its lines, and blank lines.
+
+    Line breaks are kept, so that automatic semicolon insertion works the same way. Strings, template literals and
+    regular expression literals are left as they are.
+    """
+    output: list[str] = []
+    for token, is_code in _tokenize_js(js):
+        output.append(re.sub(r"[ \t]*\n\s*", "\n", token) if is_code else token)
+
+    return "".join(output).strip()
+
+
+OPTIMIZERS: dict[str, Callable[[bytes], bytes]] = {
+    ".png": optimize_png,
+    ".gif": optimize_gif,
+    ".svg": minify_svg,
+    ".html": minify_html,
+    ".htm": minify_html,
+    ".css": minify_css,
+    ".js": minify_js,
+}
+
+
+def _find_images(plugin_dirpath: Path, image_stems: set[str]) -> list[str]:
+    """Find the image files of the given paths without extension, including their high-DPI variants."""
+    dirpaths = {posixpath.dirname(stem) for stem in image_stems}
+    found: list[str] = []
+
+    for dirpath in dirpaths:
+        try:
+            with os.scandir(plugin_dirpath / dirpath) as entries:
+                names = [entry.name for entry in entries if entry.is_file()]
+        except OSError:
+            continue
+
+        for name in names:
+            stem, suffix = posixpath.splitext(name)
+            if suffix.lower() not in IMAGE_ASSET_SUFFIXES:
+                continue
+            if posixpath.join(dirpath, stem.removesuffix(HIGH_DPI_SUFFIX)) in image_stems:
+                found.append(posixpath.join(dirpath, name))
+
+    return found
+
+
+def _find_property_inspector_files(plugin_dirpath: Path, property_inspector_path: str) -> list[str]:
+    """Find a property inspector page, and the local files it links to (scripts, stylesheets, images)."""
+    try:
+        html = (plugin_dirpath / property_inspector_path).read_text("utf-8", errors="replace")
+    except OSError:
+        return []
+
+    found = [property_inspector_path]
+    dirpath = posixpath.dirname(property_inspector_path)
+    for link in HTML_LINK_PATTERN.findall(html):
+        if "://" in link or link.startswith(("/", "data:", "mailto:", "javascript:")):
+            continue
+        relpath = posixpath.normpath(posixpath.join(dirpath, link))
+        if relpath.startswith("../") or PurePosixPath(relpath).suffix.lower() not in PROPERTY_INSPECTOR_SUFFIXES:
+            continue
+        found.append(relpath)
+
+    return found
+
+
+def _minify_html_text(text: str) -> str:
+    """Collapse the whitespace of the text between two tags, to a single space if there's nothing else."""
+    if text and not text.strip():
+        return " "
+    return re.sub(r"\s*\n\s*", "\n", text)
+
+
+def _is_javascript_tag(open_tag: str) -> bool:
+    script_type = re.search(r"""\btype\s*=\s*["']?([^"'\s>]*)""", open_tag, re.IGNORECASE)
+    return script_type is None or script_type.group(1).lower() in ("", "text/javascript", "application/javascript", "module")
+
+
+def _tokenize_css(css: str) -> list[tuple[str, bool]]:
+    """Split a stylesheet into code and string literals, dropping comments.
+
+    Comments and strings are found in a single pass, so that a quote within a comment doesn't start a string, nor a
+    comment opener within a string start a comment. Returns (text, is_code) pairs.
+    """
+    tokens: list[tuple[str, bool]] = []
+    code: list[str] = []
+    i = 0
+    length = len(css)
+
+    while i < length:
+        if css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+
+        elif css[i] in "\"'":
+            end = _string_end(css, i)
+            if code:
+                tokens.append(("".join(code), True))
+                code.clear()
+            tokens.append((css[i:end], False))
+            i = end
+
+        else:
+            end = _CSS_CODE_RUN.match(css, i).end()  # type: ignore[union-attr]
+            code.append(css[i:end])
+            i = end
+
+    if code:
+        tokens.append(("".join(code), True))
+    return tokens
+
+
+# Code up to the next character that may start a string or a comment, or that lone character.
+_CSS_CODE_RUN = re.compile(r"""[^"'/]+|/""")
+_JS_CODE_RUN = re.compile(r"""[^"'`/(){}]+""")
+
+# Characters after which a slash starts a regular expression literal, rather than being a division.
+JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^\n")
+JS_REGEX_PRECEDING_KEYWORDS = ("return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else")
+# Keywords whose parenthesised condition may be followed by a regular expression literal, e.g. `if (x) /a/.test(s)`.
+JS_CONDITION_KEYWORDS = ("if", "while", "for", "with")
+
+
+class _JsTokenizer:
+    """Splits a script into code and literals (strings, template literals, regular expressions), dropping comments.
+
+    The script is read in a single pass, handing each literal or comment to a scanner that returns where it ends.
+    Whether a slash starts a regular expression or is a division depends on the code before it.
+    """
+
+    def __init__(self, js: str):
+        self.js = js
+        self.tokens: list[tuple[str, bool]] = []
+        self._code: list[str] = []
+        self._brace_depth = 0
+        # Brace depth that each `${...}` substitution of the template literals being read was opened at.
+        self._template_brace_depths: list[int] = []
+        # Whether each open parenthesis holds the condition of a statement, and whether the last closed one did.
+        self._paren_conditions: list[bool] = []
+        self._closed_condition = False
+
+    def tokenize(self) -> list[tuple[str, bool]]:
+        """Get the script's (text, is_code) pairs."""
+        i = 0
+        while i < len(self.js):
+            i = self._scan(i)
+
+        self._flush_code()
+        return self.tokens
+
+    def _scan(self, i: int) -> int:
+        """Scan whatever starts at the given position, returning the position it ends at."""
+        char = self.js[i]
+
+        if char in "\"'":
+            return self._add_literal(i, _string_end(self.js, i))
+
+        if char == "`" or (char == "}" and self._template_brace_depths and self._template_brace_depths[-1] == self._brace_depth):
+            return self._scan_template(i)
+
+        if self.js.startswith(("//", "/*"), i):
+            return self._scan_comment(i)
+
+        if char == "/" and self._is_regex_start():
+            return self._add_literal(i, _regex_end(self.js, i))
+
+        if char in "(){}":
+            self._scan_bracket(char)
+            return i + 1
+
+        match = _JS_CODE_RUN.match(self.js, i)
+        end = i + 1 if match is None else match.end()
+        self._code.append(self.js[i:end])
+        return end
+
+    def _scan_template(self, i: int) -> int:
+        """Scan a template literal from its opening backtick (or the brace closing a substitution) to its end or next substitution."""
+        if self.js[i] == "}":
+            self._template_brace_depths.pop()
+
+        j = i + 1
+        while j < len(self.js):
+            if self.js[j] == "\\":
+                j += 2
+            elif self.js[j] == "`":
+                return self._add_literal(i, j + 1)
+            elif self.js.startswith("${", j):
+                self._template_brace_depths.append(self._brace_depth)
+                return self._add_literal(i, j + 2)
+            else:
+                j += 1
+
+        return self._add_literal(i, len(self.js))
+
+    def _scan_comment(self, i: int) -> int:
+        """Skip a comment, keeping the line break ending a line comment."""
+        if self.js.startswith("//", i):
+            end = self.js.find("\n", i)
+            return len(self.js) if end == -1 else end
+
+        end = self.js.find("*/", i + 2)
+        end = len(self.js) if end == -1 else end + 2
+        # A comment separates tokens like whitespace does, and like a line break if it spans lines, which matters for
+        # automatic semicolon insertion (e.g. after `return`).
+        self._code.append("\n" if self.js.find("\n", i, end) != -1 else " ")
+        return end
+
+    def _scan_bracket(self, char: str) -> None:
+        """Keep track of the parentheses holding conditions, and of the braces template substitutions are closed at."""
+        if char == "(":
+            self._paren_conditions.append(_last_word(self._previous_code()) in JS_CONDITION_KEYWORDS)
+        elif char == ")":
+            self._closed_condition = self._paren_conditions.pop() if self._paren_conditions else False
+        elif char == "{":
+            self._brace_depth += 1
+        else:
+            self._brace_depth -= 1
+
+        self._code.append(char)
+
+    def _is_regex_start(self) -> bool:
+        """Tell whether a slash starts a regular expression literal, rather than being a division."""
+        previous = self._previous_code()
+
+        if previous[-1] == ")":
+            return self._closed_condition
+
+        if previous[-1].isalnum() or previous[-1] in "_$":
+            return _last_word(previous) in JS_REGEX_PRECEDING_KEYWORDS
+
+        return previous[-1] in JS_REGEX_PRECEDERS
+
+    def _previous_code(self) -> str:
+        """Get the code before the current position, up to its last non-blank character, where literals count as operands."""
+        for chunk in reversed(self._code):
+            stripped_chunk = chunk.rstrip(" \t")
+            if stripped_chunk:
+                return stripped_chunk
+
+        for text, is_code in reversed(self.tokens):
+            if not is_code:
+                return "x"
+            stripped_text = text.rstrip(" \t")
+            if stripped_text:
+                return stripped_text
+
+        # The start of the script.
+        return "("
+
+    def _add_literal(self, start: int, end: int) -> int:
+        self._flush_code()
+        self.tokens.append((self.js[start:end], False))
+        return end
+
+    def _flush_code(self) -> None:
+        if self._code:
+            self.tokens.append(("".join(self._code), True))
+            self._code.clear()
+
+
+def _tokenize_js(js: str) -> list[tuple[str, bool]]:
+    """Split a script into code and literals (strings, template literals, regular expressions), dropping comments.
+
+    Returns (text, is_code) pairs.
+    """
+    return _JsTokenizer(js).tokenize()
+
+
+def _string_end(source: str, start: int) -> int:
+    """Find where the string literal opening at the given position ends: after its closing quote, or at the end of its line."""
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        if source[i] == quote:
+            return i + 1
+        if source[i] == "\n":
+            break
+        i += 2 if source[i] == "\\" else 1
+
+    return min(i, len(source))
+
+
+def _regex_end(js: str, start: int) -> int:
+    """Find where the regular expression literal opening at the given position ends, after its flags."""
+    j = start + 1
+    in_class = False
+    while j < len(js) and js[j] != "\n":
+        if js[j] == "\\":
+            j += 2
+            continue
+        if js[j] == "[":
+            in_class = True
+        elif js[j] == "]":
+            in_class = False
+        elif js[j] == "/" and not in_class:
+            break
+        j += 1
+    j += 1
+
+    # Flags
+    while j < len(js) and (js[j].isalnum() or js[j] in "_$"):
+        j += 1
+
+    return min(j, len(js))
+
+
+def _last_word(code: str) -> str | None:
+    """Get the identifier or keyword the code ends with, if any."""
+    match = re.search(r"[\w$]+$", code)
+    return match.group() if match is not None else None
@@ -0,0 +1,159 @@
+"""Compare two packages, or two release directories, from their archives' central directories."""
+from __future__ import annotations
+
+import difflib
+import zipfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from streamdeck_cli.commands.pack.size_report import format_size
+
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+
+
+PACKAGE_SUFFIX = ".streamDeckPlugin"
+
+# Largest entry (uncompressed) whose content gets diffed, beyond which it's reported like a binary file.
+MAX_CONTENT_DIFF_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class EntryChange:
+    """A file that was added, removed or changed between two packages, with None infos for the side it's missing from."""
+    path: str
+    old: zipfile.ZipInfo | None
+    new: zipfile.ZipInfo | None
+
+    @property
+    def status(self) -> str:
+        """How the file changed, as listed in the diff."""
+        return "added" if self.old is None else "removed" if self.new is None else "changed"
+
+
+@dataclass
+class ArchiveDiff:
+    """Differences between two packages of a plugin, either of which may be missing (e.g. a plugin added to a release).
+
+    Entries are matched by their path within the `<uuid>.sdPlugin` directory, and are considered changed if their CRC
+    or uncompressed size differs, which only takes reading the central directories.
+    """
+    name: str
+    old_filepath: Path | None
+    new_filepath: Path | None
+    changes: list[EntryChange] = field(default_factory=list)
+    unchanged_count: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether any file changed, or the whole package was added or removed."""
+        return bool(self.changes) or self.old_filepath is None or self.new_filepath is None
+
+    def count(self, status: str) -> int:
+        """Count the files with the given status."""
+        return sum(change.status == status for change in self.changes)
+
+
+def diff_releases(old_path: Path, new_path: Path) -> list[ArchiveDiff]:
+    """Compare two packages, or every package of two release directories, matching packages by file name."""
+    if not old_path.is_dir() and not new_path.is_dir():
+        return [diff_archives(old_path, new_path)]
+
+    old_packages = _list_packages(old_path)
+    new_packages = _list_packages(new_path)
+
+    return [
+        diff_archives(old_packages.get(name), new_packages.get(name), name=name)
+        for name in sorted(old_packages.keys() | new_packages.keys())
+    ]
+
+
+def diff_archives(old_filepath: Path | None, new_filepath: Path | None, name: str | None = None) -> ArchiveDiff:
+    """Compare two packages from their central directories, without decompressing anything."""
+    old_entries = read_entries(old_filepath) if old_filepath is not None else {}
+    new_entries = read_entries(new_filepath) if new_filepath is not None else {}
+
+    archive_diff = ArchiveDiff(name or (new_filepath or old_filepath).name, old_filepath, new_filepath)  # type: ignore[union-attr]
+    for path in sorted(old_entries.keys() | new_entries.keys()):
+        old, new = old_entries.get(path), new_entries.get(path)
+        if old is not None and new is not None and (old.CRC, old.file_size) == (new.CRC, new.file_size):
+            archive_diff.unchanged_count += 1
+        else:
+            archive_diff.changes.append(EntryChange(path, old, new))
+
+    return archive_diff
+
+
+def read_entries(archive_filepath: Path) -> dict[str, zipfile.ZipInfo]:
+    """Read the file entries of a package's central directory, by their path within the `<uuid>.sdPlugin` directory."""
+    with zipfile.ZipFile(archive_filepath) as zip_file:
+        infos = zip_file.infolist()
+
+    return {info.filename.split("/", 1)[-1]: info for info in infos if not info.is_dir()}
+
+
+def iter_content_diffs(archive_diff: ArchiveDiff) -> Generator[tuple[EntryChange, list[str]], None, None]:
+    """Decompress the entries that changed in both packages, yielding a unified diff of each (or a note if binary)."""
+    changed = [change for change in archive_diff.changes if change.status == "changed"]
+    if not changed or archive_diff.old_filepath is None or archive_diff.new_filepath is None:
+        return
+
+    with zipfile.ZipFile(archive_diff.old_filepath) as old_zip, zipfile.ZipFile(archive_diff.new_filepath) as new_zip:
+        for change in changed:
+            yield change, diff_entry_contents(old_zip, new_zip, change)
+
+
+def diff_entry_contents(old_zip: zipfile.ZipFile, new_zip: zipfile.ZipFile, change: EntryChange) -> list[str]:
+    """Get the unified diff of a changed text file, or a note if it's binary or too large to diff."""
+    if max(change.old.file_size, change.new.file_size) > MAX_CONTENT_DIFF_SIZE:  # type: ignore[union-attr]
+        return [f"Files a/{change.path} and b/{change.path} differ, too large to diff."]
+
+    try:
+        old_text = old_zip.read(change.old).decode("utf-8")  # type: ignore[arg-type]
+        new_text = new_zip.read(change.new).decode("utf-8")  # type: ignore[arg-type]
+    except UnicodeDecodeError:
+        return [f"Binary files a/{change.path} and b/{change.path} differ."]
+
+    return [
+        line.rstrip("\n")
+        for line in difflib.unified_diff(
+            old_text.splitlines(keepends=True),
+            new_text.splitlines(keepends=True),
+            fromfile=f"a/{change.path}",
+            tofile=f"b/{change.path}",
+        )
+    ]
+
+
+def format_archive_diff(archive_diff: ArchiveDiff) -> list[str]:
+    """Format the differences between two packages, one line per added (+), removed (-) or changed (~) file."""
+    if archive_diff.old_filepath is None:
+        return [f"{archive_diff.name}: added"]
+    if archive_diff.new_filepath is None:
+        return [f"{archive_diff.name}: removed"]
+
+    lines = [(
+        f"{archive_diff.name}: {archive_diff.count('added')} added, {archive_diff.count('removed')} removed, "
+        f"{archive_diff.count('changed')} changed, {archive_diff.unchanged_count} unchanged"
+    )]
+    for change in archive_diff.changes:
+        if change.old is None:
+            lines.append(f"  + {change.path} ({format_size(change.new.file_size)})")  # type: ignore[union-attr]
+        elif change.new is None:
+            lines.append(f"  - {change.path} ({format_size(change.old.file_size)})")
+        else:
+            delta = format_size(change.new.file_size - change.old.file_size, signed=True)
+            lines.append(f"  ~ {change.path} ({delta})")
+
+    return lines
+
+
+def _list_packages(path: Path) -> dict[str, Path]:
+    """List the packages of a release directory by file name, or the given package itself."""
+    if not path.is_dir():
+        return {path.name: path}
+
+    return {filepath.name: filepath for filepath in path.glob(f"*{PACKAGE_SUFFIX}") if filepath.is_file()}
@@ -0,0 +1,198 @@
+"""Break down what takes up space in a package, and how that changed since the previous release."""
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from streamdeck_cli.commands.pack.autoversion import get_previous_release_dirpath
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+
+# Number of files, directories and changes listed in the report by default.
+DEFAULT_TOP_COUNT = 10
+
+
+@dataclass(frozen=True)
+class SizeEntry:
+    """Compressed & uncompressed size of a file of the package, or of everything under one of its directories."""
+    path: str
+    compressed: int
+    uncompressed: int
+    file_count: int = 1
+
+    @property
+    def ratio(self) -> float:
+        """Compressed size relative to the uncompressed size, e.g. 0.25 for a file deflated to a quarter of its size."""
+        return self.compressed / self.uncompressed if self.uncompressed else 1.0
+
+
+@dataclass(frozen=True)
+class SizeChange:
+    """How the size of a file changed between two packages, with None sizes for files that were added or removed."""
+    path: str
+    old: SizeEntry | None
+    new: SizeEntry | None
+
+    @property
+    def compressed_delta(self) -> int:
+        """How much the compressed size of the file grew, negative if it shrank."""
+        return (self.new.compressed if self.new else 0) - (self.old.compressed if self.old else 0)
+
+
+@dataclass
+class SizeReport:
+    """Sizes of every file of a package, read from the archive's central directory without decompressing anything.
+
+    Paths are relative to the package's `<uuid>.sdPlugin` directory.
+    """
+    files: dict[str, SizeEntry] = field(default_factory=dict)
+
+    @classmethod
+    def from_archive(cls, archive_filepath: Path) -> SizeReport:
+        """Read the sizes of a package's files."""
+        with zipfile.ZipFile(archive_filepath) as zip_file:
+            infos = zip_file.infolist()
+
+        files: dict[str, SizeEntry] = {}
+        for info in infos:
+            if info.is_dir():
+                continue
+            # Strip the `<uuid>.sdPlugin/` directory every entry is under.
+            path = info.filename.split("/", 1)[-1]
+            files[path] = SizeEntry(path, info.compress_size, info.file_size)
+
+        return cls(files)
+
+    @property
+    def total(self) -> SizeEntry:
+        """Total size of the package's files."""
+        return SizeEntry(
+            "",
+            sum(entry.compressed for entry in self.files.values()),
+            sum(entry.uncompressed for entry in self.files.values()),
+            file_count=len(self.files),
+        )
+
+    def directories(self) -> dict[str, SizeEntry]:
+        """Get the total size of every directory, counting the files of its subdirectories."""
+        totals: dict[str, list[int]] = {}
+        for entry in self.files.values():
+            dirpath = posixpath.dirname(entry.path)
+            while dirpath:
+                total = totals.setdefault(dirpath, [0, 0, 0])
+                total[0] += entry.compressed
+                total[1] += entry.uncompressed
+                total[2] += 1
+                dirpath = posixpath.dirname(dirpath)
+
+        return {
+            dirpath: SizeEntry(f"{dirpath}/", compressed, uncompressed, file_count)
+            for dirpath, (compressed, uncompressed, file_count) in sorted(totals.items())
+        }
+
+    def largest_files(self, count: int | None = DEFAULT_TOP_COUNT) -> list[SizeEntry]:
+        """Get the files taking up the most space once compressed, all of them if count is None."""
+        return sorted(self.files.values(), key=lambda entry: (-entry.compressed, entry.path))[:count]
+
+    def diff(self, previous: SizeReport) -> list[SizeChange]:
+        """Get the files that were added, removed or changed in size since the previous package, largest change first."""
+        changes = [
+            SizeChange(path, previous.files.get(path), self.files.get(path))
+            for path in sorted(self.files.keys() | previous.files.keys())
+            if previous.files.get(path) != self.files.get(path)
+        ]
+        return sorted(changes, key=lambda change: -abs(change.compressed_delta))
+
+
+def find_previous_archive(archive_filepath: Path) -> Path | None:
+    """Find the same plugin's package in the release directory before the one the given package is in, if any."""
+    previous_release_dirpath = get_previous_release_dirpath(archive_filepath.parent)
+    if previous_release_dirpath is None:
+        return None
+
+    previous_archive_filepath = previous_release_dirpath / archive_filepath.name
+    return previous_archive_filepath if previous_archive_filepath.is_file() else None
+
+
+def format_archive_size_report(
+    archive_filepath: Path,
+    previous_archive_filepath: Path | None = None,
+    top_count: int | None = DEFAULT_TOP_COUNT,
+) -> str:
+    """Format the size report of a package, compared to the given previous package, or to the previous release's."""
+    if previous_archive_filepath is None:
+        previous_archive_filepath = find_previous_archive(archive_filepath)
+
+    previous_report = SizeReport.from_archive(previous_archive_filepath) if previous_archive_filepath is not None else None
+    previous_name = (
+        previous_archive_filepath.parent.name
+        if previous_archive_filepath is not None and previous_archive_filepath.name == archive_filepath.name
+        else str(previous_archive_filepath)
+    )
+
+    return format_size_report(SizeReport.from_archive(archive_filepath), previous_report, previous_name, top_count)
+
+
+def format_size_report(
+    report: SizeReport,
+    previous_report: SizeReport | None = None,
+    previous_name: str | None = None,
+    top_count: int | None = DEFAULT_TOP_COUNT,
+) -> str:
+    """Format the report as human-readable tables, only listing the top entries of each, all of them if top_count is None."""
+    total = report.total
+    lines = [(
+        f"Package size: {format_size(total.compressed)} compressed, {format_size(total.uncompressed)} uncompressed "
+        f"({total.ratio:.1%}), {total.file_count} files"
+    )]
+
+    lines.append("\nLargest files:")
+    lines.extend(_format_size_entries(report.largest_files(top_count)))
+
+    directories = sorted(report.directories().values(), key=lambda entry: (-entry.compressed, entry.path))
+    if directories:
+        lines.append("\nLargest directories:")
+        lines.extend(_format_size_entries(directories[:top_count]))
+
+    if previous_report is not None:
+        previous_total = previous_report.total
+        delta = total.compressed - previous_total.compressed
+        relative_delta = f" ({delta / previous_total.compressed:+.1%})" if previous_total.compressed else ""
+        lines.append(
+            f"\nCompared to {previous_name or 'the previous release'}: {format_size(delta, signed=True)} compressed{relative_delta}",
+        )
+
+        changes = report.diff(previous_report)
+        if not changes:
+            lines.append("  No file changed in size.")
+        for change in changes[:top_count]:
+            marker = "+" if change.old is None else "-" if change.new is None else "~"
+            lines.append(f"  {marker} {format_size(change.compressed_delta, signed=True):>12}  {change.path}")
+
+    return "\n".join(lines)
+
+
+def format_size(size: int, *, signed: bool = False) -> str:
+    """Format a number of bytes in the largest unit it's at least one of, with its sign if `signed`."""
+    sign = ("+" if size >= 0 else "-") if signed else ""
+    size = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:  # noqa: PLR2004
+            return f"{sign}{size:.0f} {unit}" if unit == "B" else f"{sign}{size:.1f} {unit}"
+        size /= 1024  # type: ignore[assignment]
+    return f"{sign}{size:.1f} GB"
+
+
+def _format_size_entries(entries: list[SizeEntry]) -> list[str]:
+    lines = [f"  {'compressed':>12}  {'uncompressed':>12}  {'ratio':>6}  path"]
+    lines.extend(
+        f"  {format_size(entry.compressed):>12}  {format_size(entry.uncompressed):>12}  {entry.ratio:>6.1%}  {entry.path}"
+        for entry in entries
+    )
+    return lines
@@ -0,0 +1,114 @@
+"""Content-addressed store that lets identical packages across release directories share the same disk space."""
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self  # noqa: UP035
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# Name of the directory (within the pack output directory) holding the content-addressed store.
+STORE_DIRNAME = ".pack-store"
+
+
+@dataclass
+class GcStats:
+    """What a garbage collection of the store removed."""
+    removed_count: int = 0
+    freed_bytes: int = 0
+
+    def __str__(self) -> str:
+        """Summarise what got removed, e.g. for the releases command's output."""
+        return f"removed {self.removed_count} unreferenced blobs, freeing {self.freed_bytes / 1024 / 1024:.1f} MB"
+
+
+class ArtifactStore:
+    """Store of packages keyed by their SHA-256 digest, which release directories hardlink to.
+
+    Every package added to the store gets hardlinked as a blob named after its digest. When a package is identical to
+    one that's already stored, it's replaced by a hardlink to that blob, so that any number of identical releases only
+    take the disk space of one. Since releases and blobs share the same inode, a blob's link count tells whether any
+    release still references it, which is what garbage collection relies on.
+    """
+
+    def __init__(self, store_dirpath: Path):
+        """Create a store kept in the given directory, use `for_output_dir` to get the store of an output directory."""
+        self.store_dirpath = store_dirpath
+
+    @classmethod
+    def for_output_dir(cls, output_dirpath: Path) -> Self:
+        """Get the store of an output directory, which lives next to its release directories."""
+        return cls(output_dirpath / STORE_DIRNAME)
+
+    def add(self, filepath: Path, digest: str) -> bool:
+        """Add a package to the store, returning whether it was deduplicated against an identical one already stored.
+
+        If hardlinks aren't supported (e.g. by the filesystem, or across devices), the package is left as-is.
+        """
+        blob_filepath = self._blob_filepath(digest)
+        blob_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            os.link(filepath, blob_filepath)
+
+        except FileExistsError:
+            pass
+
+        except OSError as e:
+            logger.warning("Unable to hardlink %s into the store at %s: %s", filepath, self.store_dirpath, e)
+            return False
+
+        else:
+            return False
+
+        # An identical package is already stored, so this one can point to the same data.
+        if blob_filepath.stat().st_size != filepath.stat().st_size:
+            logger.warning("Stored blob %s doesn't match the size of %s, leaving the package as-is.", blob_filepath, filepath)
+            return False
+
+        tmp_filepath = filepath.with_name(f".{filepath.name}.link.tmp")
+        try:
+            os.link(blob_filepath, tmp_filepath)
+            tmp_filepath.replace(filepath)
+
+        except OSError as e:
+            logger.warning("Unable to hardlink %s to the stored blob %s: %s", filepath, blob_filepath, e)
+            return False
+
+        finally:
+            tmp_filepath.unlink(missing_ok=True)
+
+        return True
+
+    def gc(self) -> GcStats:
+        """Delete the blobs no release references anymore, i.e. the ones that are their inode's only link."""
+        stats = GcStats()
+
+        for blob_filepath in self.store_dirpath.glob("blobs/*/*"):
+            st = blob_filepath.stat()
+            if st.st_nlink > 1:
+                continue
+
+            blob_filepath.unlink()
+            stats.removed_count += 1
+            stats.freed_bytes += st.st_size
+
+            # Drop the fan-out directory too, once it's empty.
+            with contextlib.suppress(OSError):
+                blob_filepath.parent.rmdir()
+
+        return stats
+
+    def _blob_filepath(self, digest: str) -> Path:
+        return self.store_dirpath / "blobs" / digest[:2] / digest
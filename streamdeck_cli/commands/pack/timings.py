@@ -0,0 +1,189 @@
+"""Per-phase timing and throughput of a pack, to find out what dominates the time it takes on large plugins."""
+from __future__ import annotations
+
+import contextlib
+import functools
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from streamdeck_cli.commands.pack.zip import PreparedFile
+
+
+
+# Number of slowest files listed in the report.
+SLOWEST_FILES_COUNT = 10
+
+# Phases in the order a pack goes through them, which is also the order they're reported in.
+PHASES = ("manifest", "allocate", "packignore", "cache", "walk", "match", "bytecode", "prepare", "write", "dedupe")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class FileTiming:
+    """Time spent preparing a single plugin file, and how much it shrank."""
+    relpath: str
+    bytes_in: int
+    bytes_out: int
+    read_seconds: float
+    hash_seconds: float
+    compress_seconds: float
+    cache_hit: bool
+
+    @property
+    def seconds(self) -> float:
+        """Time spent on the file in total."""
+        return self.read_seconds + self.hash_seconds + self.compress_seconds
+
+
+@dataclass
+class PackTimings:
+    """Time spent in each phase of a pack, along with per-file statistics.
+
+    Phases measure wall time on the main thread, excluding the phases nested within them (e.g. matching paths against
+    the .packignore specs happens during the walk, but isn't counted towards it). Reading, hashing and compressing files
+    may happen in worker threads, so they're measured per file instead, and their totals are summed across jobs.
+
+    Instrumented code takes a `PackTimings | None`, and only measures anything when it isn't None, so that packing
+    without timings doesn't pay for them.
+    """
+    total_seconds: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    files: list[FileTiming] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        """Start without any open phase."""
+        # Time spent in the phases nested within each currently open phase.
+        self._nested_seconds: list[float] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the time spent within the block, and count it towards the given phase."""
+        start = time.perf_counter()
+        self._nested_seconds.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + seconds - self._nested_seconds.pop()
+            if self._nested_seconds:
+                self._nested_seconds[-1] += seconds
+
+    def wrap(self, name: str, func: Callable[..., T]) -> Callable[..., T]:
+        """Wrap a function so that every call to it counts towards the given phase."""
+        @functools.wraps(func)
+        def timed_func(*args: object, **kwargs: object) -> T:
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return timed_func
+
+    def iterate(self, name: str, iterable: Iterator[T]) -> Iterator[T]:
+        """Iterate over an iterator, counting the time spent getting each item (but not using it) towards the given phase."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item  # type: ignore[misc]
+
+    def record_file(self, prepared_file: PreparedFile) -> None:
+        """Record the time spent preparing a file, and how much it shrank."""
+        self.files.append(FileTiming(
+            relpath=prepared_file.relpath,
+            bytes_in=prepared_file.stat.st_size,
+            bytes_out=len(prepared_file.entry.data),
+            read_seconds=prepared_file.read_seconds,
+            hash_seconds=prepared_file.hash_seconds,
+            compress_seconds=prepared_file.compress_seconds,
+            cache_hit=prepared_file.cache_hit,
+        ))
+
+    @property
+    def bytes_in(self) -> int:
+        """Size of the recorded files, before compression."""
+        return sum(file.bytes_in for file in self.files)
+
+    @property
+    def bytes_out(self) -> int:
+        """Size of the recorded files, once compressed."""
+        return sum(file.bytes_out for file in self.files)
+
+    @property
+    def other_seconds(self) -> float:
+        """Time that isn't accounted for by any phase."""
+        return max(self.total_seconds - sum(self.phases.values()), 0.0)
+
+    def slowest_files(self, count: int = SLOWEST_FILES_COUNT) -> list[FileTiming]:
+        """Get the files that took the longest to prepare, slowest first."""
+        return sorted(self.files, key=lambda file: file.seconds, reverse=True)[:count]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the timings as a JSON-serialisable dictionary."""
+        return {
+            "total_seconds": self.total_seconds,
+            "phases": {**_ordered_phases(self.phases), "other": self.other_seconds},
+            "file_work_seconds": {
+                "read": sum(file.read_seconds for file in self.files),
+                "hash": sum(file.hash_seconds for file in self.files),
+                "compress": sum(file.compress_seconds for file in self.files),
+            },
+            "file_count": len(self.files),
+            "cache_hits": sum(file.cache_hit for file in self.files),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "throughput_bytes_per_second": self.bytes_in / self.total_seconds if self.total_seconds else None,
+            "slowest_files": [asdict(file) for file in self.slowest_files()],
+            "files": [asdict(file) for file in self.files],
+        }
+
+    def format_report(self) -> str:
+        """Format the timings as a human-readable breakdown."""
+        stats = self.to_dict()
+        total = self.total_seconds or float("inf")
+
+        lines = [f"Pack timings ({self.total_seconds:.3f}s in total):"]
+        for name, seconds in stats["phases"].items():
+            lines.append(f"  {name:<12} {seconds:>8.3f}s  {seconds / total:>6.1%}")
+
+        file_work = stats["file_work_seconds"]
+        lines.append(
+            f"  File work, summed across jobs: read {file_work['read']:.3f}s, hash {file_work['hash']:.3f}s, "
+            f"compress {file_work['compress']:.3f}s",
+        )
+        lines.append(
+            f"Files: {stats['file_count']} ({stats['cache_hits']} cache hits), {_format_megabytes(self.bytes_in)} in, "
+            f"{_format_megabytes(self.bytes_out)} out, {_format_megabytes(self.bytes_in / total)}/s",
+        )
+
+        if self.files:
+            lines.append("Slowest files:")
+            lines.extend(
+                f"  {file.seconds:>8.3f}s  {file.relpath}  "
+                f"({_format_megabytes(file.bytes_in)} -> {_format_megabytes(file.bytes_out)}{', cached' if file.cache_hit else ''})"
+                for file in self.slowest_files()
+            )
+
+        return "\n".join(lines)
+
+
+def timed(timings: PackTimings | None, name: str) -> contextlib.AbstractContextManager[None]:
+    """Measure the time spent within the block if timings are being collected, otherwise do nothing."""
+    return contextlib.nullcontext() if timings is None else timings.phase(name)
+
+
+_EXHAUSTED = object()
+
+
+def _ordered_phases(phases: dict[str, float]) -> dict[str, float]:
+    return {name: phases[name] for name in sorted(phases, key=lambda name: (*PHASES, name).index(name))}
+
+
+def _format_megabytes(size: float) -> str:
+    return f"{size / 1024 / 1024:.2f} MB"
@@ -0,0 +1,193 @@
+"""Check an already-packed plugin, reading its archive in place rather than extracting it."""
+from __future__ import annotations
+
+import json
+import os
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING
+
+from pydantic import ValidationError
+
+from streamdeck_cli.commands.validate.batch import format_validation_error
+from streamdeck_cli.models.assets import ArchiveAssetIndex
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+
+PLUGIN_DIRNAME_SUFFIX = ".sdPlugin"
+
+MANIFEST_FILENAME = "manifest.json"
+
+# Size of the chunks entries are decompressed in, so that checking a large entry never loads it whole into memory.
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ArchiveVerification:
+    """Outcome of verifying a package, with every problem found rather than just the first one."""
+    archive_filepath: Path
+    manifest: Manifest | None = None
+    entries: list[zipfile.ZipInfo] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the package passed every check."""
+        return not self.errors
+
+
+def verify_archive(archive_filepath: Path, jobs: int = 1) -> ArchiveVerification:
+    """Verify the layout, manifest and integrity of a package.
+
+    Only the archive's central directory is read upfront. The package must hold a single `<uuid>.sdPlugin` directory
+    (as written by `archive_plugin_files`) whose name matches the UUID of the manifest inside it, and that manifest is
+    validated against the files in the archive instead of a plugin directory. Every entry is then decompressed (in
+    chunks) to check its CRC, in a pool of threads if more than one job is given, since zlib releases the GIL. A `jobs`
+    value of 0 or less means one job per CPU core.
+    """
+    verification = ArchiveVerification(archive_filepath)
+
+    try:
+        zip_file = zipfile.ZipFile(archive_filepath)
+    except (zipfile.BadZipFile, OSError) as e:
+        verification.errors.append(f"Not a valid package: {e}")
+        return verification
+
+    with zip_file:
+        verification.entries = zip_file.infolist()
+
+        plugin_dirname = check_layout(verification)
+        if plugin_dirname is not None:
+            check_manifest(zip_file, plugin_dirname, verification)
+
+        verification.errors.extend(check_entries(zip_file, verification.entries, jobs=jobs))
+
+    return verification
+
+
+def check_layout(verification: ArchiveVerification) -> str | None:
+    """Check that every entry is under the same `<uuid>.sdPlugin` directory, returning the name of that directory."""
+    plugin_dirnames: set[str] = set()
+    seen_names: set[str] = set()
+
+    for info in verification.entries:
+        name = info.filename
+        if name in seen_names:
+            verification.errors.append(f"Duplicate entry '{name}'.")
+        seen_names.add(name)
+
+        if "\\" in name or name.startswith("/") or ".." in PurePosixPath(name).parts:
+            verification.errors.append(f"Entry '{name}' has an unsafe path.")
+            continue
+
+        if "/" not in name.rstrip("/") and not info.is_dir():
+            verification.errors.append(f"Entry '{name}' is outside of the plugin directory.")
+            continue
+
+        plugin_dirnames.add(name.split("/", 1)[0])
+
+    if len(plugin_dirnames) != 1:
+        found = ", ".join(f"'{dirname}'" for dirname in sorted(plugin_dirnames)) or "none"
+        verification.errors.append(f"The package should hold exactly one plugin directory, found {found}.")
+        return None
+
+    plugin_dirname = plugin_dirnames.pop()
+    if not plugin_dirname.endswith(PLUGIN_DIRNAME_SUFFIX):
+        verification.errors.append(f"The plugin directory '{plugin_dirname}' should be named '<uuid>{PLUGIN_DIRNAME_SUFFIX}'.")
+        return None
+
+    return plugin_dirname
+
+
+def check_manifest(zip_file: zipfile.ZipFile, plugin_dirname: str, verification: ArchiveVerification) -> None:
+    """Validate the embedded manifest, checking the files it references against the archive's entries."""
+    manifest_name = f"{plugin_dirname}/{MANIFEST_FILENAME}"
+    try:
+        contents = json.loads(zip_file.read(manifest_name))
+    except KeyError:
+        verification.errors.append(f"The '{MANIFEST_FILENAME}' file is missing from the plugin directory.")
+        return
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        verification.errors.append(f"The '{MANIFEST_FILENAME}' file is not valid json: {e}")
+        return
+    # A corrupted manifest gets reported along with every other entry's CRC.
+    except (zipfile.BadZipFile, zlib.error, EOFError):
+        return
+
+    # Checked on the raw contents, so that it gets reported even if the manifest is invalid otherwise.
+    plugin_uuid = contents.get("UUID") if isinstance(contents, dict) else None
+    if isinstance(plugin_uuid, str) and plugin_dirname != f"{plugin_uuid}{PLUGIN_DIRNAME_SUFFIX}":
+        verification.errors.append(
+            f"The plugin directory '{plugin_dirname}' doesn't match the manifest's UUID, "
+            f"it should be '{plugin_uuid}{PLUGIN_DIRNAME_SUFFIX}'.",
+        )
+
+    relpaths = [
+        info.filename[len(plugin_dirname) + 1:]
+        for info in verification.entries
+        if info.filename.startswith(f"{plugin_dirname}/") and not info.is_dir()
+    ]
+    asset_index = ArchiveAssetIndex(relpaths)
+
+    try:
+        verification.manifest = Manifest.model_validate(
+            contents, context={"manifest_filepath": PurePosixPath(manifest_name), "asset_index": asset_index},
+        )
+    except ValidationError as e:
+        verification.errors.extend(format_validation_error(error) for error in e.errors())
+
+
+def check_entries(zip_file: zipfile.ZipFile, entries: list[zipfile.ZipInfo], jobs: int = 1) -> list[str]:
+    """Decompress every entry to check its CRC, returning the errors in the order of the entries."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    def check(info: zipfile.ZipInfo) -> str | None:
+        return check_entry(zip_file, info)
+
+    file_entries = [info for info in entries if not info.is_dir()]
+
+    # The archive's file handle is shared between threads, with each read seeking under a lock, and decompression
+    # happening outside of it.
+    if jobs == 1 or len(file_entries) <= 1:
+        errors = list(map(check, file_entries))
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(file_entries))) as executor:
+            errors = list(executor.map(check, file_entries))
+
+    return [error for error in errors if error is not None]
+
+
+def check_entry(zip_file: zipfile.ZipFile, info: zipfile.ZipInfo) -> str | None:
+    """Decompress an entry in chunks, returning an error if it's corrupted."""
+    try:
+        with zip_file.open(info) as entry:
+            # The CRC is checked by the entry itself, once it's read to the end.
+            while entry.read(CHUNK_SIZE):
+                pass
+    except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError) as e:
+        return f"Entry '{info.filename}' is corrupted: {e}"
+
+    return None
+
+
+def format_entries(entries: list[zipfile.ZipInfo]) -> list[str]:
+    """Format the entries of a package as a table, with their sizes, compression method and CRC."""
+    methods = {zipfile.ZIP_STORED: "stored", zipfile.ZIP_DEFLATED: "deflated"}
+    lines = [f"  {'size':>10}  {'compressed':>10}  {'method':<8}  {'crc':<8}  path"]
+    lines.extend(
+        f"  {info.file_size:>10}  {info.compress_size:>10}  {methods.get(info.compress_type, str(info.compress_type)):<8}  "
+        f"{info.CRC:08x}  {info.filename}"
+        for info in entries
+        if not info.is_dir()
+    )
+    return lines
+
@@ -0,0 +1,376 @@
+"""Watch a plugin directory, and repack the plugin whenever its files change."""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+import typer
+
+from streamdeck_cli.commands.pack.build import build_plugin_archive, load_manifest
+from streamdeck_cli.commands.pack.zip import (
+    PACKIGNORE_FILENAME,
+    compile_packignore_file,
+    get_packignore_matcher,
+    is_ignored,
+)
+
+
+if TYPE_CHECKING:
+    from streamdeck_cli.commands.pack.build import PackOptions
+    from streamdeck_cli.commands.pack.ignore import IgnoreMatcher
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# How long to wait for more changes after one is detected, so that a burst of changes (e.g. a save-all in the editor,
+# or a git checkout) triggers a single rebuild.
+DEBOUNCE_SECONDS = 0.2
+
+# How often the polling watcher compares snapshots of the plugin directory.
+POLL_INTERVAL_SECONDS = 0.5
+
+
+class Watcher(Protocol):
+    """Something that reports which files of the plugin directory changed."""
+
+    def wait_for_changes(self, timeout: float | None) -> set[str]:
+        """Block until some files change or the timeout expires, returning the changed paths relative to the plugin directory."""
+        ...
+
+    def close(self) -> None:
+        """Release the resources used to watch the plugin directory."""
+        ...
+
+
+class PluginFilter:
+    """Decides whether a path relative to the plugin directory is relevant to the package.
+
+    Paths are matched against the same chain of .packignore files as when walking the plugin directory to pack it: the
+    root one, followed by the ones in each directory leading to the path.
+    """
+
+    def __init__(self, plugin_dirpath: Path, output_dirpath: Path):
+        """Create a filter for the plugin directory, which leaves out the output directory if it's inside of it."""
+        self.plugin_dirpath = plugin_dirpath
+        # The (base directory, matcher) pairs applying to the entries of each directory, by the directory's relative path.
+        self._packignore_matchers: dict[str, list[tuple[str, IgnoreMatcher]]] = {}
+        self.reload_packignore("")
+
+        # If the output directory is inside the plugin directory, writing the package must not trigger another rebuild.
+        try:
+            self.output_relpath: str | None = output_dirpath.resolve().relative_to(plugin_dirpath.resolve()).as_posix()
+        except ValueError:
+            self.output_relpath = None
+
+    def is_relevant(self, relpath: str, *, is_dir: bool = False) -> bool:
+        """Check whether a path would get packed, reloading the .packignore file if that's the path."""
+        dir_relpath, _, name = relpath.rpartition("/")
+
+        # Changes to .packignore files always matter, since they change which files get packed.
+        if name == PACKIGNORE_FILENAME and not is_dir:
+            self.reload_packignore(dir_relpath)
+            return True
+
+        if self.output_relpath is not None and (relpath == self.output_relpath or relpath.startswith(f"{self.output_relpath}/")):
+            return False
+
+        return not is_ignored(f"{relpath}/" if is_dir else relpath, self.get_packignore_matchers(dir_relpath))
+
+    def get_packignore_matchers(self, dir_relpath: str) -> list[tuple[str, IgnoreMatcher]]:
+        """Get the .packignore matchers applying to the entries of a directory, ordered from the plugin root down."""
+        matchers = self._packignore_matchers.get(dir_relpath)
+        if matchers is None:
+            matchers = self.get_packignore_matchers(dir_relpath.rpartition("/")[0])
+
+            packignore_filepath = self.plugin_dirpath / dir_relpath / PACKIGNORE_FILENAME
+            if packignore_filepath.is_file():
+                matchers = [*matchers, (f"{dir_relpath}/", compile_packignore_file(packignore_filepath))]
+            self._packignore_matchers[dir_relpath] = matchers
+
+        return matchers
+
+    def reload_packignore(self, dir_relpath: str) -> None:
+        """Reload the .packignore file of a directory, along with the matchers of its subdirectories which build on it."""
+        if not dir_relpath:
+            self._packignore_matchers = {"": [("", get_packignore_matcher(self.plugin_dirpath))]}
+            return
+
+        self._packignore_matchers = {
+            relpath: matchers
+            for relpath, matchers in self._packignore_matchers.items()
+            if relpath != dir_relpath and not relpath.startswith(f"{dir_relpath}/")
+        }
+
+
+class PollingWatcher:
+    """Detects changes by periodically comparing the size & mtime of every packed file."""
+
+    def __init__(self, plugin_filter: PluginFilter, interval: float = POLL_INTERVAL_SECONDS):
+        """Take the first snapshot of the plugin directory, which changes are detected against."""
+        self.plugin_filter = plugin_filter
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def wait_for_changes(self, timeout: float | None) -> set[str]:
+        """Poll the plugin directory until some files change or the timeout expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {
+                relpath
+                for relpath in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(relpath) != self._snapshot.get(relpath)
+            }
+            self._snapshot = snapshot
+
+            packignore_relpaths = [relpath for relpath in changed if relpath.rpartition("/")[2] == PACKIGNORE_FILENAME]
+            if packignore_relpaths:
+                for relpath in packignore_relpaths:
+                    self.plugin_filter.reload_packignore(relpath.rpartition("/")[0])
+                # Files that the new patterns ignore or re-include are part of this change, not of the next one.
+                self._snapshot = self._take_snapshot()
+
+            if changed:
+                return changed
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+            time.sleep(self.interval if deadline is None else max(min(self.interval, deadline - time.monotonic()), 0))
+
+    def close(self) -> None:
+        """Nothing to release, since polling doesn't hold any resources."""
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        plugin_dirpath = self.plugin_filter.plugin_dirpath
+        snapshot: dict[str, tuple[int, int]] = {}
+
+        for dirpath, dirnames, filenames in os.walk(plugin_dirpath):
+            dir_relpath = Path(dirpath).relative_to(plugin_dirpath).as_posix() if dirpath != str(plugin_dirpath) else ""
+
+            # Like when packing, ignored directories get pruned rather than descended into.
+            dirnames[:] = [
+                name for name in dirnames if self.plugin_filter.is_relevant(_join_relpath(dir_relpath, name), is_dir=True)
+            ]
+
+            for name in filenames:
+                relpath = _join_relpath(dir_relpath, name)
+                # .packignore files may be ignored themselves, but changes to them still matter.
+                if name != PACKIGNORE_FILENAME and not self.plugin_filter.is_relevant(relpath):
+                    continue
+                try:
+                    st = (plugin_dirpath / relpath).stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[relpath] = (st.st_mtime_ns, st.st_size)
+
+        return snapshot
+
+
+class InotifyWatcher:
+    """Detects changes through Linux's inotify API, watching every directory that isn't ignored."""
+
+    # Flags from <sys/inotify.h>
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+        IN_DELETE_SELF | IN_MOVE_SELF
+    )
+
+    # struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, plugin_filter: PluginFilter):
+        """Set up an inotify instance, and watch every directory of the plugin that isn't ignored."""
+        self.plugin_filter = plugin_filter
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        # Map each watch descriptor to the path of its directory, relative to the plugin directory.
+        self._watched_dirs: dict[int, str] = {}
+        self._add_watches("")
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """Check whether inotify is available on this platform."""
+        return sys.platform.startswith("linux")
+
+    def wait_for_changes(self, timeout: float | None) -> set[str]:
+        """Wait for inotify events until the timeout expires, returning the paths they're about."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        return self._read_events()
+
+    def close(self) -> None:
+        """Close the inotify instance, which removes all of its watches."""
+        os.close(self._fd)
+
+    def _read_events(self) -> set[str]:
+        changed: set[str] = set()
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _cookie, name_length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + name_length].rstrip(b"\0")
+            offset += self.EVENT_HEADER.size + name_length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Some events were lost, so there's no telling what changed: report the whole plugin directory.
+                changed.add(".")
+                continue
+
+            if mask & self.IN_IGNORED:
+                self._watched_dirs.pop(wd, None)
+                continue
+
+            dir_relpath = self._watched_dirs.get(wd)
+            if dir_relpath is None or not name:
+                continue
+
+            relpath = _join_relpath(dir_relpath, os.fsdecode(name))
+            is_dir = bool(mask & self.IN_ISDIR)
+
+            if not self.plugin_filter.is_relevant(relpath, is_dir=is_dir):
+                continue
+
+            # New directories (created or moved in) need watching too, along with any subdirectories they already have.
+            if is_dir and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._add_watches(relpath)
+
+            # A changed .packignore file may re-include subdirectories that weren't watched so far.
+            elif not is_dir and os.fsdecode(name) == PACKIGNORE_FILENAME:
+                self._add_watches(dir_relpath)
+
+            changed.add(relpath)
+
+        return changed
+
+    def _add_watches(self, dir_relpath: str) -> None:
+        """Watch a directory and all of its subdirectories that aren't ignored."""
+        plugin_dirpath = self.plugin_filter.plugin_dirpath
+        pending = [dir_relpath]
+
+        while pending:
+            relpath = pending.pop()
+            dirpath = plugin_dirpath / relpath if relpath else plugin_dirpath
+
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                logger.warning("Unable to watch directory %s (errno %d)", dirpath, ctypes.get_errno())
+                continue
+            self._watched_dirs[wd] = relpath
+
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        child_relpath = _join_relpath(relpath, entry.name)
+                        if (
+                            entry.is_dir(follow_symlinks=False)
+                            and self.plugin_filter.is_relevant(child_relpath, is_dir=True)
+                        ):
+                            pending.append(child_relpath)
+            except FileNotFoundError:
+                continue
+
+
+def create_watcher(plugin_filter: PluginFilter, *, force_polling: bool = False) -> Watcher:
+    """Create an inotify watcher on Linux, falling back to polling elsewhere or if inotify is unavailable."""
+    if not force_polling and InotifyWatcher.is_supported():
+        try:
+            return InotifyWatcher(plugin_filter)
+        except (OSError, AttributeError) as e:
+            logger.warning("Unable to use inotify (%s), falling back to polling for changes.", e)
+
+    return PollingWatcher(plugin_filter)
+
+
+def wait_for_debounced_changes(watcher: Watcher, debounce: float = DEBOUNCE_SECONDS) -> set[str]:
+    """Wait for changes, then keep collecting them until things have been quiet for the debounce period."""
+    changed = watcher.wait_for_changes(timeout=None)
+
+    while more_changed := watcher.wait_for_changes(timeout=debounce):
+        changed |= more_changed
+
+    return changed
+
+
+def watch_and_repack(
+    plugin_dirpath: Path,
+    output_dirpath: Path,
+    output_filepath: Path,
+    options: PackOptions,
+    *,
+    force_polling: bool = False,
+) -> None:
+    """Rebuild the plugin's package at the given output file path every time the plugin's files change.
+
+    Every rebuild goes through the compression cache, so only the changed files get compressed again, while the
+    others are copied raw from the cache. Runs until interrupted.
+    """
+    watcher = create_watcher(PluginFilter(plugin_dirpath, output_dirpath), force_polling=force_polling)
+    typer.echo(f"Watching '{plugin_dirpath}' for changes (using {type(watcher).__name__}). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            changed = wait_for_debounced_changes(watcher)
+            start = time.perf_counter()
+
+            try:
+                # The manifest may have changed too, so it's validated again before every rebuild.
+                manifest = load_manifest(plugin_dirpath, options)
+                archive_result = build_plugin_archive(plugin_dirpath, output_filepath, output_dirpath, manifest, options)
+
+            # A broken edit shouldn't end the watch: report it, and wait for the next change to try again.
+            except (Exception, typer.Exit) as e:  # noqa: BLE001
+                typer.echo(f"Rebuild failed after {len(changed)} changed file(s): {e}")
+                continue
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            cache_stats = archive_result.cache_stats
+            cache_summary = f" (compression cache: {cache_stats})" if cache_stats is not None else ""
+            typer.echo(f"Rebuilt '{output_filepath}' in {elapsed_ms:.0f} ms after {len(changed)} changed file(s){cache_summary}.")
+
+    except KeyboardInterrupt:
+        typer.echo("Stopped watching.")
+
+    finally:
+        watcher.close()
+
+
+def _join_relpath(dir_relpath: str, name: str) -> str:
+    """Join a name to the relative path of its directory, which is empty for the plugin directory itself."""
+    return f"{dir_relpath}/{name}" if dir_relpath else name
@@ -1,80 +1,503 @@
 from __future__ import annotations
 
+import calendar
+import hashlib
 import logging
 import os
+import stat
+import time
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO
 
 import pathspec
 import typer
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
+from streamdeck_cli.commands.pack.bytecode import get_pyc_relpath, is_in_pycache, is_python_source
+from streamdeck_cli.commands.pack.cache import CompressionCache
+from streamdeck_cli.commands.pack.compression import CompressionPolicy, compress_data
+from streamdeck_cli.commands.pack.ignore import IgnoreMatcher
+from streamdeck_cli.commands.pack.timings import timed
+
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Iterable
+
+    from streamdeck_cli.commands.pack.bytecode import BytecodeCompiler
+    from streamdeck_cli.commands.pack.compression import CompressedEntry
+    from streamdeck_cli.commands.pack.optimize import AssetOptimizer
+    from streamdeck_cli.commands.pack.timings import PackTimings
 
 
 
 logger = logging.getLogger("streamdeck-cli")
 
+# Matchers compiled from .packignore files, by path, along with the mtime & size of the file when it was compiled.
+_compiled_packignore_files: dict[Path, tuple[tuple[int, int], IgnoreMatcher]] = {}
+
+
+PACKIGNORE_FILENAME = ".packignore"
+
+# Earliest time a zip file can hold, used as the timestamp of reproducible archives by default.
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Private `ZipFile` attributes that writing already-compressed entries relies on. Every supported Python version has
+# them, which the tests check, but they aren't part of the module's API.
+ZIPFILE_RAW_WRITE_INTERNALS = ("_lock", "_seekable", "_writecheck", "_didModify")
 
-def archive_plugin_files(
+
+@dataclass(frozen=True)
+class PreparedFile:
+    """A plugin file that's ready to be written to the archive."""
+    filepath: Path
+    relpath: str
+    stat: os.stat_result
+    content_hash: str
+    blob_id: str
+    entry: CompressedEntry
+    cache_hit: bool
+    # Only measured when the pack is timed.
+    read_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    compress_seconds: float = 0.0
+
+
+def archive_plugin_files(  # noqa: PLR0913 (one keyword-only argument per option of pack that applies to the archive)
     plugin_dirpath: Path,
-    output_filepath: Path,
+    output: Path | BinaryIO,
     plugin_uuid: str,
-    packignore_spec: pathspec.PathSpec,
+    packignore_spec: pathspec.PathSpec | IgnoreMatcher,
+    *,
     debug_port: int | None = None,
+    cache: CompressionCache | None = None,
+    jobs: int = 1,
+    compression_policy: CompressionPolicy | None = None,
+    reproducible: bool = False,
+    timings: PackTimings | None = None,
+    bytecode_compiler: BytecodeCompiler | None = None,
+    asset_optimizer: AssetOptimizer | None = None,
 ) -> None:
-    """Archive the plugin files into a a new zip file."""
-    with zipfile.ZipFile(output_filepath, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    """Archive the plugin files into a a new zip file.
+
+    The zip file is written either to the given file path, or to the given binary stream, which doesn't need to be
+    seekable (e.g. stdout when piped to another process).
+
+    The compression policy decides how each file is compressed, defaulting to storing already-compressed file types
+    and deflating everything else. If a compression cache is given, files that haven't changed since they were cached are copied raw into the archive
+    instead of being compressed again. With more than one job, files are compressed in parallel, but entries are still
+    written in the same order, so the archive is byte-identical to the one a single job would produce.
+
+    In reproducible mode, entries don't depend on the files' mtimes, permissions, or the platform the plugin is packed
+    on (see `reproducible_zipinfo`), so that the same plugin files always give the same archive, byte for byte.
+
+    If a bytecode compiler is given, the plugin's Python sources are precompiled, and each one's bytecode is added to
+    the `__pycache__` directory next to it, right after the source. Any `__pycache__` directory already in the plugin
+    directory is left out, in favour of the freshly compiled bytecode.
+
+    If an asset optimizer is given, the icons and property inspector files it applies to are losslessly shrunk before
+    being compressed (see `AssetOptimizer`).
+
+    If timings are given, the time spent walking, matching, preparing and writing files gets recorded in them, along
+    with per-file statistics.
+    """
+    # Entries are written in the walk order, which is sorted, so it never depends on the filesystem.
+    date_time = get_reproducible_date_time() if reproducible else None
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zip_file:
         # Files should be stuffed in the zip file under a base directory with the name of the plugin UUID found in the manifest.
         entry_prefix = f"{plugin_uuid}.sdPlugin"
 
-        for filepath in walk_filtered_plugin_files(source_dirpath=plugin_dirpath, packignore_spec=packignore_spec):
-            # Ensure these paths are relative to the current working directory, to ensure we're pointing to the actual path.
-            arcname: str = os.path.join(entry_prefix, str(filepath)).replace("\\", "/")
+        filepaths = walk_filtered_plugin_files(source_dirpath=plugin_dirpath, packignore_spec=packignore_spec, timings=timings)
+        if timings is not None:
+            filepaths = timings.iterate("walk", filepaths)
+
+        compression_policy = compression_policy or CompressionPolicy()
+
+        # Compiling needs every source upfront to spread them across processes, so the walk can't be streamed.
+        bytecode: dict[str, bytes] = {}
+        if bytecode_compiler is not None:
+            filepaths = [filepath for filepath in filepaths if not is_in_pycache(filepath.as_posix())]
+            with timed(timings, "bytecode"):
+                bytecode = bytecode_compiler.compile_plugin_files(
+                    plugin_dirpath,
+                    [filepath.as_posix() for filepath in filepaths if is_python_source(filepath.as_posix())],
+                    compression_cache=cache,
+                )
 
-            # The full path to the file of the current iteration
-            full_filepath: Path = plugin_dirpath / filepath
+        prepared_files = iter_prepared_plugin_files(
+            plugin_dirpath, filepaths, compression_policy, cache=cache, jobs=jobs,
+            timed=timings is not None, asset_optimizer=asset_optimizer,
+        )
+        if timings is not None:
+            prepared_files = timings.iterate("prepare", prepared_files)
 
-            logger.debug("%s,  %s", full_filepath, arcname)
+        for prepared_file in prepared_files:
+            # Zip entry names always use forward slashes, regardless of the platform the plugin is packed on.
+            arcname: str = f"{entry_prefix}/{prepared_file.relpath}"
 
-            zip_file.write(full_filepath, arcname=arcname)
+            with timed(timings, "write"):
+                zinfo = (
+                    reproducible_zipinfo(arcname, prepared_file.stat.st_mode, date_time)
+                    if date_time is not None else zipinfo_from_stat(arcname, prepared_file.stat)
+                )
+                write_compressed_entry(zip_file, zinfo, prepared_file.entry)
+
+                if cache is not None:
+                    cache.record(
+                        prepared_file.relpath,
+                        prepared_file.stat,
+                        prepared_file.content_hash,
+                        prepared_file.blob_id,
+                        prepared_file.entry,
+                        hit=prepared_file.cache_hit,
+                    )
+
+            if timings is not None:
+                timings.record_file(prepared_file)
+
+            if prepared_file.relpath in bytecode:
+                with timed(timings, "bytecode"):
+                    pyc_data = bytecode[prepared_file.relpath]
+                    pyc_relpath = get_pyc_relpath(prepared_file.relpath)
+                    pyc_arcname = f"{entry_prefix}/{pyc_relpath}"
+                    pyc_settings = compression_policy.choose(pyc_relpath, pyc_data)
+                    # The bytecode is checked against the source's hash rather than its mtime, so both can be anything.
+                    pyc_zinfo = (
+                        reproducible_zipinfo(pyc_arcname, prepared_file.stat.st_mode, date_time)
+                        if date_time is not None else zipinfo_from_stat(pyc_arcname, prepared_file.stat)
+                    )
+                    write_compressed_entry(
+                        zip_file, pyc_zinfo, compress_data(pyc_data, pyc_settings.compress_type, pyc_settings.compresslevel),
+                    )
 
 
         # Add a file `.debug` containing the debug port number if debug mode is enabled to the zip file
         if debug_port:
-            print("YOOO")
-            zip_file.writestr(f"{entry_prefix}/.debug", str(debug_port))
+            debug_arcname = f"{entry_prefix}/.debug"
+            # Written like any other entry, rather than through `ZipFile.writestr`, so that the archive's layout
+            # doesn't depend on whether the output is seekable.
+            debug_zinfo = (
+                reproducible_zipinfo(debug_arcname, 0o100644, date_time)
+                if date_time is not None else zipfile.ZipInfo(debug_arcname, time.localtime(time.time())[:6])
+            )
+            write_compressed_entry(zip_file, debug_zinfo, compress_data(str(debug_port).encode(), zipfile.ZIP_DEFLATED))
+
+    if cache is not None:
+        with timed(timings, "cache"):
+            cache.save()
+
+    if bytecode_compiler is not None and bytecode_compiler.cache is not None:
+        bytecode_compiler.cache.save()
 
+    if asset_optimizer is not None and asset_optimizer.cache is not None:
+        asset_optimizer.cache.evict()
 
-def walk_filtered_plugin_files(source_dirpath: Path, packignore_spec: pathspec.PathSpec) -> Generator[Path, None, None]:
-    """Walk through the plugin directory and yield files that are not ignored."""
-    # Walk through the directory and yield files that are not ignored
-    for root, _dirs, files in os.walk(source_dirpath):
-        if packignore_spec.match_file(root):
-            continue
 
-        for filename in files:
-            filepath = Path(root) / filename
-            if packignore_spec.match_file(filepath):
-                continue
+def iter_prepared_plugin_files(
+    plugin_dirpath: Path,
+    filepaths: Iterable[Path],
+    compression_policy: CompressionPolicy,
+    cache: CompressionCache | None = None,
+    jobs: int = 1,
+    *,
+    timed: bool = False,
+    asset_optimizer: AssetOptimizer | None = None,
+) -> Generator[PreparedFile, None, None]:
+    """Read & compress plugin files, yielding them in the same order as the given file paths.
+
+    With more than one job, files are prepared in a thread pool. Both zlib and hashlib release the GIL while working on
+    large buffers, so threads are enough to put every core to work without paying for pickling data between processes.
+    Only a bounded window of files is in flight at once, to keep memory usage in check on large plugins.
+    A `jobs` value of 0 or less means one job per CPU core. If `timed`, the time spent on each file is measured.
+    """
+    def prepare(filepath: Path) -> PreparedFile:
+        return prepare_plugin_file(
+            plugin_dirpath / filepath, filepath.as_posix(), compression_policy, cache,
+            timed=timed, asset_optimizer=asset_optimizer,
+        )
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs == 1:
+        yield from map(prepare, filepaths)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        window: deque[Future[PreparedFile]] = deque()
+        for filepath in filepaths:
+            window.append(executor.submit(prepare, filepath))
+            if len(window) >= jobs * 4:
+                yield window.popleft().result()
+
+        while window:
+            yield window.popleft().result()
+
+
+def prepare_plugin_file(
+    filepath: Path,
+    relpath: str,
+    compression_policy: CompressionPolicy,
+    cache: CompressionCache | None = None,
+    *,
+    timed: bool = False,
+    asset_optimizer: AssetOptimizer | None = None,
+) -> PreparedFile:
+    """Get the compressed entry for a plugin file, from the cache if possible, otherwise by compressing it.
+
+    This only reads from the cache, so that it can safely run in worker threads. Recording the outcome in the cache is
+    left to the caller. If `timed`, the time spent reading, hashing and compressing the file is measured, which costs
+    nothing otherwise.
+
+    Files the asset optimizer applies to are optimised before being compressed, and the content hash is the one of the
+    optimised content, which is what ends up in the archive.
+    """
+    start = time.perf_counter() if timed else 0.0
+    st = filepath.stat()
+
+    # Fast path: if the file's path, size and mtime all match the cache, the file doesn't even need to be read.
+    if cache is not None and (cached := cache.lookup_by_stat(relpath, st)) is not None:
+        content_hash, blob_id = cached
+        entry = cache.get(blob_id)
+        if entry is not None:
+            read_seconds = time.perf_counter() - start if timed else 0.0
+            return PreparedFile(filepath, relpath, st, content_hash, blob_id, entry, cache_hit=True, read_seconds=read_seconds)
+
+    data = filepath.read_bytes()
+    read_end = time.perf_counter() if timed else 0.0
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    if asset_optimizer is not None and asset_optimizer.applies_to(relpath):
+        optimized_data = asset_optimizer.optimize(relpath, data, content_hash)
+        if optimized_data is not data:
+            data = optimized_data
+            content_hash = hashlib.sha256(data).hexdigest()
+    settings = compression_policy.choose(relpath, data)
+    blob_id = CompressionCache.blob_id(content_hash, settings)
+    hash_end = time.perf_counter() if timed else 0.0
+
+    # The file was touched, but its content may still be the same as something that's already been compressed.
+    entry = cache.get(blob_id) if cache is not None else None
+    cache_hit = entry is not None
+    if entry is None:
+        entry = compress_data(data, settings.compress_type, settings.compresslevel)
+
+    return PreparedFile(
+        filepath, relpath, st, content_hash, blob_id, entry, cache_hit=cache_hit,
+        read_seconds=read_end - start,
+        hash_seconds=hash_end - read_end,
+        compress_seconds=time.perf_counter() - hash_end if timed else 0.0,
+    )
+
+
+def zipinfo_from_stat(arcname: str, st: os.stat_result) -> zipfile.ZipInfo:
+    """Create the ZipInfo of a file from its stat result, the same way `ZipInfo.from_file` would."""
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[0:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16  # Unix attributes
+    zinfo.file_size = st.st_size
+    return zinfo
+
+
+def get_reproducible_date_time() -> tuple[int, int, int, int, int, int]:
+    """Get the timestamp of every entry of a reproducible archive.
+
+    Following the reproducible-builds.org convention, this is the time in the `SOURCE_DATE_EPOCH` environment variable
+    (in UTC), if set, otherwise the earliest time a zip file can hold, which earlier times get clamped to.
+    """
+    source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not source_date_epoch:
+        return ZIP_EPOCH
+
+    try:
+        timestamp = int(source_date_epoch)
+    except ValueError as e:
+        typer.echo(f"ERROR: SOURCE_DATE_EPOCH must be a number of seconds since 1970-01-01, not '{source_date_epoch}'.")
+        raise typer.Exit(1) from e
+
+    # Zip files can't hold times before 1980, so earlier ones get clamped (before converting them, which may not
+    # support negative timestamps).
+    if timestamp < calendar.timegm(ZIP_EPOCH):
+        return ZIP_EPOCH
 
-            # Ensure these paths are relative to the current working directory, to ensure we're pointing to the actual path.
-            relative_path = filepath.relative_to(source_dirpath)
+    return time.gmtime(timestamp)[0:6]
 
-            yield relative_path
+
+def reproducible_zipinfo(arcname: str, st_mode: int, date_time: tuple[int, int, int, int, int, int]) -> zipfile.ZipInfo:
+    """Create the ZipInfo of a file of a reproducible archive.
+
+    The timestamp is fixed, permissions are normalised to either 644 or 755 (if the file is executable by anyone), and
+    the creating system is always Unix, so that packing the same files on another machine gives the same entry.
+    """
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.create_system = 3  # Unix
+    permissions = 0o755 if st_mode & 0o111 else 0o644
+    zinfo.external_attr = (stat.S_IFREG | permissions) << 16
+    return zinfo
+
+
+def write_compressed_entry(zip_file: zipfile.ZipFile, zinfo: zipfile.ZipInfo, entry: CompressedEntry) -> None:
+    """Write already-compressed data to the zip file as a new entry.
+
+    The `zipfile` module has no public API to add raw compressed data, so this mirrors what `ZipFile.open(..., "w")`
+    does, through the `zipfile` internals listed in `ZIPFILE_RAW_WRITE_INTERNALS`. The resulting bytes are the same as
+    if the entry had been written through `ZipFile.write`. Should a Python version lack any of these internals, the
+    data gets decompressed and written through `ZipFile.writestr` instead, which is slower but gives the same files.
+    """
+    zinfo.compress_type = entry.compress_type
+    zinfo.file_size = entry.file_size
+    zinfo.compress_size = len(entry.data)
+    zinfo.CRC = entry.crc
+    # The sizes and CRC are known upfront, so there's never a need for a trailing data descriptor.
+    zinfo.flag_bits = 0x00
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16  # permissions: ?rw-------
+
+    if not all(hasattr(zip_file, name) for name in ZIPFILE_RAW_WRITE_INTERNALS):
+        data = zlib.decompress(entry.data, -15) if entry.compress_type == zipfile.ZIP_DEFLATED else entry.data
+        zip_file.writestr(zinfo, data)
+        return
+
+    # Same rule as `zipfile` to decide whether the ZIP64 extra field is needed.
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+
+    with zip_file._lock:  # noqa: SLF001
+        if zip_file._seekable:  # noqa: SLF001
+            zip_file.fp.seek(zip_file.start_dir)
+        zinfo.header_offset = zip_file.fp.tell()
+
+        zip_file._writecheck(zinfo)  # noqa: SLF001
+        zip_file._didModify = True  # noqa: SLF001
+
+        zip_file.fp.write(zinfo.FileHeader(zip64))
+        zip_file.fp.write(entry.data)
+        zip_file.start_dir = zip_file.fp.tell()
+
+        zip_file.filelist.append(zinfo)
+        zip_file.NameToInfo[zinfo.filename] = zinfo
+
+
+def walk_filtered_plugin_files(
+    source_dirpath: Path,
+    packignore_spec: pathspec.PathSpec | IgnoreMatcher,
+    timings: PackTimings | None = None,
+) -> Generator[Path, None, None]:
+    """Walk through the plugin directory and yield files that are not ignored.
+
+    Paths are matched relative to the plugin directory, with directories having a trailing slash. Ignored directories
+    are pruned before being descended into, so their contents never get listed nor matched.
+
+    A `.packignore` file found in a subdirectory applies to that subdirectory, the same way nested `.gitignore` files
+    do: its patterns are relative to the directory it's in, and take precedence over the ones of parent directories.
+
+    Specifications get compiled into an `IgnoreMatcher`. Pass the root one already compiled to reuse it (and the
+    decisions it memoised) across walks.
+
+    If timings are given, the time spent matching paths and loading nested .packignore files gets recorded in them.
+    """
+    matcher = packignore_spec if isinstance(packignore_spec, IgnoreMatcher) else IgnoreMatcher(packignore_spec)
+    yield from _walk_filtered_directory(source_dirpath, "", [("", matcher)], timings)
+
+
+def _walk_filtered_directory(
+    dirpath: Path,
+    relative_dirpath: str,
+    packignore_matchers: list[tuple[str, IgnoreMatcher]],
+    timings: PackTimings | None = None,
+) -> Generator[Path, None, None]:
+    """Yield the files of a directory that are not ignored, then recurse into its subdirectories that are not ignored."""
+    # Sort the entries so that the walk order (and so the order of entries in the archive) doesn't depend on the filesystem.
+    with os.scandir(dirpath) as scanned_entries:
+        entries = sorted(scanned_entries, key=lambda entry: entry.name)
+
+    # Only wrapped when timed, so that walking without timings doesn't pay for them.
+    match = is_ignored if timings is None else timings.wrap("match", is_ignored)
+    load = compile_packignore_file if timings is None else timings.wrap("packignore", compile_packignore_file)
+
+    # The root directory's .packignore file has already been loaded by the caller.
+    if relative_dirpath and any(entry.name == PACKIGNORE_FILENAME and entry.is_file() for entry in entries):
+        nested_matcher = load(dirpath / PACKIGNORE_FILENAME)
+        packignore_matchers = [*packignore_matchers, (f"{relative_dirpath}/", nested_matcher)]
+
+    subdirectories: list[tuple[Path, str]] = []
+
+    for entry in entries:
+        relative_path = f"{relative_dirpath}/{entry.name}" if relative_dirpath else entry.name
+
+        # DirEntry caches the file type from the directory listing, so this doesn't cost an extra stat call on most platforms.
+        if entry.is_dir():
+            # Like os.walk, don't follow symlinks to directories.
+            if not entry.is_symlink() and not match(f"{relative_path}/", packignore_matchers):
+                subdirectories.append((Path(entry.path), relative_path))
+
+        elif not match(relative_path, packignore_matchers):
+            yield Path(relative_path)
+
+    for subdirectory_path, relative_subdirectory_path in subdirectories:
+        yield from _walk_filtered_directory(subdirectory_path, relative_subdirectory_path, packignore_matchers, timings)
+
+
+def is_ignored(relative_path: str, packignore_matchers: list[tuple[str, IgnoreMatcher]]) -> bool:
+    """Check whether a path is ignored by the applicable .packignore specifications.
+
+    The specifications are given as (base directory, matcher) pairs ordered from the plugin root down. The deepest one
+    with a pattern matching the path decides, so that nested .packignore files can override (or negate) their parents.
+    """
+    for base_dirpath, matcher in reversed(packignore_matchers):
+        include = matcher.check(relative_path[len(base_dirpath):])
+        if include is not None:
+            return include
+
+    return False
 
 
 def get_packignore_specification(source_dirpath: Path) -> pathspec.PathSpec:
     """Get the pathspec specification from the .packignore file."""
     try:
-        with (source_dirpath / ".packignore").open("r") as f:
-            spec = pathspec.PathSpec.from_lines(GitWildMatchPattern, f)  # type: ignore
+        spec = load_packignore_file(source_dirpath / PACKIGNORE_FILENAME)
 
     except FileNotFoundError as e:
         typer.echo("ERROR: '.packignore' file is missing from plugin directory...")
         raise typer.Exit(9) from e
 
     return spec
+
+
+def get_packignore_matcher(source_dirpath: Path) -> IgnoreMatcher:
+    """Get the compiled specification of the .packignore file."""
+    try:
+        matcher = compile_packignore_file(source_dirpath / PACKIGNORE_FILENAME)
+
+    except FileNotFoundError as e:
+        typer.echo("ERROR: '.packignore' file is missing from plugin directory...")
+        raise typer.Exit(9) from e
+
+    return matcher
+
+
+def compile_packignore_file(filepath: Path) -> IgnoreMatcher:
+    """Load and compile a .packignore file, reusing the matcher compiled earlier if the file didn't change since.
+
+    This only pays off in long-running processes (watch mode, or the `serve` daemon), where the same .packignore files
+    get matched against on every pack, along with the decisions their matchers memoised.
+    """
+    stat = filepath.stat()
+    file_key = (stat.st_mtime_ns, stat.st_size)
+
+    compiled = _compiled_packignore_files.get(filepath)
+    if compiled is not None and compiled[0] == file_key:
+        return compiled[1]
+
+    matcher = IgnoreMatcher(load_packignore_file(filepath))
+    _compiled_packignore_files[filepath] = (file_key, matcher)
+    return matcher
+
+
+def load_packignore_file(filepath: Path) -> pathspec.PathSpec:
+    """Load a .packignore file into a pathspec specification."""
+    with filepath.open("r") as f:
+        return pathspec.PathSpec.from_lines(GitWildMatchPattern, f)  # type: ignore
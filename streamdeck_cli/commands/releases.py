@@ -0,0 +1,47 @@
+"""Manage the release directories that pack creates in its output directory."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import typer
+
+from streamdeck_cli.commands.pack.store import STORE_DIRNAME, ArtifactStore, GcStats
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+releases_cli = typer.Typer()
+
+
+@releases_cli.callback(short_help=COMMAND_SHORT_HELP["releases"])
+def releases() -> None:
+    """Manage the release directories of packed plugins."""
+
+
+@releases_cli.command()
+def gc(
+    output_dirpath: Path = typer.Argument(  # noqa: B008
+        ...,
+        default_factory=lambda: Path.cwd() / "releases",
+        help="Output directory of the pack command",
+        show_default="./releases",
+    ),
+) -> None:
+    """Delete the blobs of the content-addressed store that no release directory references anymore."""
+    # When many plugins were packed at once, each one has its own output subdirectory, with its own store.
+    store_dirpaths = [output_dirpath / STORE_DIRNAME, *sorted(output_dirpath.glob(f"*/{STORE_DIRNAME}"))]
+
+    total_stats = GcStats()
+    for store_dirpath in store_dirpaths:
+        if not store_dirpath.is_dir():
+            continue
+
+        stats = ArtifactStore(store_dirpath).gc()
+        total_stats.removed_count += stats.removed_count
+        total_stats.freed_bytes += stats.freed_bytes
+
+    typer.echo(f"Garbage collection {total_stats}.")
+
+
+
+if __name__ == "__main__":
+    releases_cli()
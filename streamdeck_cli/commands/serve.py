@@ -0,0 +1,53 @@
+"""Run a daemon that keeps the CLI loaded, for clients to run commands in without paying for its startup."""
+from __future__ import annotations
+
+import contextlib
+import signal
+import socket
+import sys
+from pathlib import Path  # noqa: TC003 (Typer reads the annotations of the command's parameters at runtime)
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.daemon.protocol import FORWARDED_COMMANDS, default_socket_path
+from streamdeck_cli.daemon.server import DaemonAlreadyRunningError, DaemonServer
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+serve_cli = typer.Typer()
+
+
+@serve_cli.command(short_help=COMMAND_SHORT_HELP["serve"])
+def serve(
+    socket_path: Optional[Path] = typer.Option(  # noqa: UP045, B008
+        None,
+        "--socket",
+        help="Path of the Unix socket to listen on (defaults to $STREAMDECK_CLI_SOCKET, or a socket in the user's runtime directory)",
+        show_default=False,
+    ),
+) -> None:
+    """Listen for pack & validate commands sent by `streamdeck-cli-client`, running them with the CLI already loaded."""
+    if not hasattr(socket, "AF_UNIX"):
+        typer.echo("ERROR: The daemon needs Unix sockets, which aren't supported on this platform.")
+        raise typer.Exit(1)
+
+    socket_path_str = str(socket_path) if socket_path is not None else default_socket_path()
+    try:
+        server = DaemonServer(socket_path_str)
+    except (DaemonAlreadyRunningError, OSError) as e:
+        typer.echo(f"ERROR: Couldn't listen on '{socket_path_str}': {e}")
+        raise typer.Exit(1) from e
+
+    # Shut down cleanly (removing the socket) when stopped by a service manager, not just with Ctrl+C.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    typer.echo(f"Running {' & '.join(sorted(FORWARDED_COMMANDS))} commands sent to '{socket_path_str}', stop with Ctrl+C.")
+    # Closing the server removes its socket.
+    with server, contextlib.suppress(KeyboardInterrupt):
+        server.serve_forever()
+
+
+
+if __name__ == "__main__":
+    serve_cli()
@@ -0,0 +1,46 @@
+"""Report what takes up space in an already-packed plugin."""
+from __future__ import annotations
+
+# Typer reads the annotations of the command's parameters at runtime.
+from pathlib import Path  # noqa: TC003
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.commands.pack.size_report import DEFAULT_TOP_COUNT, format_archive_size_report
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+size_cli = typer.Typer()
+
+
+@size_cli.command(short_help=COMMAND_SHORT_HELP["size"])
+def size(
+    archive_filepath: Path = typer.Argument(  # noqa: B008
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Path to the .streamDeckPlugin file",
+    ),
+    previous_archive_filepath: Optional[Path] = typer.Option(  # noqa: UP045, B008
+        None,
+        "--against",
+        exists=True,
+        dir_okay=False,
+        help="Package to compare sizes against (defaults to the same plugin's package in the previous release directory, if any)",
+        show_default=False,
+    ),
+    top_count: int = typer.Option(
+        DEFAULT_TOP_COUNT,
+        "--top",
+        min=0,
+        help="Number of files, directories and changes to list (0 to list all of them)",
+    ),
+) -> None:
+    """Print the compressed & uncompressed sizes of a package's files and directories, and how they changed since the previous release."""
+    typer.echo(format_archive_size_report(archive_filepath, previous_archive_filepath, top_count=top_count or None))
+
+
+
+if __name__ == "__main__":
+    size_cli()
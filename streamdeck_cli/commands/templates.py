@@ -0,0 +1,52 @@
+"""Manage the local cache of templates that the create command scaffolds plugins from."""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+from streamdeck_cli.utils.template_cache import DEFAULT_TEMPLATE_SRC, TemplateCache
+
+
+templates_cli = typer.Typer()
+
+
+@templates_cli.callback(short_help=COMMAND_SHORT_HELP["templates"])
+def templates() -> None:
+    """Manage the local cache of plugin templates."""
+
+
+@templates_cli.command()
+def refresh(
+    src_path: str = typer.Argument(DEFAULT_TEMPLATE_SRC, help="Git URL of the template to fetch"),
+    vcs_ref: Optional[str] = typer.Option(  # noqa: UP045
+        None,
+        "--vcs-ref",
+        help="Git revision (branch, tag or commit) of the template to pin, instead of its latest version tag (or default branch if it has none)",
+    ),
+) -> None:
+    """Fetch the latest revisions of a template into the cache, and pin the create command to them."""
+    pin = TemplateCache.default().refresh(src_path, vcs_ref)
+
+    typer.echo(f"Pinned template '{pin.src}' at {pin.ref} to {pin.commit}.")
+
+
+@templates_cli.command("list")
+def list_templates() -> None:
+    """List the cached templates, and the revisions they're pinned to."""
+    pins = TemplateCache.default().list_pins()
+
+    if not pins:
+        typer.echo("No templates cached yet.")
+        return
+
+    for pin in pins:
+        fetched_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(pin.fetched_at))
+        typer.echo(f"{pin.src}  {pin.ref}  {pin.commit[:12]}  (fetched {fetched_at})")
+
+
+
+if __name__ == "__main__":
+    templates_cli()
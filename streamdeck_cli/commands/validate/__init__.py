@@ -0,0 +1,99 @@
+"""Validate the manifest and directory structure of one or many Stream Deck plugins."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.commands.validate.batch import ValidationResult, validate_plugins
+from streamdeck_cli.commands.validate.report import ReportFormat, write_report
+from streamdeck_cli.models.cache import ManifestCache
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+from streamdeck_cli.utils.plugin_paths import discover_plugin_dirpaths, expand_plugin_dirpaths
+
+
+validate_cli = typer.Typer()
+
+
+@validate_cli.command(short_help=COMMAND_SHORT_HELP["validate"])
+def validate(
+    plugin_dirpaths: Optional[list[Path]] = typer.Argument(  # noqa: UP045, B008
+        None,
+        help="Path to the plugin directory (defaults to the current directory). Pass several paths or a glob pattern to validate many plugins at once",
+        show_default=False,
+    ),
+    recursive: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--recursive",
+        "-r",
+        help="Validate every plugin found under the given directories, i.e. every directory containing a manifest.json file",
+    ),
+    jobs: Optional[int] = typer.Option(  # noqa: UP045
+        None,
+        "--jobs",
+        "-j",
+        help="Number of plugins to validate in parallel (defaults to one per CPU core)",
+        show_default=False,
+    ),
+    use_cache: bool = typer.Option(  # noqa: FBT001
+        True,  # noqa: FBT003
+        "--cache/--no-cache",
+        help="Reuse a manifest's last validation result if neither it nor the files it references changed since",
+    ),
+    report_filepath: Optional[Path] = typer.Option(  # noqa: UP045, B008
+        None,
+        "--report",
+        help="Write a machine-readable report of the validation results to this file",
+    ),
+    report_format: ReportFormat = typer.Option(  # noqa: B008
+        ReportFormat.JSON,
+        "--report-format",
+        help="Format of the report file",
+    ),
+) -> None:
+    """Validate the manifest and directory structure of one or many Stream Deck plugins."""
+    plugin_dirpaths = expand_plugin_dirpaths(plugin_dirpaths or [Path.cwd()])
+
+    if recursive:
+        plugin_dirpaths = [
+            discovered_dirpath
+            for root_dirpath in plugin_dirpaths
+            for discovered_dirpath in discover_plugin_dirpaths(root_dirpath)
+        ]
+
+    if not plugin_dirpaths:
+        typer.echo("ERROR: No plugin directories matched the given paths.")
+        raise typer.Exit(1)
+
+    cache = ManifestCache.default() if use_cache else None
+    results = validate_plugins(plugin_dirpaths, max_workers=jobs, cache=cache)
+
+    if report_filepath is not None:
+        write_report(results, report_filepath, report_format)
+
+    echo_results(results)
+
+    if not all(result.succeeded for result in results):
+        raise typer.Exit(1)
+
+
+def echo_results(results: list[ValidationResult]) -> None:
+    """Print every plugin's validation errors, followed by a summary if there are several plugins."""
+    for result in results:
+        if result.succeeded:
+            typer.echo(f"Manifest validation completed successfully for plugin '{result.plugin_name}'.")
+            continue
+
+        typer.echo(f"ERROR: Manifest validation failed for plugin at '{result.plugin_dirpath}':")
+        for error in result.errors:
+            typer.echo(f"  - {error}")
+
+    if len(results) > 1:
+        failed_count = sum(not result.succeeded for result in results)
+        typer.echo(f"Validated {len(results)} plugins: {len(results) - failed_count} passed, {failed_count} failed.")
+
+
+
+if __name__ == "__main__":
+    validate_cli()
@@ -0,0 +1,95 @@
+"""Validate several plugins at once, collecting every error of each plugin instead of stopping at the first one."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING
+
+from pydantic import ValidationError
+
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from streamdeck_cli.models.cache import ManifestCache
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """Outcome of validating one plugin."""
+    plugin_dirpath: Path
+    seconds: float
+    plugin_uuid: str | None = None
+    plugin_name: str | None = None
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the plugin is valid."""
+        return not self.errors
+
+
+def validate_plugins(
+    plugin_dirpaths: list[Path],
+    max_workers: int | None = None,
+    cache: ManifestCache | None = None,
+) -> list[ValidationResult]:
+    """Validate every plugin concurrently across a pool of threads.
+
+    Validation mostly waits on the filesystem (reading manifests and checking their assets), so threads are enough,
+    and don't pay the startup cost of worker processes. Results are returned in the same order as the plugin directories.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(plugin_dirpaths) <= 1:
+        return [validate_plugin(plugin_dirpath, cache) for plugin_dirpath in plugin_dirpaths]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(plugin_dirpaths))) as executor:
+        return list(executor.map(partial(validate_plugin, cache=cache), plugin_dirpaths))
+
+
+def validate_plugin(plugin_dirpath: Path, cache: ManifestCache | None = None) -> ValidationResult:
+    """Validate a single plugin's manifest, collecting every error found rather than raising the first one."""
+    start = time.perf_counter()
+
+    if not plugin_dirpath.is_dir():
+        errors = ["Provided plugin directory does not exist on machine."]
+        return ValidationResult(plugin_dirpath=plugin_dirpath, seconds=time.perf_counter() - start, errors=errors)
+
+    try:
+        manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+
+    except ValidationError as e:
+        errors = [format_validation_error(error) for error in e.errors()]
+
+    except FileNotFoundError:
+        errors = ["The 'manifest.json' file is missing from the plugin directory."]
+
+    except json.JSONDecodeError as e:
+        errors = [f"The 'manifest.json' file is not valid json: {e}"]
+
+    # Any other failure should be reported instead of stopping the other plugins' validation.
+    except Exception as e:  # noqa: BLE001
+        errors = [str(e) or type(e).__name__]
+
+    else:
+        return ValidationResult(
+            plugin_dirpath=plugin_dirpath,
+            seconds=time.perf_counter() - start,
+            plugin_uuid=manifest.uuid,
+            plugin_name=manifest.name,
+        )
+
+    return ValidationResult(plugin_dirpath=plugin_dirpath, seconds=time.perf_counter() - start, errors=errors)
+
+
+def format_validation_error(error: dict) -> str:
+    """Format one of the errors of a pydantic ValidationError, prefixed with the location of the offending field."""
+    location = ".".join(str(part) for part in error.get("loc", ()))
+    return f"{location}: {error['msg']}" if location else error["msg"]
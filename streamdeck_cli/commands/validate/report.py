@@ -0,0 +1,83 @@
+"""Machine-readable reports of the validation results of many plugins, for CI systems to pick up."""
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from enum import Enum
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from streamdeck_cli.commands.validate.batch import ValidationResult
+
+
+# enum.StrEnum is only available as of Python 3.11.
+class ReportFormat(str, Enum):  # noqa: UP042
+    """Formats of the report files."""
+
+    JSON = "json"
+    JUNIT = "junit"
+
+
+def write_report(results: list[ValidationResult], report_filepath: Path, report_format: ReportFormat) -> None:
+    """Write the validation results to a report file in the given format."""
+    report_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    if report_format is ReportFormat.JUNIT:
+        write_junit_report(results, report_filepath)
+    else:
+        write_json_report(results, report_filepath)
+
+
+def write_json_report(results: list[ValidationResult], report_filepath: Path) -> None:
+    """Write a JSON report with a summary, and the status & errors of each plugin."""
+    report = {
+        "summary": {
+            "total": len(results),
+            "passed": sum(result.succeeded for result in results),
+            "failed": sum(not result.succeeded for result in results),
+        },
+        "plugins": [
+            {
+                "path": str(result.plugin_dirpath),
+                "uuid": result.plugin_uuid,
+                "name": result.plugin_name,
+                "status": "passed" if result.succeeded else "failed",
+                "seconds": round(result.seconds, 6),
+                "errors": result.errors,
+            }
+            for result in results
+        ],
+    }
+
+    report_filepath.write_text(json.dumps(report, indent=2))
+
+
+def write_junit_report(results: list[ValidationResult], report_filepath: Path) -> None:
+    """Write a JUnit XML report, with one test case per plugin, and one failure per validation error."""
+    test_suites = ET.Element("testsuites")
+    test_suite = ET.SubElement(
+        test_suites,
+        "testsuite",
+        name="streamdeck-cli validate",
+        tests=str(len(results)),
+        failures=str(sum(not result.succeeded for result in results)),
+        errors="0",
+        time=f"{sum(result.seconds for result in results):.6f}",
+    )
+
+    for result in results:
+        test_case = ET.SubElement(
+            test_suite,
+            "testcase",
+            classname="manifest",
+            name=str(result.plugin_dirpath),
+            time=f"{result.seconds:.6f}",
+        )
+        for error in result.errors:
+            failure = ET.SubElement(test_case, "failure", message=error)
+            failure.text = error
+
+    ET.ElementTree(test_suites).write(report_filepath, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,58 @@
+"""Check an already-packed plugin without extracting it."""
+from __future__ import annotations
+
+# Typer reads the annotations of the command's parameters at runtime.
+from pathlib import Path  # noqa: TC003
+from typing import Optional
+
+import typer
+
+from streamdeck_cli.commands.pack.verify import format_entries, verify_archive
+from streamdeck_cli.utils.command_help import COMMAND_SHORT_HELP
+
+
+verify_cli = typer.Typer()
+
+
+@verify_cli.command(short_help=COMMAND_SHORT_HELP["verify"])
+def verify(
+    archive_filepath: Path = typer.Argument(  # noqa: B008
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Path to the .streamDeckPlugin file",
+    ),
+    jobs: Optional[int] = typer.Option(  # noqa: UP045
+        None,
+        "--jobs",
+        "-j",
+        help="Number of entries to check in parallel (defaults to one per CPU core)",
+        show_default=False,
+    ),
+    list_entries: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--list",
+        "-l",
+        help="Also list the package's entries, with their sizes, compression method and CRC",
+    ),
+) -> None:
+    """Verify a package's layout, embedded manifest and the integrity of every entry, reading the archive in place."""
+    verification = verify_archive(archive_filepath, jobs=0 if jobs is None else jobs)
+
+    if list_entries:
+        typer.echo("\n".join(format_entries(verification.entries)))
+
+    if not verification.succeeded:
+        typer.echo(f"Package '{archive_filepath}' is invalid:")
+        for error in verification.errors:
+            typer.echo(f"  - {error}")
+        raise typer.Exit(1)
+
+    manifest = verification.manifest
+    file_count = sum(not info.is_dir() for info in verification.entries)
+    typer.echo(f"Package '{archive_filepath}' is valid: {manifest.uuid} v{manifest.version}, {file_count} files.")  # type: ignore[union-attr]
+
+
+
+if __name__ == "__main__":
+    verify_cli()
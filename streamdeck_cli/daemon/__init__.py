@@ -0,0 +1 @@
+"""Run commands in a long-lived process, so that they don't pay for the CLI's startup on every call."""
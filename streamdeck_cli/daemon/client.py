@@ -0,0 +1,84 @@
+"""Thin client forwarding `pack` and `validate` commands to the daemon started with `streamdeck-cli serve`.
+
+Only the standard library gets imported, unless there's no daemon to forward to, in which case the command runs in
+this process, just like `streamdeck-cli` would run it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import BinaryIO
+
+from streamdeck_cli.daemon.protocol import (
+    EXIT,
+    REQUEST,
+    STDOUT,
+    connect,
+    default_socket_path,
+    is_forwardable,
+    recv_frame,
+    send_frame,
+)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a command in the daemon if it's one it runs and it's listening, otherwise in this process."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    exit_code = forward(argv) if is_forwardable(argv) else None
+    if exit_code is None:
+        # Only imported when there's no daemon to forward the command to, which is what the client saves.
+        from streamdeck_cli.__main__ import cli  # noqa: PLC0415
+
+        cli(argv, prog_name="streamdeck-cli")
+
+    sys.exit(exit_code)
+
+
+def forward(
+    argv: list[str],
+    socket_path: str | None = None,
+    stdout: BinaryIO | None = None,
+    stderr: BinaryIO | None = None,
+) -> int | None:
+    """Run a command in the daemon, relaying its output as it comes, and return its exit code.
+
+    The command runs in the client's working directory and environment. Returns None if there's no daemon listening,
+    so that the caller can run the command itself.
+    """
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+
+    try:
+        sock = connect(socket_path or default_socket_path())
+    except OSError:
+        return None
+
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),  # noqa: PTH109
+        "env": dict(os.environ),
+        "stdout_isatty": stdout.isatty(),
+        "stderr_isatty": stderr.isatty(),
+    }
+
+    with sock:
+        send_frame(sock, REQUEST, json.dumps(request).encode())
+
+        while (frame := recv_frame(sock)) is not None:
+            kind, payload = frame
+            if kind == EXIT:
+                return int(payload)
+
+            stream = stdout if kind == STDOUT else stderr
+            stream.write(payload)
+            stream.flush()
+
+    stderr.write(b"ERROR: The daemon closed the connection before the command finished.\n")
+    return 1
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Messages exchanged between the daemon and its clients over a Unix socket.
+
+This module (like the client) only imports from the standard library, so that forwarding a command stays cheap.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import struct
+
+
+# Environment variable to override the path of the daemon's socket.
+SOCKET_ENV_VAR = "STREAMDECK_CLI_SOCKET"
+
+# Commands the daemon runs. Anything else (e.g. watch mode, which never returns) runs in the client's own process.
+FORWARDED_COMMANDS = frozenset({"pack", "validate"})
+NOT_FORWARDED_OPTIONS = frozenset({"--watch", "-w"})
+
+# Kinds of frames: a client's request, then the command's output and finally its exit code, from the daemon.
+REQUEST = b"q"
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+
+# Every frame starts with its kind and the length of its payload.
+_HEADER = struct.Struct("!cI")
+
+
+def default_socket_path() -> str:
+    """Get the path of the daemon's socket, in the user's runtime directory unless overridden by the environment."""
+    if socket_path := os.environ.get(SOCKET_ENV_VAR):
+        return socket_path
+
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(runtime_dir, "streamdeck-cli.sock")  # noqa: PTH118
+
+    # The temporary directory is shared between users, so the socket gets named after the user it belongs to.
+    user_id = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", f"streamdeck-cli-{user_id}.sock")  # noqa: PTH118, S108
+
+
+def is_forwardable(argv: list[str]) -> bool:
+    """Check whether the daemon runs the given command, rather than the client."""
+    return bool(argv) and argv[0] in FORWARDED_COMMANDS and not NOT_FORWARDED_OPTIONS.intersection(argv[1:])
+
+
+def connect(socket_path: str) -> socket.socket:
+    """Connect to the daemon listening on the given socket, raising an OSError if there's none."""
+    if not hasattr(socket, "AF_UNIX"):
+        msg = "Unix sockets aren't supported on this platform."
+        raise OSError(msg)
+
+    # Don't hand the command (and the environment along with it) to a socket another user set up.
+    if hasattr(os, "getuid") and os.stat(socket_path).st_uid != os.getuid():  # noqa: PTH116
+        msg = f"The socket '{socket_path}' belongs to another user."
+        raise PermissionError(msg)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+
+    return sock
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes) -> None:
+    """Send a frame of the given kind, prefixed with its kind & length."""
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> tuple[bytes, bytes] | None:
+    """Receive the next frame's kind and payload, or None if the other end closed the connection."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+
+    kind, size = _HEADER.unpack(header)
+    payload = _recv_exactly(sock, size)
+    if payload is None:
+        return None
+
+    return kind, payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    chunks: list[bytes] = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
@@ -0,0 +1,208 @@
+"""Daemon running `pack` and `validate` commands for clients, with the CLI's modules already imported."""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import traceback
+from typing import TYPE_CHECKING
+
+import typer
+
+from streamdeck_cli.__main__ import cli
+from streamdeck_cli.daemon.protocol import (
+    EXIT,
+    FORWARDED_COMMANDS,
+    REQUEST,
+    STDERR,
+    STDOUT,
+    connect,
+    is_forwardable,
+    recv_frame,
+    send_frame,
+)
+
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from streamdeck_cli.__main__ import CliGroup
+
+
+
+# Exit code of the commands the daemon refuses to run, the same as click's usage errors.
+REFUSED_EXIT_CODE = 2
+
+
+class DaemonAlreadyRunningError(Exception):
+    """Raised when a daemon is already listening on the socket another one was about to listen on."""
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Runs the commands clients send over a Unix socket, in this process, relaying their output and exit code.
+
+    The commands get imported once, when the server starts, and then stay loaded along with everything kept in memory
+    between packs (e.g. the compiled .packignore files). Each command runs in the client's working directory and
+    environment, with its stdout and stderr sent to the client as it writes them, and whether they're terminals as
+    the client's are, so that its output is the same as if the client ran it.
+
+    Commands run one at a time, since they share the process's working directory, environment and standard streams.
+    They run with the permissions of the user running the daemon, so only that user can connect to it.
+    """
+
+    def __init__(self, socket_path: str):
+        """Load the forwarded commands, and listen on the socket, replacing a stale one left behind by a previous daemon."""
+        self.cli_group: CliGroup = typer.main.get_command(cli)  # type: ignore[assignment]
+        for cmd_name in sorted(FORWARDED_COMMANDS):
+            self.cli_group.load_command(cmd_name)
+
+        _remove_stale_socket(socket_path)
+        # Create the socket without permissions for anyone else, rather than restricting them once it's already there.
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        """Stop listening, and remove the socket."""
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)  # type: ignore[arg-type]  # noqa: PTH108
+
+    def verify_request(self, request: socket.socket, client_address: object) -> bool:  # type: ignore[override]  # noqa: ARG002
+        """Only serve clients run by the same user as the daemon, wherever the platform tells who the client is."""
+        peer_uid = _peer_uid(request)
+        return peer_uid is None or peer_uid == os.getuid()
+
+    def run_command(self, request: dict, sock: socket.socket) -> int:
+        """Run a client's command, sending its output to the client, and return its exit code."""
+        stdout = _frame_stream(sock, STDOUT, isatty=request["stdout_isatty"])
+        stderr = _frame_stream(sock, STDERR, isatty=request["stderr_isatty"])
+        argv: list[str] = request["argv"]
+
+        with _client_context(request["cwd"], request["env"]), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if not is_forwardable(argv):
+                    typer.echo(f"ERROR: The daemon only runs the {' and '.join(sorted(FORWARDED_COMMANDS))} commands, without watch mode.", err=True)
+                    return REFUSED_EXIT_CODE
+
+                # In standalone mode, the command always exits, whether it succeeded or not.
+                self.cli_group.main(argv, prog_name="streamdeck-cli")
+            except SystemExit as e:
+                return _exit_code(e.code)
+            except Exception:  # noqa: BLE001
+                traceback.print_exc()
+                return 1
+            finally:
+                stdout.flush()
+                stderr.flush()
+
+        return 0
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        # A client that went away, or didn't send a proper request, isn't worth taking the daemon down for.
+        with contextlib.suppress(OSError, ValueError, KeyError):
+            frame = recv_frame(self.request)
+            if frame is None or frame[0] != REQUEST:
+                return
+
+            exit_code = self.server.run_command(json.loads(frame[1]), self.request)
+            send_frame(self.request, EXIT, str(exit_code).encode())
+
+
+class _FrameWriter(io.RawIOBase):
+    """Writable stream sending everything written to it as frames of the given kind."""
+
+    def __init__(self, sock: socket.socket, kind: bytes, *, isatty: bool):
+        super().__init__()
+        self.sock = sock
+        self.kind = kind
+        self._isatty = isatty
+        self._disconnected = False
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._isatty
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        # If the client went away, the command still runs to completion (e.g. to not leave a package half-written),
+        # with its output going nowhere.
+        if not self._disconnected:
+            try:
+                send_frame(self.sock, self.kind, bytes(data))
+            except OSError:
+                self._disconnected = True
+
+        return len(data)
+
+
+def _frame_stream(sock: socket.socket, kind: bytes, *, isatty: bool) -> io.TextIOWrapper:
+    """Make a text stream like sys.stdout (with a binary `buffer`), sending what's written to it to the client."""
+    return io.TextIOWrapper(io.BufferedWriter(_FrameWriter(sock, kind, isatty=isatty)), encoding="utf-8", line_buffering=True)
+
+
+@contextlib.contextmanager
+def _client_context(cwd: str, env: dict[str, str]) -> Generator[None, None, None]:
+    """Switch to the client's working directory and environment, restoring the daemon's own afterwards."""
+    daemon_cwd = os.getcwd()  # noqa: PTH109
+    daemon_env = dict(os.environ)
+
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(daemon_env)
+        os.chdir(daemon_cwd)
+
+
+def _exit_code(code: str | int | None) -> int:
+    """Get the exit code of a SystemExit's code, printing it first if it's a message, as the interpreter would."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+
+    typer.echo(code, err=True)
+    return 1
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """Get the ID of the user running the process at the other end of a Unix socket, or None if the platform can't tell."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    # A `struct ucred`, holding the peer's process, user and group IDs.
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove the socket left behind by a daemon that didn't shut down cleanly, unless a daemon still listens on it."""
+    if not os.path.exists(socket_path):  # noqa: PTH110
+        return
+
+    try:
+        connect(socket_path).close()
+    except ConnectionRefusedError:
+        os.unlink(socket_path)  # noqa: PTH108
+    except OSError:
+        # Not ours, or not a socket: leave it to the bind to fail.
+        return
+    else:
+        msg = f"A daemon is already listening on '{socket_path}'."
+        raise DaemonAlreadyRunningError(msg)
@@ -0,0 +1,140 @@
+"""In-memory index of the files of a plugin directory, used to check the assets referenced by its manifest."""
+from __future__ import annotations
+
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+
+class AssetIndex:
+    """Answers whether paths exist in a plugin directory, listing each directory only once.
+
+    Manifest validation checks many paths that share a few directories (e.g. every action's icon under `imgs/`, each
+    with up to three candidate suffixes). Instead of one `stat` call per candidate path, the directory containing a
+    path gets listed the first time it's needed, and every later check in that directory is answered from memory.
+
+    A path that's only in the listing with a different case is double-checked against the filesystem, so that
+    case-insensitive filesystems behave the same way as with plain `Path.exists` calls.
+    """
+
+    def __init__(self, plugin_dirpath: Path):
+        """Create an empty index of the plugin directory, whose directories get listed when first needed."""
+        self.plugin_dirpath = plugin_dirpath
+        # Map each listed directory, relative to the plugin directory, to the names of its entries, and their case-folded
+        # versions (None if it doesn't exist).
+        self._listings: dict[str, tuple[frozenset[str], frozenset[str]] | None] = {}
+        self._lock = threading.Lock()
+        # Paths that were found to exist, e.g. for the manifest cache to keep track of them.
+        self.found_relpaths: set[str] = set()
+
+    @classmethod
+    def from_known_relpaths(cls, plugin_dirpath: Path, relpaths: Iterable[str]) -> AssetIndex:
+        """Create an index that already knows which paths exist, and assumes every other path doesn't.
+
+        This is for paths known from a previous validation to still be there (see `ManifestCache`), so that the
+        directories don't even need to be listed.
+        """
+        names_by_dir: dict[str, set[str]] = {}
+        for relpath in map(PurePosixPath, relpaths):
+            names_by_dir.setdefault(relpath.parent.as_posix(), set()).add(relpath.name)
+
+        asset_index = cls(plugin_dirpath)
+        asset_index._listings = {
+            dir_relpath: (frozenset(names), frozenset())
+            for dir_relpath, names in names_by_dir.items()
+        }
+        return asset_index
+
+    def exists(self, relpath: Path) -> bool:
+        """Check whether a path relative to the plugin directory exists."""
+        # Special entries like '..' never show up in directory listings.
+        listing = self._get_listing(relpath.parent) if relpath.name not in ("", ".", "..") else None
+        if listing is None:
+            found = (self.plugin_dirpath / relpath).exists()
+        else:
+            names, folded_names = listing
+            found = relpath.name in names or (
+                relpath.name.casefold() in folded_names and (self.plugin_dirpath / relpath).exists()
+            )
+
+        if found:
+            self.found_relpaths.add(relpath.as_posix())
+
+        return found
+
+    def exists_with_any_suffix(self, relpath: Path, suffixes: Iterable[str]) -> bool:
+        """Check whether a path relative to the plugin directory exists with any of the given suffixes."""
+        return any(self.exists(relpath.with_suffix(suffix)) for suffix in suffixes)
+
+    def prefetch(self, relpaths: Iterable[Path], jobs: int = 1) -> None:
+        """List the directories of the given paths ahead of time, in a pool of threads if more than one job is given.
+
+        This only pays off on slow (e.g. network-mounted) filesystems, where listing directories concurrently hides
+        the latency of each call. A `jobs` value of 0 or less means one job per CPU core.
+        """
+        dir_relpaths = {relpath.parent for relpath in relpaths}
+
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+
+        if jobs == 1 or len(dir_relpaths) <= 1:
+            for dir_relpath in dir_relpaths:
+                self._get_listing(dir_relpath)
+            return
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(self._get_listing, dir_relpaths))
+
+    def _get_listing(self, dir_relpath: Path) -> tuple[frozenset[str], frozenset[str]] | None:
+        key = dir_relpath.as_posix()
+
+        if key in self._listings:
+            return self._listings[key]
+
+        try:
+            with os.scandir(self.plugin_dirpath / dir_relpath) as entries:
+                names = frozenset(entry.name for entry in entries)
+            listing: tuple[frozenset[str], frozenset[str]] | None = (names, frozenset(name.casefold() for name in names))
+        except (FileNotFoundError, NotADirectoryError):
+            listing = None
+
+        with self._lock:
+            self._listings[key] = listing
+
+        return listing
+
+
+class ArchiveAssetIndex(AssetIndex):
+    """Answers whether paths exist in a packaged plugin, from the names of its archive's entries.
+
+    This lets a manifest embedded in a .streamDeckPlugin file be validated without extracting anything. Paths are
+    matched exactly, like on a case-sensitive filesystem, since the plugin may be installed on one.
+    """
+
+    def __init__(self, relpaths: Iterable[str]):
+        """Index the paths of the plugin files in an archive, along with the directories they're in."""
+        super().__init__(PurePosixPath())  # type: ignore[arg-type]
+        self._relpaths: set[str] = set()
+        for relpath in map(PurePosixPath, relpaths):
+            self._relpaths.add(relpath.as_posix())
+            # Directories only show up implicitly in archives, as the parents of their files.
+            self._relpaths.update(parent.as_posix() for parent in relpath.parents)
+
+    def exists(self, relpath: Path) -> bool:
+        """Check whether a path is in the archive, keeping track of it if so."""
+        found = posixpath.normpath(PurePosixPath(relpath).as_posix()) in self._relpaths
+        if found:
+            self.found_relpaths.add(relpath.as_posix())
+
+        return found
+
+    def prefetch(self, relpaths: Iterable[Path], jobs: int = 1) -> None:
+        """Nothing to prefetch, every path is already known."""
@@ -0,0 +1,157 @@
+"""Persistent cache of manifests that passed validation, so that unchanged plugins don't get their assets checked again."""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+# Environment variable to override where the CLI's caches (manifests, templates) are kept.
+CACHE_DIR_ENV_VAR = "STREAMDECK_CLI_CACHE_DIR"
+
+# Bump this whenever the layout of the entries, or the manifest validation rules, change, so that old entries get discarded.
+CACHE_FORMAT_VERSION = 1
+
+# How many manifests to remember before evicting the least recently used ones.
+DEFAULT_MAX_ENTRIES = 256
+
+
+def user_cache_dirpath() -> Path:
+    """Get the directory the CLI keeps its caches in, the user's cache directory unless overridden by the environment."""
+    if cache_dir := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(cache_dir)
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "streamdeck-cli"
+
+
+def default_cache_dirpath() -> Path:
+    """Get the directory of the manifest cache, in the user's cache directory unless overridden by the environment."""
+    return user_cache_dirpath() / "manifests"
+
+
+class ManifestCache:
+    """On-disk cache of the manifests that passed validation, along with the plugin files they reference.
+
+    Each manifest gets its own entry file, keyed by the manifest's path. An entry holds the hash of the manifest's
+    content, and the mtime & size of every file the validation found (icons, code paths, property inspectors...).
+    An entry is only reused if the manifest's content is the same and none of those files changed, otherwise it's
+    dropped. Entries are stored in separate files so that concurrent validations don't overwrite each other, and the
+    entry files' mtimes serve to evict the least recently used ones once there are more than `max_entries`.
+    """
+
+    def __init__(self, cache_dirpath: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Create a cache whose entries are stored in the given directory."""
+        self.cache_dirpath = cache_dirpath
+        self.max_entries = max_entries
+
+    @classmethod
+    def default(cls) -> ManifestCache:
+        """Create the cache in the user's cache directory, shared by every plugin."""
+        return cls(default_cache_dirpath())
+
+    def lookup(self, manifest_filepath: Path, content_hash: str) -> list[str] | None:
+        """Get the plugin files that were found when the manifest was validated, if the cached result still holds."""
+        entry_filepath = self._entry_filepath(manifest_filepath)
+
+        try:
+            with entry_filepath.open("r") as f:
+                entry = json.load(f)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Manifest cache entry at %s is unreadable, validating from scratch.", entry_filepath)
+            return None
+
+        if entry.get("version") != CACHE_FORMAT_VERSION or entry.get("sha256") != content_hash:
+            return None
+
+        plugin_dirpath = manifest_filepath.parent
+        for relpath, (mtime_ns, size) in entry["assets"].items():
+            try:
+                st = (plugin_dirpath / relpath).stat()
+            except OSError:
+                st = None
+
+            if st is None or st.st_mtime_ns != mtime_ns or st.st_size != size:
+                with contextlib.suppress(FileNotFoundError):
+                    entry_filepath.unlink()
+                return None
+
+        # Mark the entry as recently used.
+        with contextlib.suppress(OSError):
+            os.utime(entry_filepath)
+
+        return list(entry["assets"])
+
+    def store(self, manifest_filepath: Path, content_hash: str, asset_relpaths: Iterable[str]) -> None:
+        """Remember that a manifest passed validation, along with the current state of the files it references."""
+        plugin_dirpath = manifest_filepath.parent
+        assets: dict[str, tuple[int, int]] = {}
+
+        for relpath in sorted(asset_relpaths):
+            try:
+                st = (plugin_dirpath / relpath).stat()
+            except OSError:
+                # The file is already gone, so the entry would never be valid anyway.
+                return
+            assets[relpath] = (st.st_mtime_ns, st.st_size)
+
+        entry_filepath = self._entry_filepath(manifest_filepath)
+        try:
+            entry_filepath.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that a concurrent lookup can't read a half-written entry.
+            tmp_filepath = entry_filepath.with_name(f"{entry_filepath.name}.{os.getpid()}.tmp")
+            with tmp_filepath.open("w") as f:
+                json.dump({
+                    "version": CACHE_FORMAT_VERSION,
+                    "manifest_filepath": str(manifest_filepath),
+                    "sha256": content_hash,
+                    "assets": assets,
+                }, f)
+            tmp_filepath.replace(entry_filepath)
+
+        # Failing to cache a manifest shouldn't fail its validation.
+        except OSError as e:
+            logger.warning("Unable to write manifest cache entry at %s: %s", entry_filepath, e)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete the least recently used entries beyond the maximum number of entries."""
+        try:
+            entries = list(os.scandir(self.cache_dirpath))
+        except OSError:
+            return
+
+        if len(entries) <= self.max_entries:
+            return
+
+        def last_used(entry: os.DirEntry[str]) -> int:
+            try:
+                return entry.stat().st_mtime_ns
+            except OSError:
+                return 0
+
+        for entry in sorted(entries, key=last_used)[:len(entries) - self.max_entries]:
+            with contextlib.suppress(OSError):
+                os.unlink(entry.path)  # noqa: PTH108
+
+    def _entry_filepath(self, manifest_filepath: Path) -> Path:
+        key = hashlib.sha256(str(manifest_filepath.resolve()).encode()).hexdigest()
+        return self.cache_dirpath / f"{key}.json"
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import re
 import sys
 from pathlib import Path
 from pprint import pprint
-from typing import Annotated, ClassVar, Final, Literal, Optional
+from typing import TYPE_CHECKING, Annotated, ClassVar, Final, Literal, Optional
 
 # import pyjson5
 from pydantic import (
@@ -20,13 +21,32 @@ from pydantic import (
 )
 from typing_extensions import Self  # noqa: UP035
 
+from streamdeck_cli.models.assets import AssetIndex
 
-def check_path_exists(value: Path, info: ValidationInfo) -> Path:
-    context: dict[Literal["manifest_filepath"], Path] = info.context
-    plugin_dir: Path = context["manifest_filepath"].parent
-    expected_filepath = plugin_dir / value
 
-    assert expected_filepath.exists(), f"Value of '{info.field_name}' field not found."
+if TYPE_CHECKING:
+    from streamdeck_cli.models.cache import ManifestCache
+
+
+# File-types an image asset can have, in order of preference.
+IMAGE_ASSET_SUFFIXES: Final = (".svg", ".png", ".gif")
+
+# Fields of the manifest (and of its actions) that reference files of the plugin directory.
+PLUGIN_ASSET_FIELDS: Final = ("Icon", "CategoryIcon", "CodePath", "CodePathMac", "CodePathWin", "PropertyInspectorPath")
+ACTION_ASSET_FIELDS: Final = ("Icon", "PropertyInspectorPath")
+
+
+def get_asset_index(info: ValidationInfo) -> AssetIndex:
+    """Get the asset index of the plugin being validated, creating it the first time it's needed."""
+    context: dict[Literal["manifest_filepath", "asset_index"], Path | AssetIndex] = info.context
+    if "asset_index" not in context:
+        context["asset_index"] = AssetIndex(context["manifest_filepath"].parent)  # type: ignore[union-attr]
+
+    return context["asset_index"]  # type: ignore[return-value]
+
+
+def check_path_exists(value: Path, info: ValidationInfo) -> Path:
+    assert get_asset_index(info).exists(value), f"Value of '{info.field_name}' field not found."
 
     return value
 
@@ -35,20 +55,29 @@ def check_image_asset(value: Path, info: ValidationInfo) -> Path:
     # The specified path should not include the file-type suffix.
     assert value.suffix == ""
 
-    context: dict[Literal["manifest_filepath"], Path] = info.context
-    plugin_dir: Path = context["manifest_filepath"].parent
-    expected_asset_file_basename = plugin_dir / value
-
     # The image asset should be either svg, png, or gif file-type.
     assert (
-        expected_asset_file_basename.with_suffix(".svg").exists() or
-        expected_asset_file_basename.with_suffix(".png").exists() or
-        expected_asset_file_basename.with_suffix(".gif").exists()
+        get_asset_index(info).exists_with_any_suffix(value, IMAGE_ASSET_SUFFIXES)
     ), f"Provided image file value for the '{info.field_name}' field does not exist."
 
     return value
 
 
+def get_referenced_asset_paths(contents: dict) -> list[Path]:
+    """Get the paths of the plugin files referenced by the raw contents of a manifest, before it's validated."""
+    fields = [(contents, PLUGIN_ASSET_FIELDS)]
+    actions = contents.get("Actions")
+    if isinstance(actions, list):
+        fields.extend((action, ACTION_ASSET_FIELDS) for action in actions if isinstance(action, dict))
+
+    return [
+        Path(data[field_name])
+        for data, field_names in fields
+        for field_name in field_names
+        if isinstance(data.get(field_name), str)
+    ]
+
+
 def check_version_format(value: str, _info: ValidationInfo) -> str:
     version_pattern: re.Pattern[str] = re.compile(r"^(0|[1-9]\d*)(\.(0|[1-9]\d*)){2,3}$")
 
@@ -99,24 +128,41 @@ class Manifest(BaseModel, extra="allow"):
     ] = None
 
     @classmethod
-    def from_json_file(cls, file: Path):
+    def from_json_file(cls, file: Path, jobs: int = 1, cache: ManifestCache | None = None):
         """Alternative constructor method.
 
         This constructor can load data from a json file that contains comments.
+        The files referenced by the manifest are checked against an index of the plugin directory, which lists each
+        directory only once. With more than one job, those directories are listed concurrently upfront, which helps on
+        slow (e.g. network-mounted) filesystems.
+        If a cache is given and the manifest passed validation before, with the same content and none of the files it
+        references changed since, the files aren't checked again.
         """
         try:
-            with file.open("r") as f:
-                # contents = f.read()
-                contents = json.load(f)
+            manifest_bytes = file.read_bytes()
 
         except FileNotFoundError:
             print("The specified 'manifest.json' filepath does not exist on machine.")
             raise
 
         else:
-            instance = cls.model_validate(contents, context={"manifest_filepath": file})
+            contents = json.loads(manifest_bytes)
+            content_hash = hashlib.sha256(manifest_bytes).hexdigest()
+
+            known_asset_relpaths = cache.lookup(file, content_hash) if cache is not None else None
+            if known_asset_relpaths is not None:
+                asset_index = AssetIndex.from_known_relpaths(file.parent, known_asset_relpaths)
+            else:
+                asset_index = AssetIndex(file.parent)
+                if jobs != 1 and isinstance(contents, dict):
+                    asset_index.prefetch(get_referenced_asset_paths(contents), jobs=jobs)
+
+            instance = cls.model_validate(contents, context={"manifest_filepath": file, "asset_index": asset_index})
             instance._filepath = file
 
+            if cache is not None and known_asset_relpaths is None:
+                cache.store(file, content_hash, asset_index.found_relpaths)
+
             return instance
 
     @model_validator(mode="after")
@@ -0,0 +1 @@
+"""Helpers shared by the commands of the CLI."""
@@ -0,0 +1,15 @@
+"""Short help of the CLI's commands, listed by `--help` without importing the commands, and shared with the commands."""
+
+
+COMMAND_SHORT_HELP = {
+    "create": "Create a new Stream Deck plugin project from the template.",
+    "deploy": "Install a plugin into a plugins directory, only writing the files that changed.",
+    "diff": "Compare two already-packed plugins, or two release directories.",
+    "pack": "Pack/build a Stream Deck plugin into a .streamDeckPlugin file.",
+    "releases": "Manage the release directories of packed plugins.",
+    "serve": "Run a daemon that keeps the CLI loaded, for clients to pack & validate plugins with.",
+    "size": "Report what takes up space in an already-packed plugin.",
+    "templates": "Manage the local cache of plugin templates.",
+    "validate": "Validate the manifest and directory structure of one or many Stream Deck plugins.",
+    "verify": "Verify an already-packed plugin without extracting it.",
+}
@@ -0,0 +1,97 @@
+"""Register CLI commands without importing them, so that each command only pays for the imports it needs."""
+from __future__ import annotations
+
+import importlib
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import typer
+from typer.core import TyperCommand, TyperGroup
+
+
+if TYPE_CHECKING:
+    import click
+
+
+# Options Typer adds to the command of every app, which only belong on the CLI's own command.
+COMPLETION_PARAM_NAMES = frozenset({"install_completion", "show_completion"})
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    """Where to find the Typer app of a command, along with the help text to list it with before it's imported."""
+    module_name: str
+    app_name: str
+    help: str
+
+
+@dataclass(frozen=True)
+class CommandLoadStats:
+    """How long it took to import a command's module, and how many modules that pulled in."""
+    command_name: str
+    seconds: float
+    imported_module_count: int
+
+
+class LazyCommandGroup(TyperGroup):
+    """A command group that only imports a command's module once that command actually gets invoked.
+
+    Subclasses list their commands in `lazy_commands`. Listing commands (e.g. for `--help`) uses the help text given
+    there, so that it doesn't import any of them.
+    """
+
+    lazy_commands: ClassVar[dict[str, LazyCommand]] = {}
+
+    def __init__(self, **kwargs: Any):  # noqa: ANN401
+        """Create the group, passing its options on to Typer's."""
+        super().__init__(**kwargs)
+        self.load_stats: list[CommandLoadStats] = []
+        self._loaded_commands: dict[str, click.Command] = {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List the lazy commands along with the ones added the usual way."""
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Get a command to list, which is only a stand-in for lazy commands that haven't been loaded yet."""
+        if cmd_name in self._loaded_commands:
+            return self._loaded_commands[cmd_name]
+
+        lazy_command = self.lazy_commands.get(cmd_name)
+        if lazy_command is None:
+            return super().get_command(ctx, cmd_name)
+
+        # A stand-in that's only good for listing the command.
+        return TyperCommand(cmd_name, help=lazy_command.help)
+
+    def resolve_command(self, ctx: click.Context, args: list[str]) -> tuple[str | None, click.Command | None, list[str]]:
+        """Resolve the command to invoke, loading it if it's a lazy one."""
+        cmd_name, command, args = super().resolve_command(ctx, args)
+
+        # The command is about to be invoked (or completed), so it's time to import it for real.
+        if cmd_name in self.lazy_commands:
+            command = self.load_command(cmd_name)
+
+        return cmd_name, command, args
+
+    def load_command(self, cmd_name: str) -> click.Command:
+        """Import a lazy command's module, and get the click command out of its Typer app."""
+        if cmd_name in self._loaded_commands:
+            return self._loaded_commands[cmd_name]
+
+        lazy_command = self.lazy_commands[cmd_name]
+        module_count = len(sys.modules)
+        start = time.perf_counter()
+
+        module = importlib.import_module(lazy_command.module_name)
+        app: typer.Typer = getattr(module, lazy_command.app_name)
+        command = typer.main.get_command(app)
+        command.name = cmd_name
+        command.params = [param for param in command.params if param.name not in COMPLETION_PARAM_NAMES]
+
+        self.load_stats.append(CommandLoadStats(cmd_name, time.perf_counter() - start, len(sys.modules) - module_count))
+        self._loaded_commands[cmd_name] = command
+
+        return command
@@ -0,0 +1,55 @@
+"""Find the plugin directories that commands working on many plugins at once should act on."""
+from __future__ import annotations
+
+import glob
+import os
+from pathlib import Path
+
+
+# Characters that make a plugin directory argument a glob pattern rather than a plain path.
+GLOB_CHARACTERS = frozenset("*?[")
+
+# Directories that never hold plugins of their own, and can be huge, so discovery doesn't descend into them.
+NON_PLUGIN_DIRNAMES = frozenset({"node_modules", "__pycache__", "releases"})
+
+
+def expand_plugin_dirpaths(plugin_dirpath_args: list[Path]) -> list[Path]:
+    """Expand the plugin directory arguments into a list of plugin directories, without duplicates.
+
+    Arguments containing glob characters (which the shell didn't expand, e.g. because they were quoted) are expanded
+    into the matching directories that contain a manifest.json file.
+    """
+    plugin_dirpaths: dict[Path, None] = {}
+
+    for plugin_dirpath_arg in plugin_dirpath_args:
+        if GLOB_CHARACTERS.isdisjoint(str(plugin_dirpath_arg)):
+            plugin_dirpaths[plugin_dirpath_arg] = None
+            continue
+
+        for matched_path in sorted(glob.glob(str(plugin_dirpath_arg), recursive=True)):  # noqa: PTH207
+            if (Path(matched_path) / "manifest.json").is_file():
+                plugin_dirpaths[Path(matched_path)] = None
+
+    return list(plugin_dirpaths)
+
+
+def discover_plugin_dirpaths(root_dirpath: Path) -> list[Path]:
+    """Find every plugin directory under a root directory, i.e. every directory that contains a manifest.json file.
+
+    Plugin directories aren't descended into, since plugins don't nest, and neither are hidden directories (e.g.
+    `.git` or `.venv`) nor the ones in `NON_PLUGIN_DIRNAMES`.
+    """
+    plugin_dirpaths: list[Path] = []
+
+    for dirpath, dirnames, filenames in os.walk(root_dirpath):
+        if "manifest.json" in filenames:
+            plugin_dirpaths.append(Path(dirpath))
+            dirnames.clear()
+            continue
+
+        dirnames[:] = [
+            dirname for dirname in dirnames
+            if not dirname.startswith(".") and dirname not in NON_PLUGIN_DIRNAMES
+        ]
+
+    return sorted(plugin_dirpaths)
@@ -0,0 +1,231 @@
+"""Local cache of plugin templates, so that scaffolding a plugin doesn't clone the template over the network every time."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import typer
+from packaging.version import InvalidVersion, Version
+
+from streamdeck_cli.models.cache import user_cache_dirpath
+
+
+if TYPE_CHECKING:
+    from typing_extensions import Self  # noqa: UP035
+
+
+
+logger = logging.getLogger("streamdeck-cli")
+
+
+DEFAULT_TEMPLATE_SRC = "https://github.com/strohganoff/python-streamdeck-plugin-template.git"
+
+# Ref of the template's default branch, used when no ref is asked for and the template has no version tags.
+DEFAULT_REF = "HEAD"
+
+# Bump this whenever the layout of the pins file changes, so that old pins get discarded instead of misread.
+PINS_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TemplatePin:
+    """Revision of a template that scaffolding uses, until the template gets refreshed."""
+    src: str
+    ref: str
+    commit: str
+    # When the revision was fetched, in seconds since the epoch.
+    fetched_at: float
+
+
+class TemplateCache:
+    """On-disk cache of remote templates, each kept as a mirror of its git repository.
+
+    Each ref of a template that was asked for is pinned to the commit it pointed to when the template was fetched. When
+    no ref is asked for, the latest version tag is used, as copier does (see `default_ref`). Scaffolding uses the
+    pinned commit, straight from the mirror, without touching the network until the template is explicitly refreshed.
+    """
+
+    def __init__(self, cache_dirpath: Path):
+        """Create a cache kept in the given directory, use `default` to get the user's cache."""
+        self.cache_dirpath = cache_dirpath
+
+    @classmethod
+    def default(cls) -> Self:
+        """Get the cache in the user's cache directory, shared by every plugin."""
+        return cls(user_cache_dirpath() / "templates")
+
+    def mirror_dirpath(self, src: str) -> Path:
+        """Get the path of the bare git repository mirroring a template."""
+        return self._entry_dirpath(src) / "repo.git"
+
+    def get_pin(self, src: str, ref: str | None = None) -> TemplatePin | None:
+        """Get the pinned revision of a template's ref (its default one if None), or None if it was never fetched."""
+        if not self.mirror_dirpath(src).is_dir():
+            return None
+
+        pin = self._load_pins(src).get(ref or self.default_ref(src))
+        return TemplatePin(**pin) if pin is not None else None
+
+    def default_ref(self, src: str) -> str:
+        """Get the ref of a cached template to use when none is asked for.
+
+        Like copier, this is the latest tag that's a PEP 440 version (leaving out pre-releases), so that projects get
+        scaffolded from the latest release of the template, or its default branch if it has no such tag.
+        """
+        result = subprocess.run(  # noqa: S603
+            ["git", "-C", str(self.mirror_dirpath(src)), "tag", "--list"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        versions: dict[str, Version] = {}
+        for tag in result.stdout.split():
+            try:
+                version = Version(tag)
+            except InvalidVersion:
+                continue
+            if not version.is_prerelease:
+                versions[tag] = version
+
+        return max(versions, key=versions.__getitem__) if versions else DEFAULT_REF
+
+    def list_pins(self) -> list[TemplatePin]:
+        """Get the pinned revisions of every cached template."""
+        try:
+            entry_dirpaths = sorted(path for path in self.cache_dirpath.iterdir() if path.is_dir())
+        except FileNotFoundError:
+            return []
+
+        return [
+            TemplatePin(**pin)
+            for entry_dirpath in entry_dirpaths
+            for pin in self._read_pins_file(entry_dirpath / "pins.json").values()
+        ]
+
+    def resolve(self, src: str, ref: str | None = None, *, offline: bool = False) -> TemplatePin:
+        """Get the revision of a template to scaffold from, fetching the template only if it isn't cached yet.
+
+        In offline mode, the template is never fetched. A ref that wasn't pinned yet can still be resolved from the
+        mirror of an already-cached template, e.g. a tag that was fetched along with it.
+        """
+        if self.mirror_dirpath(src).is_dir():
+            ref = ref or self.default_ref(src)
+            pin = self.get_pin(src, ref)
+            if pin is not None:
+                return pin
+
+            commit = self._rev_parse(src, ref)
+            if commit is not None:
+                return self._pin(src, ref, commit)
+
+        if offline:
+            typer.echo(
+                f"ERROR: Template '{src}'{f' at {ref!r}' if ref else ''} isn't cached, run "
+                f"`streamdeck-cli templates refresh {src}` while online first.",
+            )
+            raise typer.Exit(1)
+
+        return self.refresh(src, ref)
+
+    def refresh(self, src: str, ref: str | None = None) -> TemplatePin:
+        """Fetch the latest revisions of a template, and pin the given ref (its new default one if None) to its new commit.
+
+        Every other ref already pinned for the template is re-pinned too.
+        """
+        mirror_dirpath = self.mirror_dirpath(src)
+
+        if mirror_dirpath.is_dir():
+            logger.info("Fetching template %s into %s", src, mirror_dirpath)
+            _run_git(["-C", str(mirror_dirpath), "fetch", "--prune", "--tags", "origin"])
+        else:
+            logger.info("Cloning template %s into %s", src, mirror_dirpath)
+            mirror_dirpath.parent.mkdir(parents=True, exist_ok=True)
+            # Clone next to the final location, then move it in place, so that an interrupted clone isn't taken for a mirror.
+            tmp_dirpath = mirror_dirpath.with_name(f"{mirror_dirpath.name}.{os.getpid()}.tmp")
+            _run_git(["clone", "--mirror", "--quiet", src, str(tmp_dirpath)])
+            tmp_dirpath.replace(mirror_dirpath)
+
+        ref = ref or self.default_ref(src)
+        refs = {ref, *self._load_pins(src)}
+        pins = {}
+        for pinned_ref in sorted(refs):
+            commit = self._rev_parse(src, pinned_ref)
+            if commit is None:
+                typer.echo(f"ERROR: Template '{src}' has no revision named '{pinned_ref}'.")
+                raise typer.Exit(1)
+            pins[pinned_ref] = self._pin(src, pinned_ref, commit)
+
+        return pins[ref]
+
+    def _pin(self, src: str, ref: str, commit: str) -> TemplatePin:
+        pin = TemplatePin(src=src, ref=ref, commit=commit, fetched_at=time.time())
+
+        pins = self._load_pins(src)
+        pins[pin.ref] = asdict(pin)
+
+        pins_filepath = self._entry_dirpath(src) / "pins.json"
+        # Write to a temporary file first, so that an interrupted refresh can't leave a half-written pins file behind.
+        tmp_filepath = pins_filepath.with_name(f"{pins_filepath.name}.{os.getpid()}.tmp")
+        with tmp_filepath.open("w") as f:
+            json.dump({"version": PINS_FORMAT_VERSION, "pins": pins}, f)
+        tmp_filepath.replace(pins_filepath)
+
+        return pin
+
+    def _rev_parse(self, src: str, ref: str) -> str | None:
+        result = subprocess.run(  # noqa: S603
+            ["git", "-C", str(self.mirror_dirpath(src)), "rev-parse", "--quiet", "--verify", f"{ref}^{{commit}}"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _load_pins(self, src: str) -> dict[str, dict]:
+        return self._read_pins_file(self._entry_dirpath(src) / "pins.json")
+
+    def _read_pins_file(self, pins_filepath: Path) -> dict[str, dict]:
+        try:
+            with pins_filepath.open("r") as f:
+                pins_file = json.load(f)
+
+        except FileNotFoundError:
+            return {}
+
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Template pins at %s are unreadable, ignoring them.", pins_filepath)
+            return {}
+
+        if pins_file.get("version") != PINS_FORMAT_VERSION:
+            return {}
+
+        return pins_file["pins"]
+
+    def _entry_dirpath(self, src: str) -> Path:
+        return self.cache_dirpath / hashlib.sha256(src.encode()).hexdigest()[:16]
+
+
+def is_local_template(src: str) -> bool:
+    """Check whether a template is a local directory (or git repository), which doesn't need caching."""
+    return Path(src).expanduser().is_dir()
+
+
+def _run_git(args: list[str]) -> None:
+    try:
+        subprocess.run(["git", *args], capture_output=True, text=True, check=True)  # noqa: S603, S607
+
+    except FileNotFoundError as e:
+        typer.echo("ERROR: git is needed to fetch templates, but it isn't installed.")
+        raise typer.Exit(1) from e
+
+    except subprocess.CalledProcessError as e:
+        typer.echo(f"ERROR: Failed to fetch the template: {e.stderr.strip()}")
+        raise typer.Exit(1) from e
@@ -0,0 +1 @@
+"""Tests for the synthetic plugins of the benchmark suite."""
@@ -0,0 +1,45 @@
+"""Tests that the synthetic plugins generated for the benchmarks are valid, and have the requested shape."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from benchmarks.synthetic import PLUGIN_VERSION, generate_plugin, generate_releases
+from streamdeck_cli.commands.pack.autoversion import get_versioned_output_dirpath
+from streamdeck_cli.commands.pack.zip import (
+    get_packignore_specification,
+    walk_filtered_plugin_files,
+)
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+FILE_COUNT = 120
+IGNORE_PATTERN_COUNT = 25
+ACTION_COUNT = 7
+
+
+def test_generate_plugin(tmp_path: Path):
+    """Test that the generated plugin is valid, with the requested numbers of actions, patterns & files to pack."""
+    plugin_dirpath = generate_plugin(
+        tmp_path / "plugin", file_count=FILE_COUNT, ignore_pattern_count=IGNORE_PATTERN_COUNT, action_count=ACTION_COUNT,
+    )
+
+    manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json")
+    assert len(manifest.actions) == ACTION_COUNT
+
+    packignore_spec = get_packignore_specification(plugin_dirpath)
+    assert len(packignore_spec.patterns) == IGNORE_PATTERN_COUNT
+
+    filepaths = list(walk_filtered_plugin_files(plugin_dirpath, packignore_spec))
+    assert len([filepath for filepath in filepaths if filepath.parts[0] == "src"]) == FILE_COUNT
+    assert not any(filepath.parts[0] == ".venv" for filepath in filepaths)
+
+
+def test_generate_releases(tmp_path: Path):
+    """Test that the generated release directories are the ones autoversioning would have allocated."""
+    output_dirpath = generate_releases(tmp_path / "releases", PLUGIN_VERSION, release_count=5)
+
+    assert get_versioned_output_dirpath(output_dirpath, PLUGIN_VERSION) == output_dirpath / f"{PLUGIN_VERSION}-5"
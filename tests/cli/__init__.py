@@ -0,0 +1 @@
+"""Tests for the CLI's entry point."""
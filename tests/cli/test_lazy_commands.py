@@ -0,0 +1,89 @@
+"""Tests for the lazy loading of the CLI's commands."""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+import typer
+from streamdeck_cli.__main__ import CliGroup, cli
+from typer.testing import CliRunner
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+def _imported_modules_after(*cli_args: str) -> set[str]:
+    """Run the CLI in a fresh interpreter, and get the names of the modules it ended up importing."""
+    script = (
+        "import json, sys\n"
+        "from streamdeck_cli.__main__ import cli\n"
+        "try:\n"
+        f"    cli({list(cli_args)!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)  # noqa: S603
+    return set(json.loads(completed.stdout.splitlines()[-1]))
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin that passes manifest validation."""
+    return make_plugin()
+
+
+def test_help_imports_no_command():
+    """Test that listing the commands doesn't import any of them."""
+    imported_modules = _imported_modules_after("--help")
+
+    assert not any(module_name.startswith("streamdeck_cli.commands.") for module_name in imported_modules)
+    assert "copier" not in imported_modules
+    assert "pydantic" not in imported_modules
+
+
+def test_validate_only_imports_validate(plugin_dirpath: Path):
+    """Test that running a command imports that command's module, but not the other commands' dependencies."""
+    imported_modules = _imported_modules_after("validate", str(plugin_dirpath))
+
+    assert "streamdeck_cli.commands.validate" in imported_modules
+    assert "streamdeck_cli.commands.create" not in imported_modules
+    assert "copier" not in imported_modules
+
+
+def test_startup_profile(plugin_dirpath: Path):
+    """Test that the startup profile reports the invoked command's import, after the command's own output."""
+    result = CliRunner().invoke(cli, ["--startup-profile", "validate", str(plugin_dirpath)])
+
+    assert result.exit_code == 0
+    assert "Manifest validation completed successfully for plugin 'Plugin'." in result.output
+    assert "Startup profile: CLI ready in" in result.output
+    assert "'validate' command imported in" in result.output
+
+
+@pytest.mark.parametrize("command_name", sorted(CliGroup.lazy_commands))
+def test_listed_help_is_the_commands_own(command_name: str):
+    """Test that commands are listed with the same short help as they have once imported."""
+    group = typer.main.get_command(cli)
+    ctx = typer.Context(group)
+
+    listed_help = group.get_command(ctx, command_name).get_short_help_str(limit=200)
+    loaded_help = group.load_command(command_name).get_short_help_str(limit=200)
+
+    assert listed_help == loaded_help
+
+
+@pytest.mark.parametrize("command_name", sorted(CliGroup.lazy_commands))
+def test_completion_options_are_only_the_clis(command_name: str):
+    """Test that the shell completion options are only offered by the CLI itself, not by each of its commands."""
+    cli_help = CliRunner().invoke(cli, ["--help"]).output
+    command_help = CliRunner().invoke(cli, [command_name, "--help"]).output
+
+    assert "--install-completion" in cli_help
+    assert "--install-completion" not in command_help
+    assert "--show-completion" not in command_help
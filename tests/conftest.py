@@ -0,0 +1,73 @@
+"""Fixtures shared by the tests of every command."""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from streamdeck_cli.models.cache import CACHE_DIR_ENV_VAR
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def manifest_cache_dirpath(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the caches (manifests, templates) of every test in its temporary directory, rather than in the user's cache directory."""
+    cache_dirpath = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(cache_dirpath))
+    return cache_dirpath
+
+
+@pytest.fixture
+def make_plugin(tmp_path: Path) -> Callable[..., Path]:
+    """Fixture to get a factory of minimal plugins that pass manifest validation.
+
+    A plugin gets an icon, a code file, a .packignore file ignoring itself and a manifest, in `tmp_path / "plugin"`
+    unless another directory is given. Pass `files` (by path relative to the plugin directory) to add files, override
+    them, or leave them out with None, and any other manifest field to override it.
+    """
+    def make_plugin(
+        plugin_dirpath: Path | None = None,
+        *,
+        uuid: str = "com.test.plugin",
+        name: str = "Plugin",
+        actions: list[dict[str, Any]] | None = None,
+        files: dict[str, str | bytes | None] | None = None,
+        **manifest_fields: Any,  # noqa: ANN401
+    ) -> Path:
+        plugin_dirpath = plugin_dirpath or tmp_path / "plugin"
+        plugin_files: dict[str, str | bytes | None] = {
+            "imgs/icon.png": b"png",
+            "main.py": "print('hello')",
+            ".packignore": ".packignore\n",
+            **(files or {}),
+        }
+
+        for relpath, content in plugin_files.items():
+            if content is None:
+                continue
+            filepath = plugin_dirpath / relpath
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, bytes):
+                filepath.write_bytes(content)
+            else:
+                filepath.write_text(content)
+
+        manifest = {
+            "UUID": uuid,
+            "Name": name,
+            "Version": "1.0.0",
+            "Author": "Tester",
+            "Description": "Test plugin",
+            "Icon": "imgs/icon",
+            "CodePath": "main.py",
+            "Actions": actions or [],
+            **manifest_fields,
+        }
+        (plugin_dirpath / "manifest.json").write_text(json.dumps(manifest))
+        return plugin_dirpath
+
+    return make_plugin
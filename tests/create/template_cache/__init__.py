@@ -0,0 +1 @@
+"""Tests for the local cache of plugin templates."""
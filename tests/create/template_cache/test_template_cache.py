@@ -0,0 +1,120 @@
+"""Tests for the local template cache, against a bare git repository standing in for the remote template."""
+from __future__ import annotations
+
+import shutil
+import subprocess
+from typing import TYPE_CHECKING
+
+import copier
+import pytest
+import typer
+import yaml
+from streamdeck_cli.commands.create import record_template_src, resolve_template
+from streamdeck_cli.utils.template_cache import TemplateCache
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _git(*args: str, cwd: Path | None = None) -> str:
+    result = subprocess.run(  # noqa: S603
+        ["git", "-c", "user.name=Tester", "-c", "user.email=tester@example.com", *args],  # noqa: S607
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip()
+
+
+def _commit_template(worktree_dirpath: Path, greeting: str) -> str:
+    """Commit a tiny copier template to the worktree, push it to the remote, and return the commit's hash."""
+    (worktree_dirpath / "copier.yml").write_text("name:\n  type: str\n  default: demo\n")
+    (worktree_dirpath / "README.md.jinja").write_text(f"# {greeting} {{{{ name }}}}\n")
+    (worktree_dirpath / "{{ _copier_conf.answers_file }}.jinja").write_text("{{ _copier_answers|to_nice_yaml }}")
+    _git("add", "-A", cwd=worktree_dirpath)
+    _git("commit", "-q", "-m", greeting, cwd=worktree_dirpath)
+    _git("push", "-q", "origin", "HEAD:main", cwd=worktree_dirpath)
+    return _git("rev-parse", "HEAD", cwd=worktree_dirpath)
+
+
+@pytest.fixture
+def remote(tmp_path: Path) -> tuple[str, Path]:
+    """Fixture to create a bare repository with a template, returning its URL and a worktree to push changes from."""
+    bare_dirpath = tmp_path / "remote" / "template.git"
+    _git("init", "-q", "--bare", "--initial-branch=main", str(bare_dirpath))
+    worktree_dirpath = tmp_path / "worktree"
+    _git("clone", "-q", str(bare_dirpath), str(worktree_dirpath))
+    _commit_template(worktree_dirpath, "Hello")
+    # A URL rather than a path, so that it's treated as a remote template rather than a local one.
+    return bare_dirpath.as_uri(), worktree_dirpath
+
+
+def test_create_is_pinned_until_refreshed(remote: tuple[str, Path]):
+    """Test that a cached template keeps scaffolding from the pinned commit until it's explicitly refreshed."""
+    url, worktree_dirpath = remote
+    template_cache = TemplateCache.default()
+    first_commit = _git("rev-parse", "HEAD", cwd=worktree_dirpath)
+
+    assert template_cache.resolve(url).commit == first_commit
+
+    second_commit = _commit_template(worktree_dirpath, "Bonjour")
+    assert template_cache.resolve(url).commit == first_commit
+
+    assert template_cache.refresh(url).commit == second_commit
+    assert template_cache.resolve(url).commit == second_commit
+    assert [(pin.src, pin.ref, pin.commit) for pin in template_cache.list_pins()] == [(url, "HEAD", second_commit)]
+
+
+def test_offline_scaffolds_from_cache_without_remote(remote: tuple[str, Path], tmp_path: Path):
+    """Test that once cached, a template can be scaffolded offline, even with the remote gone."""
+    url, _ = remote
+
+    with pytest.raises(typer.Exit):
+        resolve_template(url, None, offline=True)
+
+    TemplateCache.default().refresh(url)
+    shutil.rmtree(tmp_path / "remote")
+
+    src_path, vcs_ref = resolve_template(url, None, offline=True)
+    worker = copier.run_copy(src_path, tmp_path / "project", vcs_ref=vcs_ref, defaults=True, quiet=True)
+    record_template_src(tmp_path / "project" / worker.answers_relpath, url)
+
+    assert (tmp_path / "project" / "README.md").read_text() == "# Hello demo\n"
+    # The project can be updated from the template's URL, rather than from the cache's mirror of it.
+    assert yaml.safe_load((tmp_path / "project" / ".copier-answers.yml").read_text())["_src_path"] == url
+
+
+def test_refs_are_pinned_separately(remote: tuple[str, Path]):
+    """Test that a tag gets pinned on its own, and can be resolved offline once its template is cached."""
+    url, worktree_dirpath = remote
+    tagged_commit = _git("rev-parse", "HEAD", cwd=worktree_dirpath)
+    _git("tag", "v1", cwd=worktree_dirpath)
+    _git("push", "-q", "origin", "v1", cwd=worktree_dirpath)
+    _commit_template(worktree_dirpath, "Bonjour")
+
+    template_cache = TemplateCache.default()
+    main_commit = template_cache.resolve(url, "main").commit
+
+    assert template_cache.resolve(url, "v1", offline=True).commit == tagged_commit
+    assert main_commit != tagged_commit
+
+
+def test_latest_version_tag_is_the_default_ref(remote: tuple[str, Path]):
+    """Test that without a ref, the latest version tag gets used (not pre-releases nor other tags), as copier does."""
+    url, worktree_dirpath = remote
+    template_cache = TemplateCache.default()
+    assert template_cache.resolve(url).ref == "HEAD"
+
+    for tag, greeting in [("v1.10.0", "Hallo"), ("v1.9.0", "Hola"), ("v2.0.0rc1", "Ciao"), ("latest", "Bonjour")]:
+        _commit_template(worktree_dirpath, greeting)
+        _git("tag", tag, cwd=worktree_dirpath)
+        _git("push", "-q", "origin", tag, cwd=worktree_dirpath)
+
+    pin = template_cache.refresh(url)
+
+    assert (pin.ref, pin.commit) == ("v1.10.0", _git("rev-parse", "v1.10.0^{commit}", cwd=worktree_dirpath))
+    assert template_cache.resolve(url, offline=True) == pin
+
+
+def test_local_templates_are_used_as_is(tmp_path: Path):
+    """Test that a local template directory doesn't go through the cache."""
+    assert resolve_template(str(tmp_path), "main", offline=True) == (str(tmp_path), "main")
@@ -0,0 +1 @@
+"""Tests for the daemon and its client."""
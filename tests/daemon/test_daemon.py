@@ -0,0 +1,153 @@
+"""Tests for running commands in the daemon through the thin client."""
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.__main__ import cli
+from streamdeck_cli.daemon.client import forward
+from streamdeck_cli.daemon.protocol import is_forwardable
+from streamdeck_cli.daemon.server import REFUSED_EXIT_CODE, DaemonAlreadyRunningError, DaemonServer
+from streamdeck_cli.models.cache import CACHE_DIR_ENV_VAR
+from typer.testing import CliRunner
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin that passes manifest validation."""
+    return make_plugin()
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Generator[str, None, None]:
+    """Fixture to run a daemon in a background thread, listening on a socket in the temporary directory."""
+    socket_path = str(tmp_path / "d.sock")
+    server = DaemonServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield socket_path
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _forward(socket_path: str, *argv: str) -> tuple[int | None, bytes, bytes]:
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    exit_code = forward(list(argv), socket_path, stdout=stdout, stderr=stderr)
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.parametrize("plugin_arg", ["plugin", "missing"])
+def test_forwarded_output_matches_local_run(
+    socket_path: str, plugin_dirpath: Path, monkeypatch: pytest.MonkeyPatch, plugin_arg: str,
+):
+    """Test that a command run by the daemon, in the client's working directory, gives the same output & exit code as run locally."""
+    monkeypatch.chdir(plugin_dirpath.parent)
+    local_result = CliRunner().invoke(cli, ["validate", plugin_arg])
+
+    exit_code, stdout, _ = _forward(socket_path, "validate", plugin_arg)
+
+    assert exit_code == local_result.exit_code
+    assert stdout.decode() == local_result.output
+
+
+def test_forwarded_pack_to_stdout(socket_path: str, plugin_dirpath: Path):
+    """Test that a package written to stdout by the daemon reaches the client intact."""
+    exit_code, stdout, stderr = _forward(socket_path, "pack", str(plugin_dirpath), "--output", "-", "--reproducible")
+
+    assert exit_code == 0
+    with zipfile.ZipFile(io.BytesIO(stdout)) as zip_file:
+        assert "com.test.plugin.sdPlugin/manifest.json" in zip_file.namelist()
+    assert b"SHA-256" in stderr
+
+
+def test_forwarded_command_uses_client_environment(
+    socket_path: str, plugin_dirpath: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that the command runs in the client's environment, e.g. using the client's cache directory."""
+    client_cache_dirpath = tmp_path / "client-cache"
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(client_cache_dirpath))
+
+    exit_code, _, _ = _forward(socket_path, "validate", str(plugin_dirpath))
+
+    assert exit_code == 0
+    assert any((client_cache_dirpath / "manifests").iterdir())
+
+
+def test_daemon_refuses_other_commands(socket_path: str):
+    """Test that the daemon only runs the commands it's meant to, even if a client sends another one."""
+    exit_code, _, stderr = _forward(socket_path, "create")
+
+    assert exit_code == REFUSED_EXIT_CODE
+    assert b"ERROR: The daemon only runs" in stderr
+
+
+def test_forward_without_daemon(tmp_path: Path):
+    """Test that forwarding gives up (for the command to run locally) if no daemon is listening."""
+    assert _forward(str(tmp_path / "d.sock"), "validate")[0] is None
+
+
+def test_client_imports_no_dependencies():
+    """Test that the client only imports the standard library, so that forwarding a command starts up fast."""
+    script = "import json, sys\nimport streamdeck_cli.daemon.client\nprint(json.dumps(sorted(sys.modules)))\n"
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)  # noqa: S603
+    imported_modules = set(json.loads(completed.stdout))
+
+    assert not {"typer", "click", "pydantic", "pathspec"} & imported_modules
+
+
+def test_second_daemon_on_same_socket(socket_path: str):
+    """Test that a daemon doesn't take over the socket of one that's still running."""
+    with pytest.raises(DaemonAlreadyRunningError):
+        DaemonServer(socket_path)
+
+
+def test_socket_is_only_accessible_to_its_user(socket_path: str):
+    """Test that the socket is created without permissions for other users, whatever the umask."""
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0  # noqa: PTH116
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="Peer credentials are only available on Linux")
+def test_daemon_refuses_other_users(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that the daemon only serves clients run by its own user."""
+    server = DaemonServer(str(tmp_path / "d.sock"))
+    client_sock, server_sock = socket.socketpair(socket.AF_UNIX)
+    try:
+        assert server.verify_request(server_sock, None)
+
+        monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+        assert not server.verify_request(server_sock, None)
+
+    finally:
+        client_sock.close()
+        server_sock.close()
+        server.server_close()
+
+
+@pytest.mark.parametrize(("argv", "expected"), [
+    (["pack", "plugin"], True),
+    (["validate", "-r", "plugins"], True),
+    (["pack", "plugin", "--watch"], False),
+    (["create"], False),
+    (["--startup-profile", "validate"], False),
+    ([], False),
+])
+def test_is_forwardable(argv: list[str], expected: bool):
+    """Test that only the daemon's commands get forwarded, and not in watch mode nor when profiling the startup."""
+    assert is_forwardable(argv) is expected
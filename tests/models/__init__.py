@@ -0,0 +1 @@
+"""Tests for the models of the CLI."""
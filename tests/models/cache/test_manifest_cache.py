@@ -0,0 +1,95 @@
+"""Tests for the ManifestCache class, and how Manifest.from_json_file uses it."""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from pydantic import ValidationError
+from streamdeck_cli.models.cache import ManifestCache
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin with an action, that passes manifest validation."""
+    return make_plugin(actions=[{"UUID": "com.test.plugin.action", "Name": "Action", "Icon": "imgs/icon"}])
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ManifestCache:
+    """Fixture to create an empty manifest cache."""
+    return ManifestCache(tmp_path / "manifests")
+
+
+def test_cached_validation_skips_asset_checks(plugin_dirpath: Path, cache: ManifestCache, mocker: MockerFixture):
+    """Test that validating an unchanged manifest again doesn't list nor check the plugin directory."""
+    first_manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+    scandir_spy = mocker.spy(os, "scandir")
+    exists_spy = mocker.spy(Path, "exists")
+
+    manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+
+    assert manifest == first_manifest
+    scandir_spy.assert_not_called()
+    exists_spy.assert_not_called()
+
+
+def test_deleted_asset_invalidates_cache(plugin_dirpath: Path, cache: ManifestCache):
+    """Test that a file referenced by the manifest going missing gets reported, even though the manifest was cached."""
+    Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+    (plugin_dirpath / "main.py").unlink()
+
+    with pytest.raises(ValidationError, match="CodePath"):
+        Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+
+
+def test_changed_manifest_invalidates_cache(plugin_dirpath: Path, cache: ManifestCache):
+    """Test that a change to the manifest's content gets validated from scratch."""
+    Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+    manifest_contents = json.loads((plugin_dirpath / "manifest.json").read_text())
+    manifest_contents["CodePath"] = "missing.py"
+    (plugin_dirpath / "manifest.json").write_text(json.dumps(manifest_contents))
+
+    with pytest.raises(ValidationError, match="CodePath"):
+        Manifest.from_json_file(plugin_dirpath / "manifest.json", cache=cache)
+
+
+def test_lookup_checks_asset_mtimes(plugin_dirpath: Path, cache: ManifestCache):
+    """Test that an entry only holds while the files it references keep the same mtime and size."""
+    manifest_filepath = plugin_dirpath / "manifest.json"
+    cache.store(manifest_filepath, "hash", ["main.py", "imgs/icon.png"])
+
+    assert sorted(cache.lookup(manifest_filepath, "hash") or []) == ["imgs/icon.png", "main.py"]
+    assert cache.lookup(manifest_filepath, "other-hash") is None
+
+    st = (plugin_dirpath / "main.py").stat()
+    os.utime(plugin_dirpath / "main.py", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert cache.lookup(manifest_filepath, "hash") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path):
+    """Test that the cache keeps at most its maximum number of entries, dropping the least recently used ones."""
+    cache = ManifestCache(tmp_path / "manifests", max_entries=2)
+    manifest_filepaths = [tmp_path / f"plugin{i}" / "manifest.json" for i in range(3)]
+
+    cache.store(manifest_filepaths[0], "hash", [])
+    cache.store(manifest_filepaths[1], "hash", [])
+    # Make the first entry the oldest one, then use it, so that the second one becomes the least recently used.
+    for entry_filepath in (tmp_path / "manifests").iterdir():
+        os.utime(entry_filepath, ns=(0, 0))
+    assert cache.lookup(manifest_filepaths[0], "hash") == []
+    cache.store(manifest_filepaths[2], "hash", [])
+
+    assert cache.lookup(manifest_filepaths[0], "hash") == []
+    assert cache.lookup(manifest_filepaths[1], "hash") is None
+    assert cache.lookup(manifest_filepaths[2], "hash") == []
@@ -0,0 +1,89 @@
+"""Tests for the AssetIndex class, and how manifest validation uses it."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from pydantic import ValidationError
+from streamdeck_cli.models.assets import AssetIndex
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a valid plugin with many actions sharing the same icons directory."""
+    return make_plugin(
+        files={
+            "imgs/icon.png": None,
+            "imgs/icon.svg": "<svg/>",
+            "ui/pi.html": "<html></html>",
+            ".packignore": None,
+            **{f"imgs/action{i}.png": b"png" for i in range(20)},
+        },
+        actions=[
+            {"UUID": f"com.test.plugin.action{i}", "Name": f"Action {i}", "Icon": f"imgs/action{i}", "PropertyInspectorPath": "ui/pi.html"}
+            for i in range(20)
+        ],
+    )
+
+
+def test_asset_index_exists(plugin_dirpath: Path):
+    """Test that existing files and directories are found, while missing ones aren't."""
+    asset_index = AssetIndex(plugin_dirpath)
+
+    assert asset_index.exists(Path("main.py"))
+    assert asset_index.exists(Path("imgs"))
+    assert asset_index.exists(Path("imgs/action3.png"))
+    assert asset_index.exists_with_any_suffix(Path("imgs/icon"), (".png", ".svg"))
+    assert not asset_index.exists(Path("missing.py"))
+    assert not asset_index.exists(Path("missing/file.py"))
+    assert not asset_index.exists_with_any_suffix(Path("imgs/icon"), (".png", ".gif"))
+
+
+def test_asset_index_checks_case_mismatches_on_filesystem(plugin_dirpath: Path, mocker: MockerFixture):
+    """Test that a path only found with a different case is checked on the filesystem, which may be case-insensitive."""
+    asset_index = AssetIndex(plugin_dirpath)
+    mocker.patch.object(Path, "exists", return_value=True)
+
+    assert asset_index.exists(Path("MAIN.py"))
+    assert not asset_index.exists(Path("other.py"))
+
+
+def test_manifest_validation_lists_each_directory_once(plugin_dirpath: Path, mocker: MockerFixture):
+    """Test that validating a manifest lists each referenced directory once, instead of checking every path."""
+    scandir_spy = mocker.spy(os, "scandir")
+    exists_spy = mocker.spy(Path, "exists")
+
+    Manifest.from_json_file(plugin_dirpath / "manifest.json")
+
+    scanned_dirpaths = [Path(call.args[0]) for call in scandir_spy.call_args_list]
+    assert sorted(scanned_dirpaths) == [plugin_dirpath / ".", plugin_dirpath / "imgs", plugin_dirpath / "ui"]
+    exists_spy.assert_not_called()
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_manifest_validation_reports_missing_assets(plugin_dirpath: Path, jobs: int):
+    """Test that missing assets are still reported, whether or not directories are listed concurrently."""
+    (plugin_dirpath / "imgs" / "action7.png").unlink()
+
+    with pytest.raises(ValidationError, match="Icon"):
+        Manifest.from_json_file(plugin_dirpath / "manifest.json", jobs=jobs)
+
+
+def test_prefetch_lists_directories_concurrently(plugin_dirpath: Path, mocker: MockerFixture):
+    """Test that prefetching lists every directory of the given paths upfront."""
+    asset_index = AssetIndex(plugin_dirpath)
+    asset_index.prefetch([Path("main.py"), Path("imgs/icon"), Path("ui/pi.html")], jobs=4)
+    scandir_spy = mocker.spy(os, "scandir")
+
+    assert asset_index.exists(Path("ui/pi.html"))
+    assert asset_index.exists(Path("imgs/icon.svg"))
+    scandir_spy.assert_not_called()
@@ -0,0 +1 @@
+"""Tests for the release directories of the pack command."""
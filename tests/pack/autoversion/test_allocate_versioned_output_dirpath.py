@@ -0,0 +1,63 @@
+"""Tests for allocating release directories through the release index."""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from streamdeck_cli.commands.pack.autoversion import (
+    RELEASE_INDEX_FILENAME,
+    allocate_versioned_output_dirpath,
+)
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+CONCURRENT_PACK_COUNT = 16
+
+
+def test_allocate_creates_successive_releases(tmp_path: Path):
+    """Test that each allocation creates the next release directory, and records it in the index."""
+    output_dirpath = tmp_path / "releases"
+
+    dirpaths = [allocate_versioned_output_dirpath(output_dirpath, "1.0.0") for _ in range(3)]
+
+    assert dirpaths == [output_dirpath / "1.0.0", output_dirpath / "1.0.0-1", output_dirpath / "1.0.0-2"]
+    assert all(dirpath.is_dir() for dirpath in dirpaths)
+    index = json.loads((output_dirpath / RELEASE_INDEX_FILENAME).read_text())
+    assert index["last_subversions"] == {"1.0.0": 2}
+
+
+def test_allocate_rebuilds_missing_index(tmp_path: Path):
+    """Test that releases made before the index existed are taken into account."""
+    output_dirpath = tmp_path / "releases"
+    for dirname in ("1.0.0", "1.0.0-1", "1.0.0-7", "1.0.0.1"):
+        (output_dirpath / dirname).mkdir(parents=True)
+
+    assert allocate_versioned_output_dirpath(output_dirpath, "1.0.0") == output_dirpath / "1.0.0-8"
+    assert allocate_versioned_output_dirpath(output_dirpath, "1.0.0.1") == output_dirpath / "1.0.0.1-1"
+
+
+def test_allocate_recovers_from_stale_index(tmp_path: Path):
+    """Test that a release directory made behind the index's back doesn't get reused."""
+    output_dirpath = tmp_path / "releases"
+    allocate_versioned_output_dirpath(output_dirpath, "1.0.0")
+    (output_dirpath / "1.0.0-1").mkdir()
+    (output_dirpath / "1.0.0-2").mkdir()
+
+    assert allocate_versioned_output_dirpath(output_dirpath, "1.0.0") == output_dirpath / "1.0.0-3"
+
+
+def test_concurrent_allocations_never_collide(tmp_path: Path):
+    """Test that parallel packs sharing the output directory each get their own release directory."""
+    output_dirpath = tmp_path / "releases"
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        dirpaths = list(executor.map(allocate_versioned_output_dirpath, [output_dirpath] * CONCURRENT_PACK_COUNT, ["2.0.0"] * CONCURRENT_PACK_COUNT))
+
+    assert len(set(dirpaths)) == CONCURRENT_PACK_COUNT
+    assert sorted(path.name for path in output_dirpath.iterdir() if path.is_dir()) == sorted(
+        ["2.0.0", *(f"2.0.0-{subversion}" for subversion in range(1, CONCURRENT_PACK_COUNT))]
+    )
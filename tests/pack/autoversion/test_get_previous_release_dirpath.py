@@ -0,0 +1,42 @@
+"""Tests for finding the release directory that comes before another one."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.autoversion import (
+    get_previous_release_dirpath,
+    list_release_dirpaths,
+)
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def output_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create an output directory with releases of several versions, along with non-release entries."""
+    output_dir = tmp_path / "releases"
+    for dirname in ("1.0.10", "1.0.9", "1.0.9-1", "1.0.9-2", "0.9.0", ".pack-cache"):
+        (output_dir / dirname).mkdir(parents=True)
+    (output_dir / "1.1.0").write_text("not a release directory")
+    return output_dir
+
+
+def test_releases_are_listed_by_version_then_subversion(output_dirpath: Path):
+    """Test that versions compare number by number, so that 1.0.10 comes after 1.0.9 and its subversions."""
+    assert [path.name for path in list_release_dirpaths(output_dirpath)] == ["0.9.0", "1.0.9", "1.0.9-1", "1.0.9-2", "1.0.10"]
+
+
+@pytest.mark.parametrize(("dirname", "expected_previous_dirname"), [
+    ("1.0.10", "1.0.9-2"),
+    ("1.0.9-1", "1.0.9"),
+    ("1.0.9", "0.9.0"),
+    ("0.9.0", None),
+])
+def test_previous_release(output_dirpath: Path, dirname: str, expected_previous_dirname: str | None):
+    """Test that the previous release is the one right before in version order, if any."""
+    previous_dirpath = get_previous_release_dirpath(output_dirpath / dirname)
+
+    assert (previous_dirpath.name if previous_dirpath else None) == expected_previous_dirname
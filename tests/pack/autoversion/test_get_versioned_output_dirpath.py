@@ -42,3 +42,12 @@ def test_correct_output_version_and_subversion(fake_output_dirpath: Path, plugin
     actual_path = get_versioned_output_dirpath(fake_output_dirpath, plugin_version)
 
     assert actual_path == expected_path
+
+
+def test_similar_versions_are_not_previous_releases(fake_output_dirpath: Path):
+    """Test that releases of versions that merely start with the same characters don't count as previous releases."""
+    (fake_output_dirpath / "1.0.0.1").mkdir(parents=True)
+    (fake_output_dirpath / "1.0.01").mkdir()
+    (fake_output_dirpath / "1.0.0-x").mkdir()
+
+    assert get_versioned_output_dirpath(fake_output_dirpath, "1.0.0") == fake_output_dirpath / "1.0.0"
@@ -0,0 +1 @@
+"""Tests for packing several plugins at once."""
@@ -0,0 +1,52 @@
+"""Tests for packing several plugins at once."""
+from __future__ import annotations
+
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.batch import pack_plugins
+from streamdeck_cli.commands.pack.build import PackOptions
+from streamdeck_cli.utils.plugin_paths import expand_plugin_dirpaths
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugins_root(tmp_path: Path, make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a monorepo with two valid plugins and one with an invalid manifest."""
+    root = tmp_path / "plugins"
+    make_plugin(root / "first", uuid="com.test.first")
+    make_plugin(root / "second", uuid="com.test.second")
+    broken_dirpath = make_plugin(root / "broken", uuid="com.test.broken")
+    (broken_dirpath / "main.py").unlink()
+    # A directory without a manifest, which a glob shouldn't pick up.
+    (root / "docs").mkdir()
+    return root
+
+
+def test_expand_plugin_dirpaths(plugins_root: Path):
+    """Test that glob patterns are expanded to the plugin directories they match, while plain paths are kept as-is."""
+    plugin_dirpaths = expand_plugin_dirpaths([plugins_root / "second", plugins_root / "*"])
+
+    assert plugin_dirpaths == [plugins_root / "second", plugins_root / "broken", plugins_root / "first"]
+
+
+def test_pack_plugins_reports_each_plugin(plugins_root: Path, tmp_path: Path):
+    """Test that every valid plugin gets packed into its own subdirectory, even though another one fails."""
+    output_dirpath = tmp_path / "releases"
+    plugin_dirpaths = [plugins_root / "first", plugins_root / "broken", plugins_root / "second"]
+
+    results = pack_plugins(plugin_dirpaths, output_dirpath, PackOptions(), max_workers=2)
+
+    assert [result.plugin_dirpath for result in results] == plugin_dirpaths
+    assert [result.succeeded for result in results] == [True, False, True]
+    assert "CodePath" in (results[1].error or "")
+
+    for result in (results[0], results[2]):
+        assert result.output_filepath == output_dirpath / result.plugin_uuid / "1.0.0" / f"{result.plugin_uuid}.streamDeckPlugin"
+        with zipfile.ZipFile(result.output_filepath) as zip_file:
+            assert f"{result.plugin_uuid}.sdPlugin/manifest.json" in zip_file.namelist()
@@ -0,0 +1 @@
+"""Tests for precompiling the Python sources of a plugin."""
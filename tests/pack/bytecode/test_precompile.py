@@ -0,0 +1,130 @@
+"""Tests for precompiling a plugin's Python sources to bytecode while packing it."""
+from __future__ import annotations
+
+import importlib.util
+import io
+import marshal
+import sys
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+import typer
+from streamdeck_cli.commands.pack import bytecode
+from streamdeck_cli.commands.pack.build import PackOptions, pack_plugin, pack_plugin_to_bytes
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_mock import MockerFixture
+
+
+RUNNING_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+CACHE_TAG = sys.implementation.cache_tag
+HELPER_VALUE = 42
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin with a few Python modules, and a stale __pycache__ directory."""
+    return make_plugin(files={
+        "main.py": "from pkg import helper\nprint(helper.VALUE)\n",
+        "pkg/__init__.py": "",
+        "pkg/helper.py": f"VALUE = {HELPER_VALUE}\n",
+        f"pkg/__pycache__/helper.{CACHE_TAG}.pyc": b"stale",
+    })
+
+
+def _read_entries(package: bytes | Path) -> dict[str, bytes]:
+    with zipfile.ZipFile(package if isinstance(package, Path) else io.BytesIO(package)) as zip_file:
+        return {name.split("/", 1)[1]: zip_file.read(name) for name in zip_file.namelist()}
+
+
+def test_bytecode_is_added_next_to_sources(plugin_dirpath: Path):
+    """Test that every source gets its checked-hash bytecode in the __pycache__ directory next to it."""
+    entries = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile=RUNNING_VERSION)))
+
+    for relpath in ("main.py", "pkg/__init__.py", "pkg/helper.py"):
+        pyc_relpath = bytecode.get_pyc_relpath(relpath)
+        pyc_data = entries[pyc_relpath]
+        assert pyc_data[:4] == importlib.util.MAGIC_NUMBER
+        assert int.from_bytes(pyc_data[4:8], "little") == bytecode.CHECKED_HASH_FLAGS
+        assert pyc_data[8:16] == importlib.util.source_hash(entries[relpath])
+
+    namespace: dict = {}
+    exec(marshal.loads(entries[f"pkg/__pycache__/helper.{CACHE_TAG}.pyc"][16:]), namespace)  # noqa: S102, S302
+    assert namespace["VALUE"] == HELPER_VALUE
+
+
+def test_stale_pycache_is_replaced(plugin_dirpath: Path):
+    """Test that a __pycache__ directory already in the plugin doesn't end up in the package next to fresh bytecode."""
+    package = pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile=RUNNING_VERSION))
+
+    with zipfile.ZipFile(io.BytesIO(package)) as zip_file:
+        names = zip_file.namelist()
+
+    assert len(names) == len(set(names))
+    assert _read_entries(package)[f"pkg/__pycache__/helper.{CACHE_TAG}.pyc"] != b"stale"
+
+
+def test_without_precompile_no_bytecode_is_added(plugin_dirpath: Path):
+    """Test that precompiling is opt-in."""
+    entries = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions()))
+
+    assert f"pkg/__pycache__/__init__.{CACHE_TAG}.pyc" not in entries
+
+
+def test_unchanged_modules_are_not_recompiled(plugin_dirpath: Path, tmp_path: Path, mocker: MockerFixture):
+    """Test that the next pack takes unchanged modules' bytecode from the cache, and only compiles the changed one."""
+    output_dirpath = tmp_path / "releases"
+    options = PackOptions(precompile=RUNNING_VERSION, reproducible=True)
+    first_result = pack_plugin(plugin_dirpath, output_dirpath, options)
+
+    compile_spy = mocker.spy(bytecode, "compile_bytecode")
+    second_result = pack_plugin(plugin_dirpath, output_dirpath, options)
+    assert compile_spy.call_count == 0
+    assert second_result.digest == first_result.digest
+
+    (plugin_dirpath / "pkg" / "helper.py").write_text("VALUE = 43\n")
+    pack_plugin(plugin_dirpath, output_dirpath, options)
+    assert [call.args[1] for call in compile_spy.call_args_list] == ["pkg/helper.py"]
+
+
+def test_parallel_compilation_matches_serial(plugin_dirpath: Path):
+    """Test that compiling across worker processes gives the same package as compiling in-process."""
+    serial = pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile=RUNNING_VERSION, reproducible=True))
+    parallel = pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile=RUNNING_VERSION, reproducible=True, jobs=2))
+
+    assert parallel == serial
+
+
+def test_syntax_errors_are_skipped(plugin_dirpath: Path):
+    """Test that a module that doesn't compile is still packed, just without bytecode."""
+    (plugin_dirpath / "broken.py").write_text("def (:\n")
+
+    entries = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile=RUNNING_VERSION)))
+
+    assert "broken.py" in entries
+    assert f"__pycache__/broken.{CACHE_TAG}.pyc" not in entries
+    assert f"__pycache__/main.{CACHE_TAG}.pyc" in entries
+
+
+def test_other_target_version_is_rejected(plugin_dirpath: Path):
+    """Test that bytecode can't be compiled for another Python version than the running one."""
+    with pytest.raises(typer.Exit):
+        pack_plugin_to_bytes(plugin_dirpath, PackOptions(precompile="2.7"))
+
+
+def test_rejected_target_version_claims_no_release(plugin_dirpath: Path, tmp_path: Path):
+    """Test that a pack failing on its target version leaves no release directory behind, nor skips a subversion."""
+    output_dirpath = tmp_path / "releases"
+    with pytest.raises(typer.Exit):
+        pack_plugin(plugin_dirpath, output_dirpath, PackOptions(precompile="2.7"))
+
+    result = pack_plugin(plugin_dirpath, output_dirpath, PackOptions())
+
+    assert result.output_filepath is not None
+    assert sorted(path.name for path in output_dirpath.iterdir() if not path.name.startswith(".")) == ["1.0.0"]
+    assert result.output_filepath.parent == output_dirpath / "1.0.0"
@@ -0,0 +1 @@
+"""Tests for the compression cache of the pack command."""
@@ -0,0 +1,154 @@
+"""Tests for the CompressionCache class, and how archive_plugin_files uses it."""
+from __future__ import annotations
+
+import io
+import os
+import zipfile
+from typing import TYPE_CHECKING
+
+import pathspec
+import pytest
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from streamdeck_cli.commands.pack import zip as pack_zip
+from streamdeck_cli.commands.pack.cache import CompressionCache
+from streamdeck_cli.commands.pack.compression import compress_data
+from streamdeck_cli.commands.pack.zip import ZIPFILE_RAW_WRITE_INTERNALS, archive_plugin_files
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugin_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create a plugin directory with a few compressible files."""
+    plugin_dir = tmp_path / "plugin"
+    plugin_dir.mkdir()
+    (plugin_dir / "file1.txt").write_text("content1" * 100)
+    (plugin_dir / "file2.txt").write_text("content2" * 100)
+    (plugin_dir / "sub").mkdir()
+    (plugin_dir / "sub" / "file3.txt").write_text("content3" * 100)
+    return plugin_dir
+
+
+@pytest.fixture
+def cache_dirpath(tmp_path: Path) -> Path:
+    """Fixture to get the directory the plugin's compression cache is kept in."""
+    return tmp_path / "releases" / ".pack-cache" / "test_plugin"
+
+
+@pytest.fixture
+def packignore_spec() -> pathspec.PathSpec:
+    """Fixture to get a specification that doesn't ignore any file."""
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, [])
+
+
+def _pack(plugin_dirpath: Path, output_filepath: Path, packignore_spec: pathspec.PathSpec, cache: CompressionCache | None) -> None:
+    archive_plugin_files(plugin_dirpath, output_filepath, plugin_uuid="test_plugin", packignore_spec=packignore_spec, cache=cache)
+
+
+def test_first_pack_misses_then_hits(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that every file is compressed on the first run, and copied raw from the cache on the next one."""
+    first_cache = CompressionCache.load(cache_dirpath)
+    _pack(plugin_dirpath, tmp_path / "first.streamDeckPlugin", packignore_spec, first_cache)
+    assert (first_cache.stats.hits, first_cache.stats.misses) == (0, 3)
+
+    second_cache = CompressionCache.load(cache_dirpath)
+    _pack(plugin_dirpath, tmp_path / "second.streamDeckPlugin", packignore_spec, second_cache)
+    assert (second_cache.stats.hits, second_cache.stats.misses) == (3, 0)
+
+
+def test_changed_file_misses(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that only the file whose content changed gets compressed again."""
+    _pack(plugin_dirpath, tmp_path / "first.streamDeckPlugin", packignore_spec, CompressionCache.load(cache_dirpath))
+
+    (plugin_dirpath / "sub" / "file3.txt").write_text("changed content")
+
+    cache = CompressionCache.load(cache_dirpath)
+    output_filepath = tmp_path / "second.streamDeckPlugin"
+    _pack(plugin_dirpath, output_filepath, packignore_spec, cache)
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    with zipfile.ZipFile(output_filepath) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.read("test_plugin.sdPlugin/sub/file3.txt") == b"changed content"
+
+
+def test_touched_file_hits_by_content_hash(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that a file whose mtime changed but whose content didn't is still served from the cache."""
+    _pack(plugin_dirpath, tmp_path / "first.streamDeckPlugin", packignore_spec, CompressionCache.load(cache_dirpath))
+
+    touched_filepath = plugin_dirpath / "file1.txt"
+    st = touched_filepath.stat()
+    os.utime(touched_filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    cache = CompressionCache.load(cache_dirpath)
+    _pack(plugin_dirpath, tmp_path / "second.streamDeckPlugin", packignore_spec, cache)
+    assert (cache.stats.hits, cache.stats.misses) == (3, 0)
+
+
+def test_cached_archive_is_identical(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that archives built from the cache are byte-identical to ones built without it, and to what `ZipFile.write` produces."""
+    _pack(plugin_dirpath, tmp_path / "warmup.streamDeckPlugin", packignore_spec, CompressionCache.load(cache_dirpath))
+
+    uncached_filepath = tmp_path / "uncached.streamDeckPlugin"
+    cached_filepath = tmp_path / "cached.streamDeckPlugin"
+    _pack(plugin_dirpath, uncached_filepath, packignore_spec, None)
+    _pack(plugin_dirpath, cached_filepath, packignore_spec, CompressionCache.load(cache_dirpath))
+
+    stdlib_filepath = tmp_path / "stdlib.streamDeckPlugin"
+    with zipfile.ZipFile(uncached_filepath) as uncached, zipfile.ZipFile(stdlib_filepath, "w", zipfile.ZIP_DEFLATED) as stdlib:
+        for name in uncached.namelist():
+            stdlib.write(plugin_dirpath / name.split("/", 1)[1], arcname=name)
+
+    assert cached_filepath.read_bytes() == uncached_filepath.read_bytes() == stdlib_filepath.read_bytes()
+
+
+def test_changed_fingerprint_discards_file_records(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that files are compressed again when the settings deciding how they get compressed have changed."""
+    first_cache = CompressionCache.load(cache_dirpath, fingerprint="level-6")
+    _pack(plugin_dirpath, tmp_path / "first.streamDeckPlugin", packignore_spec, first_cache)
+
+    second_cache = CompressionCache.load(cache_dirpath, fingerprint="level-9")
+    assert second_cache.lookup_by_stat("file1.txt", (plugin_dirpath / "file1.txt").stat()) is None
+
+
+def test_stale_blobs_are_dropped(plugin_dirpath: Path, cache_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that the blobs of files which are no longer part of the plugin get removed from the cache."""
+    _pack(plugin_dirpath, tmp_path / "first.streamDeckPlugin", packignore_spec, CompressionCache.load(cache_dirpath))
+    # One blob per file.
+    assert len(list((cache_dirpath / "blobs").rglob("*-*"))) == len(list(plugin_dirpath.rglob("*.txt")))
+
+    (plugin_dirpath / "file2.txt").unlink()
+    _pack(plugin_dirpath, tmp_path / "second.streamDeckPlugin", packignore_spec, CompressionCache.load(cache_dirpath))
+    assert len(list((cache_dirpath / "blobs").rglob("*-*"))) == len(list(plugin_dirpath.rglob("*.txt")))
+
+
+def test_unreadable_index_starts_empty(cache_dirpath: Path):
+    """Test that a corrupted index file is ignored, rather than failing the pack."""
+    cache_dirpath.mkdir(parents=True)
+    (cache_dirpath / "index.json").write_text("{not json")
+
+    cache = CompressionCache.load(cache_dirpath)
+    assert cache.lookup_by_stat("file1.txt", cache_dirpath.stat()) is None
+
+
+def test_zipfile_has_raw_write_internals():
+    """Test that the running Python's zipfile has the internals that already-compressed entries get written through."""
+    with zipfile.ZipFile(io.BytesIO(), "w") as zip_file:
+        assert [name for name in ZIPFILE_RAW_WRITE_INTERNALS if not hasattr(zip_file, name)] == []
+
+
+@pytest.mark.parametrize("raw_write_internals", [ZIPFILE_RAW_WRITE_INTERNALS, ("_missing",)])
+def test_compressed_entries_match_zipfile_writes(monkeypatch: pytest.MonkeyPatch, raw_write_internals: tuple[str, ...]):
+    """Test that already-compressed entries are written as `zipfile` would, whether through its internals or not."""
+    monkeypatch.setattr(pack_zip, "ZIPFILE_RAW_WRITE_INTERNALS", raw_write_internals)
+    data = b"content" * 100
+    written, expected = io.BytesIO(), io.BytesIO()
+
+    with zipfile.ZipFile(written, "w") as zip_file:
+        pack_zip.write_compressed_entry(zip_file, zipfile.ZipInfo("file.txt"), compress_data(data, zipfile.ZIP_DEFLATED))
+    with zipfile.ZipFile(expected, "w") as zip_file:
+        zip_file.writestr(zipfile.ZipInfo("file.txt"), data, compress_type=zipfile.ZIP_DEFLATED)
+
+    assert written.getvalue() == expected.getvalue()
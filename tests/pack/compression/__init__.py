@@ -0,0 +1 @@
+"""Tests for the compression policy of the pack command."""
@@ -0,0 +1,125 @@
+"""Tests for the CompressionPolicy class, which decides how each plugin file gets compressed."""
+from __future__ import annotations
+
+import os
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+import typer
+from streamdeck_cli.commands.pack.compression import (
+    STORED,
+    CompressionPolicy,
+    CompressionSettings,
+    compress_data,
+)
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+CONFIGURED_LEVEL = 3
+OPTION_LEVEL = 5
+
+
+@pytest.fixture
+def plugin_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create an empty plugin directory."""
+    plugin_dir = tmp_path / "plugin"
+    plugin_dir.mkdir()
+    return plugin_dir
+
+
+@pytest.mark.parametrize("relpath", ["imgs/icon.png", "imgs/anim.GIF", "vendor/lib-1.0-py3-none-any.whl", "data.zip"])
+def test_already_compressed_types_are_stored(relpath: str):
+    """Test that files of a type that's already compressed get stored, however well they'd compress."""
+    assert CompressionPolicy().choose(relpath, b"a" * 1000) == STORED
+
+
+@pytest.mark.parametrize("relpath", ["main.py", "manifest.json", "pi/index.html", "imgs/icon.svg"])
+def test_compressible_types_are_deflated(relpath: str):
+    """Test that files of a type known to compress well get deflated, even if they wouldn't shrink."""
+    assert CompressionPolicy(compresslevel=7).choose(relpath, os.urandom(1000)) == CompressionSettings(zipfile.ZIP_DEFLATED, 7)
+
+
+def test_unknown_types_are_sampled():
+    """Test that files of an unknown type are only deflated if a sample of them compresses well."""
+    policy = CompressionPolicy()
+
+    assert policy.choose("data.bin", b"abc" * 10_000) == policy.deflated
+    assert policy.choose("random.bin", os.urandom(10_000)) == STORED
+
+
+def test_last_matching_rule_wins():
+    """Test that the last rule matching a file decides how it gets compressed, as in .gitignore files."""
+    policy = CompressionPolicy(rules=[
+        ("assets/**", STORED),
+        ("*.json", CompressionSettings(zipfile.ZIP_DEFLATED, 9)),
+    ])
+
+    assert policy.choose("assets/sound.wav", b"abc" * 1000) == STORED
+    assert policy.choose("assets/config.json", b"abc" * 1000) == CompressionSettings(zipfile.ZIP_DEFLATED, 9)
+    # Rules take precedence over the built-in file types.
+    assert CompressionPolicy(rules=[("*.png", CompressionSettings(zipfile.ZIP_DEFLATED, 1))]).choose("icon.png", b"") != STORED
+
+
+def test_from_config_reads_pyproject(plugin_dirpath: Path):
+    """Test that the level & rules are read from the plugin's pyproject.toml file."""
+    (plugin_dirpath / "pyproject.toml").write_text(
+        '[tool.streamdeck-cli.pack]\n'
+        f'compress-level = {CONFIGURED_LEVEL}\n'
+        '[tool.streamdeck-cli.pack.compression]\n'
+        '"*.json" = 9\n'
+        '"sounds/**" = "store"\n'
+    )
+
+    policy = CompressionPolicy.from_config(plugin_dirpath)
+
+    assert policy.compresslevel == CONFIGURED_LEVEL
+    assert policy.rules == [("*.json", CompressionSettings(zipfile.ZIP_DEFLATED, 9)), ("sounds/**", STORED)]
+    # The CLI option overrides the configured level.
+    assert CompressionPolicy.from_config(plugin_dirpath, compresslevel=OPTION_LEVEL).compresslevel == OPTION_LEVEL
+
+
+def test_from_config_without_pyproject(plugin_dirpath: Path):
+    """Test that the default policy is used if the plugin has no pyproject.toml file."""
+    assert CompressionPolicy.from_config(plugin_dirpath) == CompressionPolicy()
+
+
+def test_from_config_rejects_invalid_rule(plugin_dirpath: Path):
+    """Test that a rule that's neither a level nor "store" is an error."""
+    (plugin_dirpath / "pyproject.toml").write_text('[tool.streamdeck-cli.pack.compression]\n"*.json" = "fast"\n')
+
+    with pytest.raises(typer.Exit):
+        CompressionPolicy.from_config(plugin_dirpath)
+
+
+@pytest.mark.parametrize("compress_level", ["12", "-1", '"6"', "true"])
+def test_from_config_rejects_invalid_level(plugin_dirpath: Path, compress_level: str):
+    """Test that a configured level that isn't an integer from 0 to 9 is an error."""
+    (plugin_dirpath / "pyproject.toml").write_text(f"[tool.streamdeck-cli.pack]\ncompress-level = {compress_level}\n")
+
+    with pytest.raises(typer.Exit):
+        CompressionPolicy.from_config(plugin_dirpath)
+
+
+def test_level_zero_stores_files(plugin_dirpath: Path):
+    """Test that a level of 0 stores files, whether it's the policy's level or a rule's."""
+    (plugin_dirpath / "pyproject.toml").write_text('[tool.streamdeck-cli.pack.compression]\n"*.json" = 0\n')
+
+    assert CompressionPolicy.from_config(plugin_dirpath).choose("config.json", b"{}") == STORED
+    assert CompressionPolicy.from_config(plugin_dirpath, compresslevel=0).choose("main.py", b"") == STORED
+
+
+@pytest.mark.parametrize(("data", "compress_type"), [
+    (b"x = 1\n", zipfile.ZIP_STORED),
+    (os.urandom(1000), zipfile.ZIP_STORED),
+    (b"print('hello')\n" * 100, zipfile.ZIP_DEFLATED),
+])
+def test_deflated_data_is_stored_unless_smaller(data: bytes, compress_type: int):
+    """Test that data chosen to be deflated still gets stored, if deflating it doesn't make it any smaller."""
+    entry = compress_data(data, zipfile.ZIP_DEFLATED)
+
+    assert entry.compress_type == compress_type
+    assert len(entry.data) <= len(data)
@@ -0,0 +1 @@
+"""Tests for deploying a plugin into a plugins directory."""
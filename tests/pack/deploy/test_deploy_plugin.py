@@ -0,0 +1,149 @@
+"""Tests for deploying a plugin into a plugins directory, only writing the files that changed."""
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.__main__ import cli
+from streamdeck_cli.commands.pack.build import PackOptions, pack_plugin_to_bytes
+from streamdeck_cli.commands.pack.deploy import DirectorySource, deploy_plugin, open_archive_source
+from typer.testing import CliRunner
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+# The manifest, the icon, main.py and helpers.py.
+PLUGIN_FILE_COUNT = 4
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a plugin with a few files, and one ignored by its .packignore file."""
+    return make_plugin(files={
+        "main.py": "print('hello')\n",
+        "helpers.py": "def helper(): ...\n",
+        "notes.txt": "Not for the package.",
+        ".packignore": ".packignore\nnotes.txt\n",
+    })
+
+
+@pytest.fixture
+def target_dirpath(tmp_path: Path) -> Path:
+    """Fixture to get the directory the plugin gets deployed to, in a plugins directory that doesn't exist yet."""
+    return tmp_path / "plugins" / "com.test.plugin.sdPlugin"
+
+
+def _deployed_files(target_dirpath: Path) -> dict[str, bytes]:
+    return {
+        filepath.relative_to(target_dirpath).as_posix(): filepath.read_bytes()
+        for filepath in target_dirpath.rglob("*")
+        if filepath.is_file()
+    }
+
+
+def test_first_deploy_copies_filtered_files(plugin_dirpath: Path, target_dirpath: Path):
+    """Test that deploying to a new directory copies every file that would get packed."""
+    result = deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+
+    assert sorted(result.added) == ["helpers.py", "imgs/icon.png", "main.py", "manifest.json"]
+    assert _deployed_files(target_dirpath)["main.py"] == b"print('hello')\n"
+    assert "notes.txt" not in _deployed_files(target_dirpath)
+
+
+def test_redeploy_without_changes_writes_nothing(plugin_dirpath: Path, target_dirpath: Path):
+    """Test that deploying an unchanged plugin leaves the deployed directory as it is."""
+    deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+    inode = target_dirpath.stat().st_ino
+
+    result = deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+
+    assert not result.has_changes
+    assert result.unchanged_count == PLUGIN_FILE_COUNT
+    assert target_dirpath.stat().st_ino == inode
+
+
+def test_redeploy_only_writes_changed_files(plugin_dirpath: Path, target_dirpath: Path):
+    """Test that only added & updated files get written, removed ones get deleted, and unchanged ones are kept as is."""
+    deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+    icon_inode = (target_dirpath / "imgs" / "icon.png").stat().st_ino
+
+    (plugin_dirpath / "main.py").write_text("print('hello again')\n")
+    (plugin_dirpath / "helpers.py").unlink()
+    (plugin_dirpath / "imgs" / "action.png").write_bytes(b"png")
+
+    result = deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+
+    assert result.added == ["imgs/action.png"]
+    assert result.updated == ["main.py"]
+    assert (result.deleted, result.unchanged_count) == (["helpers.py"], 2)
+    assert _deployed_files(target_dirpath)["main.py"] == b"print('hello again')\n"
+    assert "helpers.py" not in _deployed_files(target_dirpath)
+    # Unchanged files are hardlinked into the new directory, rather than written again.
+    assert (target_dirpath / "imgs" / "icon.png").stat().st_ino == icon_inode
+    # Nothing's left behind from staging the new directory.
+    assert sorted(path.name for path in target_dirpath.parent.iterdir()) == ["com.test.plugin.sdPlugin"]
+
+
+def test_same_size_and_mtime_needs_checksum(plugin_dirpath: Path, target_dirpath: Path):
+    """Test that a file with the same size & mtime is only found to have changed when comparing contents."""
+    deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+    main_filepath = plugin_dirpath / "main.py"
+    stat = main_filepath.stat()
+    main_filepath.write_text("print('HELLO')\n")
+    os.utime(main_filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert not deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath).has_changes
+
+    result = deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath, checksum=True)
+    assert result.updated == ["main.py"]
+
+
+def test_dry_run_writes_nothing(plugin_dirpath: Path, target_dirpath: Path):
+    """Test that a dry run lists the files it would add, without creating the deployed directory."""
+    result = deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath, dry_run=True)
+
+    assert len(result.added) == PLUGIN_FILE_COUNT
+    assert not target_dirpath.exists()
+
+
+def test_deploy_from_archive(plugin_dirpath: Path, target_dirpath: Path, tmp_path: Path):
+    """Test that a package deploys the same files as its plugin directory, and that redeploying it writes nothing."""
+    archive_filepath = tmp_path / "com.test.plugin.streamDeckPlugin"
+    archive_filepath.write_bytes(pack_plugin_to_bytes(plugin_dirpath, PackOptions(reproducible=True)))
+    deploy_plugin(DirectorySource(plugin_dirpath), target_dirpath)
+    (plugin_dirpath / "main.py").write_text("print('changed')\n")
+    (target_dirpath / "stale.py").write_text("")
+
+    source, plugin_uuid = open_archive_source(archive_filepath)
+    with source.zip_file:
+        result = deploy_plugin(source, target_dirpath)
+        redeploy_result = deploy_plugin(source, target_dirpath)
+
+    assert plugin_uuid == "com.test.plugin"
+    assert result.updated == []
+    assert result.deleted == ["stale.py"]
+    assert not redeploy_result.has_changes
+
+
+def test_deploy_command(plugin_dirpath: Path, tmp_path: Path):
+    """Test that the command deploys to the plugin's <uuid>.sdPlugin directory, in the debug mode asked for."""
+    result = CliRunner().invoke(cli, ["deploy", str(plugin_dirpath), "--target", str(tmp_path / "plugins"), "--debug", "5678"])
+
+    assert result.exit_code == 0, result.output
+    assert "5 added, 0 updated, 0 deleted, 0 unchanged." in result.output
+    assert (tmp_path / "plugins" / "com.test.plugin.sdPlugin" / ".debug").read_text() == "5678"
+
+
+def test_deploy_command_invalid_plugin(plugin_dirpath: Path, tmp_path: Path):
+    """Test that a plugin whose manifest doesn't validate doesn't get deployed."""
+    (plugin_dirpath / "main.py").unlink()
+
+    result = CliRunner().invoke(cli, ["deploy", str(plugin_dirpath), "--target", str(tmp_path / "plugins")])
+
+    assert result.exit_code == 1
+    assert "ERROR: Manifest validation failed" in result.output
+    assert not (tmp_path / "plugins").exists()
@@ -0,0 +1 @@
+"""Tests for matching paths against .packignore files."""
@@ -0,0 +1,110 @@
+"""Tests for matching paths against a compiled .packignore specification."""
+from __future__ import annotations
+
+import pathspec
+import pytest
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from streamdeck_cli.commands.pack.ignore import IgnoreMatcher
+
+
+PATTERNS = [
+    "# Comments and blank lines are skipped",
+    "",
+    "*.pyc",
+    "*.tar.gz",
+    "__pycache__/",
+    "/build",
+    "docs/internal/",
+    "docs/**/*.md",
+    "!docs/guide/index.md",
+    "lib/*.py",
+    "!lib/keep.py",
+    "tmp_*_*.log",
+    "a?c",
+    "[xy].txt",
+    "**/cache/**",
+    "/*.toml",
+    "Thumbs.db",
+    "!Thumbs.db",
+]
+
+PATHS = [
+    "main.py",
+    "main.pyc",
+    "src/module.pyc",
+    "dist/release.tar.gz",
+    "release.gz",
+    "__pycache__/",
+    "src/__pycache__/",
+    "src/__pycache__",
+    "build",
+    "build/",
+    "build/output.bin",
+    "src/build/",
+    "docs/internal/",
+    "docs/internal/notes.txt",
+    "docs/guide/page.md",
+    "docs/guide/index.md",
+    "docs/readme.md",
+    "src/docs/guide/page.md",
+    "lib/helper.py",
+    "lib/keep.py",
+    "lib/sub/helper.py",
+    "tmp_1_x.log",
+    "logs/tmp_2_y.log",
+    "tmp_x.log",
+    "abc",
+    "src/abc/",
+    "abbc",
+    "x.txt",
+    "z.txt",
+    "cache/",
+    "src/cache/data.bin",
+    "pyproject.toml",
+    "config/settings.toml",
+    "Thumbs.db",
+]
+
+
+@pytest.fixture
+def spec() -> pathspec.PathSpec:
+    """Fixture to create a specification of the test patterns."""
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, PATTERNS)
+
+
+@pytest.mark.parametrize("relpath", PATHS)
+def test_matches_like_pathspec(spec: pathspec.PathSpec, relpath: str):
+    """Test that every path is ignored, re-included or left unmatched just as pathspec decides."""
+    matcher = IgnoreMatcher(spec)
+
+    assert matcher.check(relpath) == spec.check_file(relpath).include
+
+
+def test_last_matching_pattern_decides():
+    """Test that a later pattern overrides an earlier one, whichever way each is indexed."""
+    spec = pathspec.PathSpec.from_lines(GitWildMatchPattern, ["*.log", "!debug.log", "logs/*.log"])
+    matcher = IgnoreMatcher(spec)
+
+    assert matcher.check("debug.log") is False
+    assert matcher.check("logs/debug.log") is True
+    assert matcher.check("info.log") is True
+    assert matcher.check("info.txt") is None
+
+
+def test_directory_decisions_are_memoised(spec: pathspec.PathSpec):
+    """Test that a directory's decision is only computed once, while files are checked every time."""
+    matcher = IgnoreMatcher(spec)
+
+    assert matcher.check("src/__pycache__/") is True
+    assert matcher._dir_decisions == {"src/__pycache__/": True}
+
+    matcher.check("main.pyc")
+    assert "main.pyc" not in matcher._dir_decisions
+
+
+def test_empty_specification():
+    """Test that nothing is matched by a specification without patterns."""
+    matcher = IgnoreMatcher(pathspec.PathSpec.from_lines(GitWildMatchPattern, ["# Nothing to ignore"]))
+
+    assert matcher.check("main.py") is None
+    assert matcher.check("src/") is None
@@ -0,0 +1 @@
+"""Tests for optimising the assets of a plugin while packing it."""
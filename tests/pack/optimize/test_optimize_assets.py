@@ -0,0 +1,233 @@
+"""Tests for losslessly optimising a plugin's icons and property inspector files while packing it."""
+from __future__ import annotations
+
+import io
+import os
+import struct
+import zipfile
+import zlib
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack import optimize
+from streamdeck_cli.commands.pack.build import PackOptions, pack_plugin_to_bytes
+from streamdeck_cli.models.cache import user_cache_dirpath
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+PI_HTML = """<!DOCTYPE html>
+<html>
+  <!-- Property inspector -->
+  <head>
+    <link rel="stylesheet" href="pi.css">
+    <script src="./pi.js"></script>
+    <script src="https://example.com/sdk.js"></script>
+  </head>
+  <body>
+    <pre>  keep
+    this</pre>
+  </body>
+</html>
+"""
+
+PI_JS = """// Connects to the Stream Deck app
+const url = "ws://localhost:" + port;  // not a comment in a string
+const pattern = /\\/\\/foo/g;
+
+    function ratio(a, b) {
+        return a / b / 2;  /* block comment */
+    }
+"""
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def _make_png(width: int = 16, height: int = 16) -> bytes:
+    """Make an RGB PNG whose image data is stored uncompressed, with a text chunk."""
+    # Each row starts with its filter type (none), followed by its RGB pixels.
+    raw = b"".join(b"\x00" + bytes([row * 8 % 256, 0, 0]) + bytes(3 * (width - 1)) for row in range(height))
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        _png_chunk(b"tEXt", b"Comment\x00" + b"made with an image editor" * 10),
+        _png_chunk(b"IDAT", zlib.compress(raw, 0)),
+        _png_chunk(b"IEND", b""),
+    ])
+
+
+def _png_pixels(png: bytes) -> bytes:
+    offset, image_data = 8, b""
+    while offset < len(png):
+        length, chunk_type = struct.unpack(">I4s", png[offset:offset + 8])
+        if chunk_type == b"IDAT":
+            image_data += png[offset + 8:offset + 8 + length]
+        offset += 12 + length
+    return zlib.decompress(image_data)
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a plugin with icons, a property inspector, and code that looks like property inspector files."""
+    return make_plugin(
+        CodePath="main.js",
+        actions=[
+            {"UUID": "com.test.plugin.action", "Name": "Action", "Icon": "imgs/action", "PropertyInspectorPath": "pi/index.html"},
+        ],
+        files={
+            "imgs/icon.png": _make_png(),
+            "imgs/icon@2x.png": _make_png(32, 32),
+            "imgs/action.svg": "<!-- editor -->\n<svg>\n  <metadata>x</metadata>\n  <rect/>\n</svg>\n",
+            # Not referenced by the manifest, so left as it is.
+            "imgs/unused.png": _make_png(),
+            "pi/index.html": PI_HTML,
+            "pi/pi.css": '/* theme */\nbody {\n  color : red;\n  content: "a  ;  }";\n}\n',
+            "pi/pi.js": PI_JS,
+            "main.js": "// the plugin's code\nconsole.log(1);\n",
+            "main.py": None,
+        },
+    )
+
+
+def _read_entries(package: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(package)) as zip_file:
+        return {name.split("/", 1)[1]: zip_file.read(name) for name in zip_file.namelist()}
+
+
+def test_only_manifest_assets_are_optimized(plugin_dirpath: Path):
+    """Test that icons and property inspector files get optimised, but neither unreferenced files nor the code."""
+    original = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions()))
+    optimized = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions(optimize_assets=True)))
+
+    assert original.keys() == optimized.keys()
+    for relpath in ("imgs/icon.png", "imgs/icon@2x.png", "imgs/action.svg", "pi/index.html", "pi/pi.css", "pi/pi.js"):
+        assert len(optimized[relpath]) < len(original[relpath]), relpath
+    for relpath in ("imgs/unused.png", "main.js", "manifest.json"):
+        assert optimized[relpath] == original[relpath], relpath
+
+
+def test_optimizations_are_lossless(plugin_dirpath: Path):
+    """Test that optimised images keep their pixels, and minified files keep their strings, regexes and pre blocks."""
+    entries = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions(optimize_assets=True)))
+
+    png = entries["imgs/icon.png"]
+    assert b"tEXt" not in png
+    assert _png_pixels(png) == _png_pixels((plugin_dirpath / "imgs" / "icon.png").read_bytes())
+
+    assert entries["imgs/action.svg"] == b"<svg><rect/></svg>"
+    assert entries["pi/pi.css"] == b'body{color : red;content: "a  ;  }"}'
+    assert entries["pi/pi.js"].decode() == (
+        'const url = "ws://localhost:" + port;\n'
+        "const pattern = /\\/\\/foo/g;\n"
+        "function ratio(a, b) {\n"
+        "return a / b / 2;\n"
+        "}"
+    )
+
+    html = entries["pi/index.html"].decode()
+    assert "Property inspector" not in html
+    assert "<pre>  keep\n    this</pre>" in html
+
+
+@pytest.mark.parametrize(("css", "expected"), [
+    ("/* it's */ .x::after { content: 'a    b' }", ".x::after{content: 'a    b'}"),
+    ('.x { content: "/* not a comment */" ; }', '.x{content: "/* not a comment */"}'),
+    ("a :hover , b > c { color : red ; }", "a :hover,b>c{color : red}"),
+    ('.x { content: "it\\"s  /*" } /* " */ .y { }', '.x{content: "it\\"s  /*"}.y{}'),
+])
+def test_minify_css_source(css: str, expected: str):
+    """Test that comments & whitespace get dropped, but that strings are kept as they are, even with comment delimiters."""
+    assert optimize.minify_css_source(css) == expected
+
+
+@pytest.mark.parametrize(("js", "expected"), [
+    # Comments spanning lines are line breaks for automatic semicolon insertion, others are whitespace.
+    ("return /*\n*/ 42;", "return\n42;"),
+    ("let a = 1/* one */+2;", "let a = 1 +2;"),
+    ("a = b // c\n(d)", "a = b\n(d)"),
+    # Quotes within comments don't start strings.
+    ("// don't\nconst s = 'a  b';", "const s = 'a  b';"),
+    ("/* it's */ const s = \"a  // b\";", 'const s = "a  // b";'),
+    # A slash after a statement's condition starts a regular expression, after an expression it's a division.
+    ('if (x) /"/.test(s) // y', 'if (x) /"/.test(s)'),
+    ("while (f(x)) /'/g.exec(s);", "while (f(x)) /'/g.exec(s);"),
+    ("a = (b) / 2 / c // d", "a = (b) / 2 / c"),
+    ("return /[/*]/.test(s) /* x */", "return /[/*]/.test(s)"),
+    ("const t = `a ${ {b: 1}.b } // c`; // d", "const t = `a ${ {b: 1}.b } // c`;"),
+])
+def test_minify_js_source(js: str, expected: str):
+    """Test that comments get dropped without changing the meaning of the script, leaving literals as they are."""
+    assert optimize.minify_js_source(js) == expected
+
+
+def test_gif_comments_are_dropped():
+    """Test that GIF comment extensions are dropped while the image blocks are kept as they are."""
+    header = b"GIF89a" + struct.pack("<HHBBB", 1, 1, 0x80, 0, 0) + bytes(6)
+    image = b"\x2c" + struct.pack("<HHHHB", 0, 0, 1, 1, 0) + b"\x02\x02\x44\x01\x00"
+    gif = header + b"\x21\xfe\x05hello\x00" + image + b"\x3b"
+
+    assert optimize.optimize_gif(gif) == header + image + b"\x3b"
+
+
+def test_truncated_gif_is_left_as_is(caplog: pytest.LogCaptureFixture):
+    """Test that a GIF ending in the middle of a block is reported as unparseable, rather than failing the pack."""
+    gif = b"GIF89a\x01\x00\x01\x00\x00\x00\x00\x21\xfe\x05abc"
+
+    assert optimize.AssetOptimizer(frozenset({"a.gif"})).optimize("a.gif", gif, "hash") == gif
+    assert "Not optimising 'a.gif'" in caplog.text
+
+
+def test_minify_html_keeps_tags():
+    """Test that whitespace is only collapsed in the text between tags, leaving attribute values as they are."""
+    html = '<p>\n  <input value="x\n   y" title="a >  <b">\n  <!-- note -->\n  text\n  more\n</p>'
+
+    assert optimize.minify_html(html.encode()).decode() == '<p> <input value="x\n   y" title="a >  <b"> \ntext\nmore\n</p>'
+
+
+def test_optimized_assets_are_cached(plugin_dirpath: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that assets are only optimised once, and that the cache is keyed by content rather than path."""
+    calls: list[bytes] = []
+    minify_svg = optimize.minify_svg
+
+    def counting_minify_svg(data: bytes) -> bytes:
+        calls.append(data)
+        return minify_svg(data)
+
+    monkeypatch.setitem(optimize.OPTIMIZERS, ".svg", counting_minify_svg)
+
+    first = pack_plugin_to_bytes(plugin_dirpath, PackOptions(optimize_assets=True))
+    second = pack_plugin_to_bytes(plugin_dirpath, PackOptions(optimize_assets=True))
+
+    assert len(calls) == 1
+    assert first == second
+    assert any((user_cache_dirpath() / "assets").iterdir())
+
+
+def test_unparseable_asset_is_left_as_is(plugin_dirpath: Path):
+    """Test that an asset that isn't what its extension says gets packed untouched, rather than failing the pack."""
+    (plugin_dirpath / "imgs" / "icon.png").write_bytes(b"not a png")
+
+    entries = _read_entries(pack_plugin_to_bytes(plugin_dirpath, PackOptions(optimize_assets=True)))
+
+    assert entries["imgs/icon.png"] == b"not a png"
+
+
+def test_lru_eviction(tmp_path: Path):
+    """Test that the least recently used entries are evicted beyond the maximum number of entries."""
+    cache = optimize.AssetCache(tmp_path / "assets", max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.encode())
+    # Set the mtimes explicitly, since they may all be equal on coarse-grained filesystems.
+    for age, key in enumerate(("a", "b", "c")):
+        os.utime(tmp_path / "assets" / key, (1000 + age, 1000 + age))
+    # Reading an entry marks it as recently used.
+    assert cache.get("a") == b"a"
+
+    cache.evict()
+
+    assert sorted(path.name for path in (tmp_path / "assets").iterdir()) == ["a", "c"]
@@ -0,0 +1 @@
+"""Tests for comparing packages and release directories."""
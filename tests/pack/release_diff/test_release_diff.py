@@ -0,0 +1,105 @@
+"""Tests for comparing two packages, or two release directories, from their central directories."""
+from __future__ import annotations
+
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack import release_diff
+from streamdeck_cli.commands.pack.release_diff import (
+    diff_archives,
+    diff_releases,
+    format_archive_diff,
+    iter_content_diffs,
+)
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_package(filepath: Path, files: dict[str, bytes], uuid: str = "com.test.plugin") -> Path:
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for relpath, data in files.items():
+            zip_file.writestr(f"{uuid}.sdPlugin/{relpath}", data)
+    return filepath
+
+
+@pytest.fixture
+def output_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create two releases of a plugin with files added, removed & changed, and a plugin only in the second."""
+    output_dir = tmp_path / "releases"
+    _write_package(output_dir / "1.0.0" / "com.test.plugin.streamDeckPlugin", {
+        "manifest.json": b"{}",
+        "main.py": b"print('hello')\n",
+        "imgs/old.png": bytes(range(256)),
+        "imgs/icon.png": b"\x89PNG old",
+    })
+    _write_package(output_dir / "1.0.1" / "com.test.plugin.streamDeckPlugin", {
+        "manifest.json": b"{}",
+        "main.py": b"print('hello')\nprint('world')\n",
+        "imgs/new.png": bytes(range(128)),
+        "imgs/icon.png": b"\x89PNG new",
+    })
+    _write_package(output_dir / "1.0.1" / "com.test.other.streamDeckPlugin", {"manifest.json": b"{}"}, uuid="com.test.other")
+    return output_dir
+
+
+def test_entries_are_compared_without_decompressing(output_dirpath: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that added, removed and changed entries are found from the central directories alone."""
+    def fail_open(*_args, **_kwargs):
+        pytest.fail("Entries shouldn't be decompressed.")
+
+    monkeypatch.setattr(zipfile.ZipFile, "open", fail_open)
+
+    archive_diff = diff_archives(
+        output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin",
+        output_dirpath / "1.0.1" / "com.test.plugin.streamDeckPlugin",
+    )
+
+    assert [(change.path, change.status) for change in archive_diff.changes] == [
+        ("imgs/icon.png", "changed"),
+        ("imgs/new.png", "added"),
+        ("imgs/old.png", "removed"),
+        ("main.py", "changed"),
+    ]
+    assert archive_diff.unchanged_count == 1
+
+
+def test_release_directories_are_matched_by_package_name(output_dirpath: Path):
+    """Test that the packages of two release directories are paired by file name, including ones on a single side."""
+    archive_diffs = diff_releases(output_dirpath / "1.0.0", output_dirpath / "1.0.1")
+
+    assert [(archive_diff.name, archive_diff.has_changes) for archive_diff in archive_diffs] == [
+        ("com.test.other.streamDeckPlugin", True),
+        ("com.test.plugin.streamDeckPlugin", True),
+    ]
+    assert format_archive_diff(archive_diffs[0]) == ["com.test.other.streamDeckPlugin: added"]
+    assert format_archive_diff(archive_diffs[1])[0] == "com.test.plugin.streamDeckPlugin: 1 added, 1 removed, 2 changed, 1 unchanged"
+
+
+def test_identical_packages_have_no_changes(output_dirpath: Path):
+    """Test that a package compared to itself has no changes."""
+    filepath = output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin"
+
+    archive_diff = diff_archives(filepath, filepath)
+
+    assert not archive_diff.has_changes
+    assert (archive_diff.changes, archive_diff.unchanged_count) == ([], 4)
+
+
+def test_content_diffs(output_dirpath: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that only changed entries get decompressed, giving a unified diff for text and a note for binary files."""
+    monkeypatch.setattr(release_diff, "MAX_CONTENT_DIFF_SIZE", 1024)
+    archive_diff = diff_archives(
+        output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin",
+        output_dirpath / "1.0.1" / "com.test.plugin.streamDeckPlugin",
+    )
+
+    content_diffs = {change.path: lines for change, lines in iter_content_diffs(archive_diff)}
+
+    assert content_diffs.keys() == {"imgs/icon.png", "main.py"}
+    assert content_diffs["imgs/icon.png"] == ["Binary files a/imgs/icon.png and b/imgs/icon.png differ."]
+    assert content_diffs["main.py"][:2] == ["--- a/main.py", "+++ b/main.py"]
+    assert "+print('world')" in content_diffs["main.py"]
@@ -0,0 +1 @@
+"""Tests for the size report of packages."""
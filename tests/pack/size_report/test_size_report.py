@@ -0,0 +1,82 @@
+"""Tests for the size report of a package, and its comparison to the previous release's."""
+from __future__ import annotations
+
+import random
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.size_report import (
+    SizeReport,
+    find_previous_archive,
+    format_archive_size_report,
+)
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_package(filepath: Path, files: dict[str, bytes]) -> Path:
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for relpath, data in files.items():
+            zip_file.writestr(f"com.test.plugin.sdPlugin/{relpath}", data)
+    return filepath
+
+
+@pytest.fixture
+def output_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create an output directory with two releases of a plugin, with some files added, removed & changed."""
+    output_dir = tmp_path / "releases"
+    _write_package(output_dir / "1.0.0" / "com.test.plugin.streamDeckPlugin", {
+        "manifest.json": b"{}",
+        "main.py": b"print('hello')\n" * 100,
+        "imgs/old.png": bytes(range(256)),
+    })
+    _write_package(output_dir / "1.0.0-1" / "com.test.plugin.streamDeckPlugin", {
+        "manifest.json": b"{}",
+        "main.py": b"print('hello')\n" * 100 + bytes(range(256)),
+        "imgs/actions/new.png": random.Random(0).randbytes(1024),
+        "imgs/icon.png": bytes(range(128)),
+    })
+    return output_dir
+
+
+def test_sizes_are_read_per_file_and_directory(output_dirpath: Path):
+    """Test that each file's sizes come from the archive, and each directory's from all the files under it."""
+    archive_filepath = output_dirpath / "1.0.0-1" / "com.test.plugin.streamDeckPlugin"
+    report = SizeReport.from_archive(archive_filepath)
+
+    with zipfile.ZipFile(archive_filepath) as zip_file:
+        info = zip_file.getinfo("com.test.plugin.sdPlugin/main.py")
+    assert (report.files["main.py"].compressed, report.files["main.py"].uncompressed) == (info.compress_size, info.file_size)
+
+    directories = report.directories()
+    assert set(directories) == {"imgs", "imgs/actions"}
+    assert (directories["imgs"].uncompressed, directories["imgs"].file_count) == (1024 + 128, 2)
+    assert directories["imgs/actions"].compressed == report.files["imgs/actions/new.png"].compressed
+
+    assert (report.largest_files(1)[0].path, report.total.file_count) == ("imgs/actions/new.png", 4)
+
+
+def test_diff_lists_added_removed_and_changed_files(output_dirpath: Path):
+    """Test that files of the same size in both packages are left out of the diff."""
+    report = SizeReport.from_archive(output_dirpath / "1.0.0-1" / "com.test.plugin.streamDeckPlugin")
+    previous_report = SizeReport.from_archive(output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin")
+
+    changes = {change.path: change for change in report.diff(previous_report)}
+
+    assert set(changes) == {"main.py", "imgs/old.png", "imgs/actions/new.png", "imgs/icon.png"}
+    assert changes["imgs/old.png"].new is None
+    assert changes["imgs/icon.png"].old is None
+    assert changes["imgs/old.png"].compressed_delta == -previous_report.files["imgs/old.png"].compressed
+
+
+def test_report_compares_to_previous_release(output_dirpath: Path):
+    """Test that the report finds the package of the previous release directory on its own."""
+    archive_filepath = output_dirpath / "1.0.0-1" / "com.test.plugin.streamDeckPlugin"
+
+    assert find_previous_archive(archive_filepath) == output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin"
+    assert "Compared to 1.0.0:" in format_archive_size_report(archive_filepath)
+    assert "Compared to" not in format_archive_size_report(output_dirpath / "1.0.0" / "com.test.plugin.streamDeckPlugin")
@@ -0,0 +1 @@
+"""Tests for the artifact store of the release directories."""
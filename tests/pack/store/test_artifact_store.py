@@ -0,0 +1,53 @@
+"""Tests for the ArtifactStore class, which deduplicates identical packages across release directories."""
+from __future__ import annotations
+
+import shutil
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.store import ArtifactStore
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def output_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create an output directory with three releases, two of which are identical."""
+    output_dir = tmp_path / "releases"
+    for dirname, content in (("1.0.0", b"first"), ("1.0.0-1", b"second"), ("1.0.0-2", b"first")):
+        (output_dir / dirname).mkdir(parents=True)
+        (output_dir / dirname / "plugin.streamDeckPlugin").write_bytes(content)
+    return output_dir
+
+
+def test_identical_packages_share_an_inode(output_dirpath: Path):
+    """Test that identical packages end up hardlinked to the same blob, while different ones don't."""
+    store = ArtifactStore.for_output_dir(output_dirpath)
+    digests = {"1.0.0": "aa11", "1.0.0-1": "bb22", "1.0.0-2": "aa11"}
+    filepaths = {dirname: output_dirpath / dirname / "plugin.streamDeckPlugin" for dirname in digests}
+
+    deduplicated = [store.add(filepaths[dirname], digest) for dirname, digest in digests.items()]
+
+    assert deduplicated == [False, False, True]
+    assert filepaths["1.0.0"].stat().st_ino == filepaths["1.0.0-2"].stat().st_ino
+    assert filepaths["1.0.0"].stat().st_ino != filepaths["1.0.0-1"].stat().st_ino
+    assert filepaths["1.0.0-2"].read_bytes() == b"first"
+
+
+def test_gc_only_removes_unreferenced_blobs(output_dirpath: Path):
+    """Test that garbage collection keeps the blobs some release still references."""
+    store = ArtifactStore.for_output_dir(output_dirpath)
+    for dirname, digest in (("1.0.0", "aa11"), ("1.0.0-1", "bb22"), ("1.0.0-2", "aa11")):
+        store.add(output_dirpath / dirname / "plugin.streamDeckPlugin", digest)
+
+    shutil.rmtree(output_dirpath / "1.0.0")
+    assert store.gc().removed_count == 0
+
+    shutil.rmtree(output_dirpath / "1.0.0-1")
+    shutil.rmtree(output_dirpath / "1.0.0-2")
+    stats = store.gc()
+
+    assert (stats.removed_count, stats.freed_bytes) == (2, len(b"first") + len(b"second"))
+    assert list(store.store_dirpath.glob("blobs/*")) == []
@@ -0,0 +1 @@
+"""Tests for packing a plugin to a stream."""
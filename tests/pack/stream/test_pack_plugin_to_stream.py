@@ -0,0 +1,78 @@
+"""Tests for packing a plugin to a stream or to bytes, instead of to a release directory."""
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.__main__ import cli
+from streamdeck_cli.commands.pack.build import (
+    PackOptions,
+    pack_plugin,
+    pack_plugin_to_bytes,
+    pack_plugin_to_stream,
+)
+from typer.testing import CliRunner
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+class UnseekableStream(io.RawIOBase):
+    """A write-only stream that can't seek nor tell, like a pipe."""
+
+    def __init__(self):
+        """Create an empty stream."""
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        """Tell that the stream can be written to."""
+        return True
+
+    def write(self, data: bytes) -> int:
+        """Keep the chunk written to the stream."""
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin, with code large enough to span several chunks."""
+    return make_plugin(files={"main.py": "print('hello')" * 100})
+
+
+def test_pack_plugin_to_bytes_matches_file(plugin_dirpath: Path, tmp_path: Path):
+    """Test that the in-memory package is the same as the one written to the release directory, without touching disk."""
+    package = pack_plugin_to_bytes(plugin_dirpath, PackOptions(use_cache=False))
+    result = pack_plugin(plugin_dirpath, tmp_path / "releases", PackOptions(use_cache=False))
+
+    assert result.output_filepath is not None
+    assert package == result.output_filepath.read_bytes()
+    assert sorted(path.name for path in plugin_dirpath.iterdir()) == [".packignore", "imgs", "main.py", "manifest.json"]
+
+
+def test_pack_plugin_to_unseekable_stream(plugin_dirpath: Path):
+    """Test that a valid package gets written to a stream that can't seek, such as a pipe."""
+    stream = UnseekableStream()
+
+    result = pack_plugin_to_stream(plugin_dirpath, stream, PackOptions(debug_port=5678))
+
+    assert result.output_filepath is None
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream.chunks))) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.read("com.test.plugin.sdPlugin/main.py") == (plugin_dirpath / "main.py").read_bytes()
+        assert zip_file.read("com.test.plugin.sdPlugin/.debug") == b"5678"
+
+
+def test_pack_to_stdout_keeps_messages_out_of_the_package(plugin_dirpath: Path):
+    """Test that messages printed while packing to stdout go to stderr, rather than into the package."""
+    (plugin_dirpath / ".packignore").unlink()
+
+    result = CliRunner().invoke(cli, ["pack", str(plugin_dirpath), "--output", "-"])
+
+    assert result.exit_code != 0
+    assert result.stdout_bytes == b""
+    assert "ERROR: '.packignore' file is missing" in result.stderr
@@ -0,0 +1 @@
+"""Tests for the timings of the pack command."""
@@ -0,0 +1,85 @@
+"""Tests for the per-phase timings of a pack."""
+from __future__ import annotations
+
+import json
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.build import PackOptions, pack_plugin
+from streamdeck_cli.commands.pack.timings import PackTimings
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+WALK_SECONDS = 0.01
+MATCH_SECONDS = 0.05
+ITEM_COUNT = 3
+ITEM_SECONDS = 0.01
+USE_SECONDS = 0.02
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a minimal plugin with a nested .packignore file."""
+    return make_plugin(files={
+        "imgs/.packignore": "*.psd\n",
+        "imgs/icon.psd": b"psd",
+        "main.py": "print('hello')" * 1000,
+    })
+
+
+def test_nested_phases_are_excluded_from_their_parent():
+    """Test that time spent in a nested phase only counts towards that phase."""
+    timings = PackTimings()
+
+    with timings.phase("walk"):
+        time.sleep(WALK_SECONDS)
+        with timings.phase("match"):
+            time.sleep(MATCH_SECONDS)
+
+    assert WALK_SECONDS <= timings.phases["walk"] < MATCH_SECONDS
+    assert timings.phases["match"] >= MATCH_SECONDS
+
+
+def test_iterate_only_times_getting_items():
+    """Test that the time spent using each item isn't counted towards the phase of the iterator."""
+    timings = PackTimings()
+
+    def slow_items():
+        for i in range(ITEM_COUNT):
+            time.sleep(ITEM_SECONDS)
+            yield i
+
+    for _ in timings.iterate("walk", slow_items()):
+        time.sleep(USE_SECONDS)
+
+    assert ITEM_COUNT * ITEM_SECONDS <= timings.phases["walk"] < ITEM_COUNT * USE_SECONDS
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_pack_records_phases_and_files(plugin_dirpath: Path, tmp_path: Path, jobs: int):
+    """Test that a timed pack records every phase it went through, and every file in the package."""
+    result = pack_plugin(plugin_dirpath, tmp_path / "releases", PackOptions(jobs=jobs, timings=True))
+
+    timings = result.timings
+    assert timings is not None
+    assert {"manifest", "allocate", "packignore", "cache", "walk", "match", "prepare", "write"} <= set(timings.phases)
+    assert sorted(file.relpath for file in timings.files) == ["imgs/icon.png", "main.py", "manifest.json"]
+    assert timings.bytes_in == sum((plugin_dirpath / file.relpath).stat().st_size for file in timings.files)
+    assert sum(timings.phases.values()) <= timings.total_seconds
+
+    stats = timings.to_dict()
+    json.dumps(stats)
+    assert stats["slowest_files"][0]["relpath"] == max(timings.files, key=lambda file: file.seconds).relpath
+    assert "Slowest files:" in timings.format_report()
+
+
+def test_pack_without_timings_records_nothing(plugin_dirpath: Path, tmp_path: Path):
+    """Test that timings are only collected when asked for."""
+    result = pack_plugin(plugin_dirpath, tmp_path / "releases", PackOptions())
+
+    assert result.timings is None
@@ -0,0 +1 @@
+"""Tests for verifying already-packed plugins."""
@@ -0,0 +1,133 @@
+"""Tests for verifying an already-packed plugin without extracting it."""
+from __future__ import annotations
+
+import json
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.build import PackOptions, pack_plugin_to_bytes
+from streamdeck_cli.commands.pack.verify import verify_archive
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+MANIFEST = {
+    "UUID": "com.test.plugin",
+    "Name": "Plugin",
+    "Version": "1.0.0",
+    "Author": "Tester",
+    "Description": "Test plugin",
+    "Icon": "imgs/icon",
+    "CodePath": "main.py",
+    "Actions": [
+        {"UUID": "com.test.plugin.action", "Name": "Action", "Icon": "imgs/actions/action", "PropertyInspectorPath": "pi/index.html"},
+    ],
+}
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a plugin whose manifest references files in a few directories."""
+    return make_plugin(actions=MANIFEST["Actions"], files={
+        "imgs/actions/action.svg": "<svg/>",
+        "pi/index.html": "<html></html>",
+        "main.py": "print('hello')\n" * 100,
+    })
+
+
+def _write_package(filepath: Path, files: dict[str, bytes], compress_type: int = zipfile.ZIP_DEFLATED) -> Path:
+    with zipfile.ZipFile(filepath, "w", compress_type) as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+    return filepath
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_packed_plugin_is_valid(plugin_dirpath: Path, tmp_path: Path, jobs: int):
+    """Test that a package made by the pack command passes verification, with its manifest validated from the archive."""
+    archive_filepath = tmp_path / "com.test.plugin.streamDeckPlugin"
+    archive_filepath.write_bytes(pack_plugin_to_bytes(plugin_dirpath, PackOptions()))
+
+    verification = verify_archive(archive_filepath, jobs=jobs)
+
+    assert verification.errors == []
+    assert verification.manifest is not None
+    assert verification.manifest.uuid == "com.test.plugin"
+
+
+def test_corrupted_entry_is_reported(tmp_path: Path):
+    """Test that an entry whose content doesn't match its CRC is reported, along with the other entries being checked."""
+    files = {
+        "com.test.plugin.sdPlugin/manifest.json": json.dumps(MANIFEST).encode(),
+        "com.test.plugin.sdPlugin/main.py": b"print('hello')\n",
+    }
+    archive_filepath = _write_package(tmp_path / "package.streamDeckPlugin", files, zipfile.ZIP_STORED)
+    archive_filepath.write_bytes(archive_filepath.read_bytes().replace(b"print('hello')", b"print('HELLO')"))
+
+    verification = verify_archive(archive_filepath, jobs=2)
+
+    assert any("'com.test.plugin.sdPlugin/main.py' is corrupted" in error for error in verification.errors)
+
+
+def test_missing_assets_are_checked_against_the_archive(plugin_dirpath: Path, tmp_path: Path):
+    """Test that the manifest's references are checked against the archive's entries, not against the filesystem."""
+    files = {
+        "com.test.plugin.sdPlugin/manifest.json": json.dumps(MANIFEST).encode(),
+        "com.test.plugin.sdPlugin/main.py": b"",
+        "com.test.plugin.sdPlugin/imgs/icon.png": b"png",
+        "com.test.plugin.sdPlugin/pi/index.html": b"",
+    }
+    archive_filepath = _write_package(tmp_path / "package.streamDeckPlugin", files)
+
+    verification = verify_archive(archive_filepath)
+
+    assert verification.manifest is None
+    assert len(verification.errors) == 1
+    assert verification.errors[0].startswith("Actions.0.Icon")
+
+
+@pytest.mark.parametrize(("files", "expected_error"), [
+    (
+        {"com.other.plugin.sdPlugin/manifest.json": json.dumps(MANIFEST).encode()},
+        "doesn't match the manifest's UUID",
+    ),
+    (
+        {"com.test.plugin/manifest.json": b"{}"},
+        "should be named '<uuid>.sdPlugin'",
+    ),
+    (
+        {"com.test.plugin.sdPlugin/main.py": b"", "other.sdPlugin/main.py": b""},
+        "exactly one plugin directory",
+    ),
+    (
+        {"com.test.plugin.sdPlugin/main.py": b"", "manifest.json": b""},
+        "outside of the plugin directory",
+    ),
+    (
+        {"com.test.plugin.sdPlugin/../evil.py": b""},
+        "unsafe path",
+    ),
+    (
+        {"com.test.plugin.sdPlugin/main.py": b""},
+        "'manifest.json' file is missing",
+    ),
+])
+def test_layout_errors(tmp_path: Path, files: dict[str, bytes], expected_error: str):
+    """Test that packages not laid out like the pack command's are reported."""
+    archive_filepath = _write_package(tmp_path / "package.streamDeckPlugin", files)
+
+    verification = verify_archive(archive_filepath)
+
+    assert any(expected_error in error for error in verification.errors), verification.errors
+
+
+def test_not_a_zip_file(tmp_path: Path):
+    """Test that a file that isn't an archive at all is reported rather than raising."""
+    archive_filepath = tmp_path / "package.streamDeckPlugin"
+    archive_filepath.write_bytes(b"not a zip file")
+
+    assert verify_archive(archive_filepath).errors[0].startswith("Not a valid package")
@@ -0,0 +1 @@
+"""Tests for the watch mode of the pack command."""
@@ -0,0 +1,150 @@
+"""Tests for the watchers used by pack's watch mode, and the rebuild they trigger."""
+from __future__ import annotations
+
+import os
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.pack.build import PackOptions, build_plugin_archive
+from streamdeck_cli.commands.pack.watch import (
+    InotifyWatcher,
+    PluginFilter,
+    PollingWatcher,
+    create_watcher,
+    wait_for_debounced_changes,
+)
+from streamdeck_cli.models.manifest import Manifest
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugin_dirpath(make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a valid plugin, with an ignored directory and the output directory inside of it."""
+    plugin_dirpath = make_plugin(uuid="com.test.watch", files={".packignore": ".packignore\nbuild/\n"})
+    (plugin_dirpath / "build").mkdir()
+    (plugin_dirpath / "releases").mkdir()
+    return plugin_dirpath
+
+
+@pytest.fixture
+def plugin_filter(plugin_dirpath: Path) -> PluginFilter:
+    """Fixture to create the filter of the plugin, with its output directory inside of it."""
+    return PluginFilter(plugin_dirpath, plugin_dirpath / "releases")
+
+
+def _bump_mtime(filepath: Path) -> None:
+    st = filepath.stat()
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_plugin_filter(plugin_filter: PluginFilter):
+    """Test that ignored paths and the output directory are filtered out, but not the .packignore file itself."""
+    assert plugin_filter.is_relevant("main.py")
+    assert plugin_filter.is_relevant("imgs", is_dir=True)
+    assert plugin_filter.is_relevant(".packignore")
+    assert not plugin_filter.is_relevant("build", is_dir=True)
+    assert not plugin_filter.is_relevant("build/out.txt")
+    assert not plugin_filter.is_relevant("releases/1.0.0/com.test.watch.streamDeckPlugin")
+
+
+def test_plugin_filter_nested_packignore(plugin_dirpath: Path, plugin_filter: PluginFilter):
+    """Test that nested .packignore files apply as when packing, and get reloaded when they change."""
+    (plugin_dirpath / "imgs" / ".packignore").write_text("*.psd\n")
+    (plugin_dirpath / "imgs" / "src").mkdir()
+    assert plugin_filter.is_relevant("imgs/.packignore")
+
+    assert not plugin_filter.is_relevant("imgs/icon.psd")
+    assert not plugin_filter.is_relevant("imgs/src/icon.psd")
+    assert plugin_filter.is_relevant("icon.psd")
+
+    (plugin_dirpath / "imgs" / ".packignore").write_text("*.psd\n!icon.psd\n")
+    _bump_mtime(plugin_dirpath / "imgs" / ".packignore")
+    assert plugin_filter.is_relevant("imgs/.packignore")
+
+    assert plugin_filter.is_relevant("imgs/icon.psd")
+    assert not plugin_filter.is_relevant("imgs/other.psd")
+
+
+def test_polling_watcher_reloads_nested_packignore(plugin_dirpath: Path, plugin_filter: PluginFilter):
+    """Test that the polling watcher reports changes to nested .packignore files, and applies their new patterns."""
+    (plugin_dirpath / "imgs" / "icon.psd").write_bytes(b"psd")
+    (plugin_dirpath / "imgs" / ".packignore").write_text("*.psd\n")
+    watcher = PollingWatcher(plugin_filter, interval=0.01)
+
+    (plugin_dirpath / "imgs" / "icon.psd").write_bytes(b"psd2")
+    _bump_mtime(plugin_dirpath / "imgs" / "icon.psd")
+    assert watcher.wait_for_changes(timeout=0.1) == set()
+
+    (plugin_dirpath / "imgs" / ".packignore").write_text("")
+    _bump_mtime(plugin_dirpath / "imgs" / ".packignore")
+    assert watcher.wait_for_changes(timeout=1) == {"imgs/.packignore"}
+
+    (plugin_dirpath / "imgs" / "icon.psd").write_bytes(b"psd3")
+    _bump_mtime(plugin_dirpath / "imgs" / "icon.psd")
+    assert watcher.wait_for_changes(timeout=1) == {"imgs/icon.psd"}
+
+
+def test_polling_watcher_reports_relevant_changes(plugin_dirpath: Path, plugin_filter: PluginFilter):
+    """Test that the polling watcher reports modified and new files, but not ignored ones."""
+    watcher = PollingWatcher(plugin_filter, interval=0.01)
+
+    assert watcher.wait_for_changes(timeout=0) == set()
+
+    (plugin_dirpath / "main.py").write_text("print('changed')")
+    _bump_mtime(plugin_dirpath / "main.py")
+    (plugin_dirpath / "imgs" / "new.png").write_bytes(b"png")
+    (plugin_dirpath / "build" / "out.txt").write_text("ignored")
+
+    assert watcher.wait_for_changes(timeout=1) == {"main.py", "imgs/new.png"}
+    assert watcher.wait_for_changes(timeout=0) == set()
+
+
+@pytest.mark.skipif(not InotifyWatcher.is_supported(), reason="inotify is only available on Linux")
+def test_inotify_watcher_reports_relevant_changes(plugin_dirpath: Path, plugin_filter: PluginFilter):
+    """Test that the inotify watcher reports changes in new subdirectories, but not in ignored ones."""
+    watcher = InotifyWatcher(plugin_filter)
+    try:
+        (plugin_dirpath / "lib").mkdir()
+        changed = wait_for_debounced_changes(watcher, debounce=0.1)
+        assert changed == {"lib"}
+
+        (plugin_dirpath / "lib" / "module.py").write_text("x = 1")
+        (plugin_dirpath / "build" / "out.txt").write_text("ignored")
+        changed = wait_for_debounced_changes(watcher, debounce=0.1)
+        assert changed == {"lib/module.py"}
+
+    finally:
+        watcher.close()
+
+
+def test_create_watcher_force_polling(plugin_filter: PluginFilter):
+    """Test that polling can be forced even where inotify is available."""
+    watcher = create_watcher(plugin_filter, force_polling=True)
+
+    assert isinstance(watcher, PollingWatcher)
+
+
+def test_rebuild_only_recompresses_changed_files(plugin_dirpath: Path, tmp_path: Path):
+    """Test that rebuilding the archive in place reuses the compression cache for unchanged files."""
+    output_dirpath = tmp_path / "releases"
+    output_filepath = output_dirpath / "com.test.watch.streamDeckPlugin"
+    output_dirpath.mkdir()
+    manifest = Manifest.from_json_file(plugin_dirpath / "manifest.json")
+
+    build_plugin_archive(plugin_dirpath, output_filepath, output_dirpath, manifest, PackOptions())
+    (plugin_dirpath / "main.py").write_text("print('changed')")
+    _bump_mtime(plugin_dirpath / "main.py")
+    cache_stats = build_plugin_archive(plugin_dirpath, output_filepath, output_dirpath, manifest, PackOptions()).cache_stats
+
+    assert cache_stats is not None
+    assert cache_stats.misses == 1
+    assert cache_stats.hits > 0
+    with zipfile.ZipFile(output_filepath) as zip_file:
+        assert zip_file.read("com.test.watch.sdPlugin/main.py") == b"print('changed')"
+    # The temporary file the archive is written to before being moved in place doesn't linger.
+    assert sorted(path.name for path in output_dirpath.iterdir()) == [".pack-cache", "com.test.watch.streamDeckPlugin"]
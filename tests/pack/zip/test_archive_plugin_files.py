@@ -5,7 +5,7 @@ from pathlib import Path
 import pathspec
 import pytest
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
-from streamdeck_cli.commands.pack import archive_plugin_files
+from streamdeck_cli.commands.pack.zip import archive_plugin_files
 
 
 @pytest.fixture
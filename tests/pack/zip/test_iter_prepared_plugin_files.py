@@ -0,0 +1,58 @@
+"""Tests that compressing plugin files in parallel gives the same results as compressing them one at a time."""
+from __future__ import annotations
+
+import random
+import zipfile
+from typing import TYPE_CHECKING
+
+import pathspec
+import pytest
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from streamdeck_cli.commands.pack.compression import CompressionPolicy
+from streamdeck_cli.commands.pack.zip import archive_plugin_files, iter_prepared_plugin_files
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugin_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create a plugin directory with enough files of varying sizes to keep a thread pool busy."""
+    plugin_dir = tmp_path / "plugin"
+    rng = random.Random(1234)
+    for i in range(50):
+        filepath = plugin_dir / f"dir{i % 5}" / f"file{i}.txt"
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes(bytes(rng.choice(b"abcdef \n") for _ in range(rng.randint(0, 20_000))))
+    return plugin_dir
+
+
+@pytest.fixture
+def packignore_spec() -> pathspec.PathSpec:
+    """Fixture to get a specification that doesn't ignore any file."""
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, [])
+
+
+@pytest.mark.parametrize("jobs", [2, 4, 0])
+def test_parallel_archive_is_byte_identical(plugin_dirpath: Path, tmp_path: Path, packignore_spec: pathspec.PathSpec, jobs: int):
+    """Test that the archive created with several jobs is byte-identical to the one created with a single job."""
+    serial_filepath = tmp_path / "serial.streamDeckPlugin"
+    parallel_filepath = tmp_path / "parallel.streamDeckPlugin"
+
+    archive_plugin_files(plugin_dirpath, serial_filepath, plugin_uuid="test_plugin", packignore_spec=packignore_spec)
+    archive_plugin_files(plugin_dirpath, parallel_filepath, plugin_uuid="test_plugin", packignore_spec=packignore_spec, jobs=jobs)
+
+    assert parallel_filepath.read_bytes() == serial_filepath.read_bytes()
+
+    with zipfile.ZipFile(parallel_filepath) as zip_file:
+        assert zip_file.testzip() is None
+
+
+def test_order_is_preserved(plugin_dirpath: Path):
+    """Test that prepared files come out in the same order the file paths went in."""
+    filepaths = sorted(path.relative_to(plugin_dirpath) for path in plugin_dirpath.rglob("*.txt"))
+
+    prepared_files = iter_prepared_plugin_files(plugin_dirpath, filepaths, CompressionPolicy(), jobs=3)
+
+    assert [prepared.relpath for prepared in prepared_files] == [path.as_posix() for path in filepaths]
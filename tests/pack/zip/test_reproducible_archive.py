@@ -0,0 +1,100 @@
+"""Tests for the reproducible mode of archive_plugin_files."""
+from __future__ import annotations
+
+import io
+import os
+import stat
+import zipfile
+from typing import TYPE_CHECKING
+
+import pathspec
+import pytest
+import typer
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from streamdeck_cli.commands.pack.zip import archive_plugin_files, get_reproducible_date_time
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _create_plugin(plugin_dirpath: Path, mtime: int, mode: int) -> Path:
+    """Create the same plugin files, with the given mtime and permissions."""
+    (plugin_dirpath / "sub").mkdir(parents=True)
+    (plugin_dirpath / "main.py").write_text("print('hello')" * 100)
+    (plugin_dirpath / "sub" / "run.sh").write_text("#!/bin/sh\n")
+    (plugin_dirpath / "sub" / "data.txt").write_text("data" * 100)
+    for filepath in (plugin_dirpath / "main.py", plugin_dirpath / "sub" / "data.txt"):
+        filepath.chmod(mode)
+        os.utime(filepath, (mtime, mtime))
+    (plugin_dirpath / "sub" / "run.sh").chmod(0o750)
+    return plugin_dirpath
+
+
+@pytest.fixture
+def packignore_spec() -> pathspec.PathSpec:
+    """Fixture to create an empty .packignore specification."""
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, [])
+
+
+def _archive(plugin_dirpath: Path, packignore_spec: pathspec.PathSpec, *, reproducible: bool) -> bytes:
+    buffer = io.BytesIO()
+    archive_plugin_files(
+        plugin_dirpath, buffer, plugin_uuid="test_plugin", packignore_spec=packignore_spec, debug_port=5678,
+        reproducible=reproducible,
+    )
+    return buffer.getvalue()
+
+
+def test_reproducible_archives_are_identical(tmp_path: Path, packignore_spec: pathspec.PathSpec):
+    """Test that the same files with different mtimes & permissions give byte-identical archives in reproducible mode."""
+    first_dirpath = _create_plugin(tmp_path / "first", mtime=1_600_000_000, mode=0o600)
+    second_dirpath = _create_plugin(tmp_path / "second", mtime=1_700_000_000, mode=0o664)
+
+    assert _archive(first_dirpath, packignore_spec, reproducible=True) == _archive(second_dirpath, packignore_spec, reproducible=True)
+    assert _archive(first_dirpath, packignore_spec, reproducible=False) != _archive(second_dirpath, packignore_spec, reproducible=False)
+
+
+def test_reproducible_entry_metadata(tmp_path: Path, packignore_spec: pathspec.PathSpec, monkeypatch: pytest.MonkeyPatch):
+    """Test that entries get the time from SOURCE_DATE_EPOCH, and normalised permissions."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")  # 2023-11-14 22:13:20 UTC
+    plugin_dirpath = _create_plugin(tmp_path / "plugin", mtime=1_600_000_000, mode=0o600)
+
+    with zipfile.ZipFile(io.BytesIO(_archive(plugin_dirpath, packignore_spec, reproducible=True))) as zip_file:
+        infos = {zinfo.filename: zinfo for zinfo in zip_file.infolist()}
+
+    assert list(infos) == [
+        "test_plugin.sdPlugin/main.py",
+        "test_plugin.sdPlugin/sub/data.txt",
+        "test_plugin.sdPlugin/sub/run.sh",
+        "test_plugin.sdPlugin/.debug",
+    ]
+    assert {zinfo.date_time for zinfo in infos.values()} == {(2023, 11, 14, 22, 13, 20)}
+    assert {zinfo.create_system for zinfo in infos.values()} == {3}
+    assert infos["test_plugin.sdPlugin/main.py"].external_attr >> 16 == stat.S_IFREG | 0o644
+    assert infos["test_plugin.sdPlugin/sub/run.sh"].external_attr >> 16 == stat.S_IFREG | 0o755
+
+
+@pytest.mark.parametrize(("source_date_epoch", "date_time"), [
+    ("", (1980, 1, 1, 0, 0, 0)),
+    ("0", (1980, 1, 1, 0, 0, 0)),
+    ("-86400", (1980, 1, 1, 0, 0, 0)),
+    ("315532800", (1980, 1, 1, 0, 0, 0)),
+    ("315532802", (1980, 1, 1, 0, 0, 2)),
+])
+def test_reproducible_date_time_is_clamped(monkeypatch: pytest.MonkeyPatch, source_date_epoch: str, date_time: tuple[int, ...]):
+    """Test that times before 1980, which zip files can't hold, get clamped to 1980-01-01."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", source_date_epoch)
+
+    assert get_reproducible_date_time() == date_time
+
+
+def test_invalid_source_date_epoch_is_an_error(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]):
+    """Test that a SOURCE_DATE_EPOCH that isn't an integer gives an error rather than a traceback."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "2023-11-14")
+
+    with pytest.raises(typer.Exit) as exc_info:
+        get_reproducible_date_time()
+
+    assert exc_info.value.exit_code == 1
+    assert "SOURCE_DATE_EPOCH" in capsys.readouterr().out
@@ -1,8 +1,11 @@
+"""Tests for walking the files of a plugin directory that aren't ignored by its .packignore files."""
+import os
 from pathlib import Path
 
 import pathspec
 import pytest
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+from pytest_mock import MockerFixture
 from streamdeck_cli.commands.pack.zip import walk_filtered_plugin_files
 
 
@@ -35,3 +38,58 @@ def test_walk_filtered_plugin_files(plugin_dirpath: Path, packignore_spec: paths
     """Test that the walk_filtered_plugin_files function yields files that are not ignored."""
     files = list(walk_filtered_plugin_files(plugin_dirpath, packignore_spec))
     assert files == [Path("file1.txt")]
+
+
+@pytest.fixture
+def nested_plugin_dirpath(tmp_path: Path) -> Path:
+    """Fixture to create a plugin directory with ignored subdirectories and a nested .packignore file."""
+    plugin_dir = tmp_path / "plugin"
+    for relative_path in [
+        "manifest.json",
+        "build/output.txt",
+        ".venv/lib/site-packages/module.py",
+        "src/main.py",
+        "src/notes.md",
+        "src/vendor/lib.py",
+        "src/vendor/lib.pyc",
+        "src/vendor/README.md",
+    ]:
+        filepath = plugin_dir / relative_path
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(relative_path)
+
+    # The nested .packignore ignores compiled files within src/vendor/, and re-includes its README that the root ignores.
+    (plugin_dir / "src" / "vendor" / ".packignore").write_text("*.pyc\n!README.md\n")
+
+    return plugin_dir
+
+
+@pytest.fixture
+def nested_packignore_spec() -> pathspec.PathSpec:
+    """Fixture to create the PathSpec object of the nested plugin's root .packignore file."""
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, [".venv/", "/build", "*.md"])
+
+
+def test_walk_honours_nested_packignore(nested_plugin_dirpath: Path, nested_packignore_spec: pathspec.PathSpec):
+    """Test that nested .packignore files apply relative to their own directory and override their parents."""
+    files = list(walk_filtered_plugin_files(nested_plugin_dirpath, nested_packignore_spec))
+
+    assert files == [
+        Path("manifest.json"),
+        Path("src/main.py"),
+        Path("src/vendor/.packignore"),
+        Path("src/vendor/README.md"),
+        Path("src/vendor/lib.py"),
+    ]
+
+
+def test_walk_prunes_ignored_directories(nested_plugin_dirpath: Path, nested_packignore_spec: pathspec.PathSpec, mocker: MockerFixture):
+    """Test that ignored directories are never scanned."""
+    scandir_spy = mocker.spy(os, "scandir")
+
+    list(walk_filtered_plugin_files(nested_plugin_dirpath, nested_packignore_spec))
+
+    scanned_dirpaths = {Path(call.args[0]) for call in scandir_spy.call_args_list}
+    assert nested_plugin_dirpath / ".venv" not in scanned_dirpaths
+    assert nested_plugin_dirpath / "build" not in scanned_dirpaths
+    assert nested_plugin_dirpath / "src" / "vendor" in scanned_dirpaths
@@ -0,0 +1 @@
+"""Tests for validating several plugins at once."""
@@ -0,0 +1,60 @@
+"""Tests for validating several plugins at once."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from streamdeck_cli.commands.validate.batch import validate_plugins
+from streamdeck_cli.utils.plugin_paths import discover_plugin_dirpaths
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@pytest.fixture
+def plugins_root(tmp_path: Path, make_plugin: Callable[..., Path]) -> Path:
+    """Fixture to create a monorepo with a valid plugin, and plugins that are broken in different ways."""
+    root = tmp_path / "plugins"
+    make_plugin(root / "valid", uuid="com.test.valid", name="Valid")
+
+    # Two errors at once: a missing code file, and a missing action icon.
+    broken_dirpath = make_plugin(
+        root / "group" / "broken",
+        uuid="com.test.broken",
+        actions=[{"UUID": "com.test.broken.action", "Name": "Action", "Icon": "imgs/missing"}],
+    )
+    (broken_dirpath / "main.py").unlink()
+
+    (root / "not_json").mkdir()
+    (root / "not_json" / "manifest.json").write_text("{")
+
+    # Plugins inside hidden directories shouldn't be discovered.
+    make_plugin(root / ".cache" / "hidden", uuid="com.test.hidden")
+    return root
+
+
+def test_discover_plugin_dirpaths(plugins_root: Path):
+    """Test that every plugin directory under the root is found, except in hidden directories."""
+    assert discover_plugin_dirpaths(plugins_root) == [
+        plugins_root / "group" / "broken",
+        plugins_root / "not_json",
+        plugins_root / "valid",
+    ]
+
+
+def test_validate_plugins_collects_every_error(plugins_root: Path):
+    """Test that each plugin's errors are all collected, and that one failing plugin doesn't stop the others."""
+    plugin_dirpaths = [plugins_root / "group" / "broken", plugins_root / "missing", plugins_root / "not_json", plugins_root / "valid"]
+
+    results = validate_plugins(plugin_dirpaths, max_workers=4)
+
+    assert [result.plugin_dirpath for result in results] == plugin_dirpaths
+    assert [result.succeeded for result in results] == [False, False, False, True]
+
+    assert sorted(error.partition(":")[0] for error in results[0].errors) == ["Actions.0.Icon", "CodePath"]
+
+    assert results[1].errors == ["Provided plugin directory does not exist on machine."]
+    assert results[2].errors[0].startswith("The 'manifest.json' file is not valid json")
+    assert results[3].plugin_name == "Valid"
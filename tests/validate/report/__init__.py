@@ -0,0 +1 @@
+"""Tests for the machine-readable reports of validation results."""
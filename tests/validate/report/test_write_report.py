@@ -0,0 +1,47 @@
+"""Tests for the machine-readable reports of validation results."""
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from streamdeck_cli.commands.validate.batch import ValidationResult
+from streamdeck_cli.commands.validate.report import ReportFormat, write_report
+
+
+@pytest.fixture
+def results() -> list[ValidationResult]:
+    """Fixture to create the results of validating a valid and a broken plugin."""
+    return [
+        ValidationResult(plugin_dirpath=Path("plugins/valid"), seconds=0.5, plugin_uuid="com.test.valid", plugin_name="Valid"),
+        ValidationResult(plugin_dirpath=Path("plugins/broken"), seconds=0.25, errors=["CodePath: not found", "Icon: not found"]),
+    ]
+
+
+def test_write_json_report(results: list[ValidationResult], tmp_path: Path):
+    """Test that the JSON report has a summary, and every plugin's status and errors."""
+    report_filepath = tmp_path / "reports" / "validate.json"
+
+    write_report(results, report_filepath, ReportFormat.JSON)
+
+    report = json.loads(report_filepath.read_text())
+    assert report["summary"] == {"total": 2, "passed": 1, "failed": 1}
+    assert [plugin["status"] for plugin in report["plugins"]] == ["passed", "failed"]
+    assert report["plugins"][1]["errors"] == ["CodePath: not found", "Icon: not found"]
+
+
+def test_write_junit_report(results: list[ValidationResult], tmp_path: Path):
+    """Test that the JUnit report has a test case per plugin, with a failure per error."""
+    report_filepath = tmp_path / "validate.xml"
+
+    write_report(results, report_filepath, ReportFormat.JUNIT)
+
+    test_suite = ET.parse(report_filepath).getroot().find("testsuite")  # noqa: S314
+    assert test_suite is not None
+    assert test_suite.get("tests") == "2"
+    assert test_suite.get("failures") == "1"
+    test_cases = test_suite.findall("testcase")
+    assert [test_case.get("name") for test_case in test_cases] == [str(Path("plugins/valid")), str(Path("plugins/broken"))]
+    assert test_cases[0].findall("failure") == []
+    assert [failure.get("message") for failure in test_cases[1].findall("failure")] == ["CodePath: not found", "Icon: not found"]